@@ -0,0 +1,95 @@
+"""Benchmark of the compact and optimized renderings of the differentially
+private rewritings.
+
+For each query of tests/queries/base_queries.sql on the census table, it
+rewrites the query with differential privacy and compares the plain, the
+compact (`to_query(compact=True)`) and the optimized (`to_query(optimize=True)`)
+renderings: the size of the query text and the planning time reported by the
+local PostgreSQL database of `pyqrlew.io`, which stands in for the warehouse.
+
+Run it with:
+
+    python examples/compact_benchmark.py --repeats 10 --output compact.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import typing as t
+from importlib.metadata import version
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from pyqrlew.io import PostgreSQL
+
+QUERIES_PATH = Path(__file__).parent.parent / 'tests' / 'queries' / 'base_queries.sql'
+PRIVACY_UNIT = [('census', [], '_PRIVACY_UNIT_ROW_')]
+EPSILON_DELTA = {'epsilon': 1.0, 'delta': 1e-3}
+
+
+def base_queries() -> t.List[str]:
+    with open(QUERIES_PATH, 'r') as f:
+        return [query.strip() for query in f if query.strip() and not query.startswith('--')]
+
+
+def planning_time(conn: Connection, query: str, repeats: int) -> float:
+    """Returns the median planning time (in milliseconds) of a query"""
+    times = []
+    for _ in range(repeats):
+        plan = conn.execute(text(f'EXPLAIN (SUMMARY, FORMAT JSON) {query}')).scalar_one()
+        times.append(plan[0]['Planning Time'])
+    return statistics.median(times)
+
+
+def benchmark(repeats: int) -> t.List[t.Dict[str, t.Any]]:
+    database = PostgreSQL()
+    dataset = database.extract()
+    results = []
+    with database.engine().connect() as conn:
+        for query in base_queries():
+            try:
+                relation = dataset.relation(query).rewrite_with_differential_privacy(
+                    dataset, PRIVACY_UNIT, EPSILON_DELTA
+                ).relation()
+            except RuntimeError:
+                continue
+            renderings = {
+                '': relation.to_query(),
+                'compact_': relation.to_query(compact=True),
+                'optimized_': relation.to_query(optimize=True),
+            }
+            result: t.Dict[str, t.Any] = {'query': query}
+            for prefix, rendering in renderings.items():
+                result[f'{prefix}size'] = len(rendering)
+                result[f'{prefix}with_entries'] = rendering.count(' AS (SELECT')
+                result[f'{prefix}planning_ms'] = planning_time(conn, rendering, repeats)
+            results.append(result)
+    return results
+
+
+def summary(results: t.List[t.Dict[str, t.Any]]) -> t.Dict[str, float]:
+    output: t.Dict[str, float] = {'queries': len(results)}
+    for prefix in ['compact_', 'optimized_']:
+        output[f'{prefix}size_ratio'] = sum(r[f'{prefix}size'] for r in results) / max(1, sum(r['size'] for r in results))
+        output[f'{prefix}planning_ratio'] = sum(r[f'{prefix}planning_ms'] for r in results) / max(1e-9, sum(r['planning_ms'] for r in results))
+    return output
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=10, help='number of planning time measurements per query')
+    parser.add_argument('--output', type=str, default=None, help='JSON output file, defaults to stdout')
+    args = parser.parse_args()
+    results = benchmark(args.repeats)
+    output = {'pyqrlew': version('pyqrlew'), 'summary': summary(results), 'queries': results}
+    if args.output is None:
+        json.dump(output, sys.stdout, indent=2)
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(output, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+"""Benchmark of the compilation hot paths of pyqrlew.
+
+It needs no database: the Datasets are built with `Dataset.from_str` from
+synthetic catalogs of copies of the census table, and the queries of
+tests/queries/base_queries.sql are spread over the tables of each catalog.
+
+Run it with:
+
+    python examples/compilation_benchmark.py --tables 10 100 1000 --output compilation.json
+
+The JSON output contains the timings (in seconds) of each operation for each
+catalog size and can be compared across versions to track regressions.
+It also times the accessors of the differentially private rewriting of a
+query with `--joins` joins, called `--calls` times.
+"""
+import argparse
+import json
+import platform
+import re
+import statistics
+import sys
+import time
+import typing as t
+from importlib.metadata import version
+from pathlib import Path
+from uuid import uuid4 as generate_uuid
+
+from pyqrlew import Dataset, Dialect, Relation
+
+QUERIES_PATH = Path(__file__).parent.parent / 'tests' / 'queries' / 'base_queries.sql'
+SCHEMA_NAME = 'bench'
+TABLE_SIZE = 10000
+DIALECTS = ['PostgreSql', 'MsSql', 'BigQuery', 'MySql', 'Hive', 'Databricks', 'RedshiftSql']
+EPSILON_DELTA = {'epsilon': 1.0, 'delta': 1e-3}
+
+INTEGER_COLUMNS = {
+    'age': (20, 90),
+    'education_num': (1, 16),
+    'capital_gain': (0, 100000),
+    'capital_loss': (0, 5000),
+    'hours_per_week': (1, 99),
+}
+TEXT_COLUMNS = {
+    'workclass': ['Federal-gov', 'Local-gov', 'Private', 'Self-emp-inc', 'Self-emp-not-inc', 'State-gov'],
+    'fnlwgt': [],
+    'education': ['Bachelors', 'Doctorate', 'HS-grad', 'Masters', 'Some-college'],
+    'marital_status': ['Divorced', 'Married-civ-spouse', 'Never-married', 'Separated', 'Widowed'],
+    'occupation': ['Adm-clerical', 'Craft-repair', 'Exec-managerial', 'Sales', 'Tech-support'],
+    'relationship': ['Husband', 'Not-in-family', 'Own-child', 'Unmarried', 'Wife'],
+    'race': ['Asian-Pac-Islander', 'Black', 'White'],
+    'sex': ['Female', 'Male'],
+    'native_country': ['Canada', 'China', 'India', 'Mexico', 'United-States'],
+    'income': ['<=50K', '>50K'],
+}
+
+
+def table_name(index: int) -> str:
+    return f'census_{index}'
+
+
+def column_type(name: str) -> dict:
+    if name in INTEGER_COLUMNS:
+        min, max = INTEGER_COLUMNS[name]
+        return {'name': 'Integer', 'integer': {'base': 'INT64', 'min': str(min), 'max': str(max), 'possible_values': []}, 'properties': {}}
+    return {'name': 'Text UTF-8', 'text': {'encoding': 'UTF-8', 'possible_values': TEXT_COLUMNS[name]}, 'properties': {}}
+
+
+def column_statistics(name: str) -> dict:
+    if name in INTEGER_COLUMNS:
+        min, max = INTEGER_COLUMNS[name]
+        return {'name': 'Integer', 'integer': {'distribution': {'integer': {'min': str(min), 'max': str(max), 'points': []}, 'properties': {}}, 'size': str(TABLE_SIZE), 'multiplicity': 1.0}, 'properties': {}}
+    return {'name': 'Text', 'text': {'distribution': {'integer': {'min': '0', 'max': '0', 'points': []}, 'properties': {}}, 'size': str(TABLE_SIZE), 'multiplicity': 1.0}, 'properties': {}}
+
+
+def synthetic_dataset(n_tables: int) -> Dataset:
+    """Returns a Dataset with n_tables copies of the census table in the bench schema."""
+    columns = list(INTEGER_COLUMNS) + list(TEXT_COLUMNS)
+    dataset = {
+        '@type': 'sarus_data_spec/sarus_data_spec.Dataset',
+        'uuid': generate_uuid().hex,
+        'name': 'Transformed',
+        'spec': {'transformed': {'transform': generate_uuid().hex, 'arguments': [], 'named_arguments': {}}},
+        'properties': {},
+        'doc': 'Synthetic catalog for benchmarking',
+    }
+    tables = [
+        {'name': table_name(index), 'type': {'name': 'Struct', 'struct': {'fields': [{'name': col, 'type': column_type(col)} for col in columns]}, 'properties': {}}}
+        for index in range(n_tables)
+    ]
+    schema = {
+        '@type': 'sarus_data_spec/sarus_data_spec.Schema',
+        'uuid': generate_uuid().hex,
+        'dataset': dataset['uuid'],
+        'name': SCHEMA_NAME,
+        'type': {'name': 'Union', 'union': {'fields': [
+            {'name': SCHEMA_NAME, 'type': {'name': 'Union', 'union': {'fields': tables}, 'properties': {'public_fields': '[]'}}},
+        ]}, 'properties': {'public_fields': '[]'}},
+    }
+    tables_size = [
+        {'name': table_name(index), 'statistics': {'name': 'Struct', 'struct': {'fields': [{'name': col, 'statistics': column_statistics(col)} for col in columns], 'size': str(TABLE_SIZE), 'multiplicity': 1.0}, 'properties': {}}}
+        for index in range(n_tables)
+    ]
+    size = {
+        '@type': 'sarus_data_spec/sarus_data_spec.Size',
+        'uuid': generate_uuid().hex,
+        'dataset': dataset['uuid'],
+        'name': f'{SCHEMA_NAME}_sizes',
+        'statistics': {'name': 'Union', 'union': {'fields': [
+            {'name': SCHEMA_NAME, 'statistics': {'name': 'Union', 'union': {'fields': tables_size}, 'properties': {}}, 'properties': {}},
+        ]}, 'properties': {}},
+        'properties': {},
+    }
+    return Dataset.from_str(json.dumps(dataset), json.dumps(schema), json.dumps(size))
+
+
+def base_queries() -> t.List[str]:
+    with open(QUERIES_PATH, 'r') as f:
+        return [query.strip() for query in f if query.strip() and not query.startswith('--')]
+
+
+def corpus(n_tables: int, n_queries: int) -> t.List[t.Tuple[int, str]]:
+    """Returns n_queries (table index, query) pairs cycling over the base queries and the tables."""
+    queries = base_queries()
+    return [
+        (index % n_tables, re.sub(r'\bcensus\b', f'{SCHEMA_NAME}.{table_name(index % n_tables)}', queries[index % len(queries)]))
+        for index in range(n_queries)
+    ]
+
+
+def privacy_unit(n_tables: int) -> t.List[t.Tuple[str, t.List[t.Tuple[str, str, str]], str]]:
+    return [(table_name(index), [], '_PRIVACY_UNIT_ROW_') for index in range(n_tables)]
+
+
+class Timings:
+    """Collects the timings of the calls of each operation"""
+    def __init__(self) -> None:
+        self.durations: t.Dict[str, t.List[float]] = {}
+        self.errors: t.Dict[str, int] = {}
+
+    def time(self, operation: str, function: t.Callable[[], t.Any]) -> t.Any:
+        self.durations.setdefault(operation, [])
+        self.errors.setdefault(operation, 0)
+        start = time.perf_counter()
+        try:
+            result = function()
+        except RuntimeError:
+            self.errors[operation] += 1
+            return None
+        self.durations[operation].append(time.perf_counter() - start)
+        return result
+
+    def summary(self) -> t.Dict[str, t.Dict[str, float]]:
+        return {
+            operation: {
+                'calls': len(durations),
+                'errors': self.errors[operation],
+                'total': sum(durations),
+                'mean': statistics.mean(durations) if durations else 0.0,
+                'median': statistics.median(durations) if durations else 0.0,
+                'max': max(durations, default=0.0),
+            }
+            for operation, durations in self.durations.items()
+        }
+
+
+def benchmark(n_tables: int, n_queries: int) -> t.Dict[str, t.Any]:
+    """Times the compilation hot paths on a catalog of n_tables tables"""
+    timings = Timings()
+    dataset = timings.time('from_str', lambda: synthetic_dataset(n_tables))
+    queries = corpus(n_tables, n_queries)
+    pu = privacy_unit(n_tables)
+    timings.time('from_queries', lambda: dataset.from_queries(
+        [((SCHEMA_NAME, 'views', f'view_{index}'), query) for (index, (_, query)) in enumerate(queries)]
+    ))
+    for (_, query) in queries:
+        relation: t.Optional[Relation] = timings.time('relation', lambda: dataset.relation(query))
+        if relation is None:
+            continue
+        for dialect in DIALECTS:
+            timings.time(f'to_query[{dialect}]', lambda: relation.to_query(getattr(Dialect, dialect)))
+        timings.time('to_queries', lambda: relation.to_queries([getattr(Dialect, dialect) for dialect in DIALECTS]))
+        timings.time('dot', relation.dot)
+        timings.time('rewrite_as_privacy_unit_preserving', lambda: relation.rewrite_as_privacy_unit_preserving(dataset, pu, EPSILON_DELTA))
+        timings.time('rewrite_with_differential_privacy', lambda: relation.rewrite_with_differential_privacy(dataset, pu, EPSILON_DELTA))
+    return {'tables': n_tables, 'queries': len(queries), 'operations': timings.summary()}
+
+
+def join_query(n_joins: int) -> str:
+    """Returns an aggregation over n_joins + 1 tables joined on age"""
+    joins = ' '.join(
+        f'JOIN (SELECT age AS age_{index} FROM {SCHEMA_NAME}.{table_name(index)}) AS t_{index} ON t_0.age = t_{index}.age_{index}'
+        for index in range(1, n_joins + 1)
+    )
+    return f'SELECT t_0.age, COUNT(*) FROM {SCHEMA_NAME}.{table_name(0)} AS t_0 {joins} GROUP BY t_0.age'
+
+
+def accessors_benchmark(n_joins: int, n_calls: int) -> t.Dict[str, t.Any]:
+    """Times the accessors of the rewriting of a query with n_joins joins"""
+    timings = Timings()
+    dataset = synthetic_dataset(n_joins + 1)
+    relation = dataset.relation(join_query(n_joins))
+    relation_with_dp_event = timings.time('rewrite_with_differential_privacy', lambda: relation.rewrite_with_differential_privacy(
+        dataset, privacy_unit(n_joins + 1), EPSILON_DELTA
+    ))
+    if relation_with_dp_event is not None:
+        for _ in range(n_calls):
+            timings.time('relation_with_dp_event.relation', relation_with_dp_event.relation)
+            timings.time('relation_with_dp_event.dp_event', relation_with_dp_event.dp_event)
+    return {'joins': n_joins, 'calls': n_calls, 'operations': timings.summary()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tables', type=int, nargs='+', default=[10, 100, 1000], help='catalog sizes')
+    parser.add_argument('--queries', type=int, default=len(base_queries()), help='number of queries per catalog')
+    parser.add_argument('--joins', type=int, default=50, help='number of joins of the rewritten query, 0 to skip')
+    parser.add_argument('--calls', type=int, default=1000, help='number of calls of each accessor')
+    parser.add_argument('--output', type=str, default=None, help='JSON output file, defaults to stdout')
+    args = parser.parse_args()
+    results = {
+        'pyqrlew': version('pyqrlew'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'benchmarks': [benchmark(n_tables, args.queries) for n_tables in args.tables],
+        'accessors': accessors_benchmark(args.joins, args.calls) if args.joins > 0 else None,
+    }
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=2)
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
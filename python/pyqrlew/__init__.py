@@ -1,4 +1,21 @@
-from .wrappers import Dataset, Relation, Dialect, Strategy, dataset_from_database
-from pyqrlew import io
-from pyqrlew import tester
+import importlib
+import typing as t
+from .wrappers import Dataset, Relation, Dialect, Strategy, BudgetLedger
 from pyqrlew.typing import *
+
+# `io`, `tester` and `dataset_from_database` import sqlalchemy, pandas or
+# matplotlib, they are only imported on first access
+_LAZY_MODULES = ('io', 'tester')
+
+
+def __getattr__(name: str) -> t.Any:
+    if name in _LAZY_MODULES:
+        return importlib.import_module(f'{__name__}.{name}')
+    if name == 'dataset_from_database':
+        from .database import dataset_from_database
+        return dataset_from_database
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> t.List[str]:
+    return sorted(list(globals()) + list(_LAZY_MODULES) + ['dataset_from_database'])
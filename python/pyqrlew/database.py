@@ -0,0 +1,529 @@
+"""Building Datasets from the tables of a database through sqlalchemy.
+
+This module is imported when `dataset_from_database` or `Dataset.from_database`
+is first used, so that importing pyqrlew does not import sqlalchemy.
+"""
+from dataclasses import dataclass
+import json
+import logging
+import typing as t
+from typing import Optional, Tuple, List, Dict, Union
+from uuid import uuid4 as generate_uuid
+try:
+    import sqlalchemy as sa
+    from sqlalchemy import types
+    from sqlalchemy.engine import Engine
+except ModuleNotFoundError as error:
+    raise ImportError(
+        f"Building a Dataset from a database requires {error.name}, install it with `pip install 'pyqrlew[io]'`"
+    ) from error
+from .wrappers import Dataset
+
+
+MAX_NUMERIC_RANGE = 2**50
+
+
+@dataclass
+class TableType:
+    type_: dict
+    has_admin: bool
+
+
+def dataset_from_database(
+    name: str,
+    engine: Engine,
+    schema_name: Optional[str]=None,
+    ranges: bool=False,
+    possible_values_threshold: Optional[int]=None
+) -> Dataset:
+    """Builds a `Dataset` from a sqlalchemy `Engine`
+
+    Args:
+        name (str):
+            Name of the Dataset
+        engine (Engine):
+            The sqlalchemy `Engine` to use
+        schema_name (Optional[str], optional):
+            The DB schema to use. Defaults to None.
+        ranges (bool, optional):
+            Use the actual min and max of the data as ranges. **This is unsafe from a privacy perspective**. Defaults to False.
+        possible_values_threshold (Optional[int], optional):
+            Use the actual observed values as range. **This is unsafe from a privacy perspective**. Defaults to None.
+
+    Returns:
+        Dataset:
+    """
+
+    metadata = sa.MetaData()
+    metadata.reflect(engine, schema=schema_name)
+
+    def dataset_schema_size() -> Tuple[dict, dict, Optional[dict]]:
+        """Return a (dataset, schema) pair or (dataset, schema, size) triplet """
+        ds = dataset()
+        return (
+            ds,
+            schema(ds),
+            size(ds),
+        )
+
+    def dataset() -> dict:
+        """Returns a Json representation compatible with [Protocol Buffers](https://protobuf.dev/reference/protobuf/google.protobuf/#google.protobuf.Struct)
+        of the dataset
+        """
+        return {
+            '@type': 'sarus_data_spec/sarus_data_spec.Dataset',
+            'uuid': generate_uuid().hex,
+            'name': 'Transformed',
+            'spec': {
+                'transformed': {
+                    'transform': generate_uuid().hex,
+                    'arguments': [],
+                    'named_arguments': {},
+                },
+            },
+            'properties': {},
+            'doc': 'This ia a demo dataset for testing purpose',
+        }
+
+    def schema(dataset: dict) -> dict:
+        """Returns a Json representation compatible with [Protocol Buffers](https://protobuf.dev/reference/protobuf/google.protobuf/#google.protobuf.Struct)
+        of the schema
+        """
+
+        tables_type = [table(metadata.tables[name]) for name in metadata.tables]
+        has_admin = any([tab.has_admin for tab in tables_type])
+
+        tables = {"fields": [tab.type_ for tab in tables_type]}
+
+        if schema_name is not None:
+            tables = {
+                "fields": [{
+                    'name': schema_name,
+                    'type': {
+                        'name': 'Union',
+                        'union': tables,
+                        'properties': {
+                            'public_fields': '[]'
+                        },
+                    }
+                }],
+            }
+
+        sarus_is_public = {
+            "name": "sarus_is_public",
+            "type": {
+                "boolean": {},
+                "name": "Boolean",
+                "properties": {}
+            }
+        }
+
+        sarus_privacy_unit = {
+            "name": "sarus_privacy_unit",
+            "type": {
+                "name": "Optional",
+                "optional": {
+                "type": {
+                    "id": {
+                    "base": "STRING",
+                    "unique": False
+                    },
+                    "name": "Id",
+                    "properties": {}
+                }
+                },
+                "properties": {}
+            }
+        }
+
+        sarus_weights = {
+            "name": "sarus_weights",
+            "type": {
+                "float": {
+                "base": "FLOAT64",
+                "max": 1.7976931348623157e+308,
+                "min": 0.0,
+                "possible_values": []
+                },
+                "name": "Float64",
+                "properties": {}
+            }
+        }
+        if has_admin:
+            return {
+                '@type': 'sarus_data_spec/sarus_data_spec.Schema',
+                'uuid': generate_uuid().hex,
+                'dataset': dataset['uuid'],
+                'name': name,
+                'type': {
+                    # Slugname
+                    'name': name.lower(),
+                    'struct': {
+                        'fields': [
+                            {
+                                'name': 'sarus_data',
+                                'type': {
+                                    'name': 'Union',
+                                    'union': tables,
+                                    'properties': {
+                                        'public_fields': '[]',
+                                    },
+                                },
+                            },
+                            sarus_is_public,
+                            sarus_privacy_unit,
+                            sarus_weights,
+                        ],
+                    },
+                    'properties': {}
+                },
+                'privacy_unit': {
+                    'label': 'sarus_data',
+                    'paths': [],
+                    'properties': {},
+                },
+                'properties': {
+                    'max_max_multiplicity': '1',
+                    'foreign_keys': '',
+                    'primary_keys': '',
+                }
+            }
+        else:
+            return {
+                '@type': 'sarus_data_spec/sarus_data_spec.Schema',
+                'uuid': generate_uuid().hex,
+                'dataset': dataset['uuid'],
+                'name': name,
+                'type': {
+                    'name': 'Union',
+                    'union': tables,
+                    'properties': {
+                        'public_fields': '[]',
+                    },
+                },
+            }
+
+
+    def table(tab: sa.Table) -> TableType:
+        min_max_possible_values = compute_min_max_possible_values(tab)
+        admin_cols = ['sarus_weights', 'sarus_is_public', 'sarus_privacy_unit']
+        col_names = [col.name for col in tab.columns]
+        has_admin = [admin_col in col_names for admin_col in admin_cols]
+        type_ = {
+            'name': tab.name,
+            'type': {
+                'name': 'Struct',
+                'struct': {
+                    'fields': [
+                        column(
+                            col,
+                            min=t.cast(t.Optional[str], min_max_possible_values[col.name]["min"]),
+                            max=t.cast(t.Optional[str], min_max_possible_values[col.name]["max"]),
+                            possible_values=t.cast(t.List[str], min_max_possible_values[col.name]["possible_values"])
+                        ) for col in tab.columns
+                        if col.name not in admin_cols
+                    ],
+                },
+                'properties': {},
+            }
+        }
+        return TableType(type_, all(has_admin))
+
+    def compute_min_max_possible_values(tab: sa.Table) -> Dict[str, Dict[str, Union[t.Optional[str], List[str]]]]:
+        """Send 3 SQL queries for loading the bounds"""
+        values: Dict[str, Dict[str, Union[t.Optional[str], List[str]]]] = {
+            col.name: {
+                'min': None,
+                'max': None,
+                'possible_values': []
+            } for col in tab.columns
+        }
+        intervals_types = [
+            types.Integer, types.BigInteger,
+            types.Float, types.Numeric,
+            types.String, types.Text, types.Unicode, types.UnicodeText,
+            types.Date, types.DateTime, types.Time
+        ]
+        interval_cols = [
+            col for col in tab.columns
+            if any(isinstance(col.type, t) for t in intervals_types)
+        ]
+
+        if ranges and len(interval_cols) != 0:
+            min_query = sa.select(*[sa.func.cast(sa.func.min(col), sa.String).label(col.name) for col in interval_cols]).select_from(tab)
+            max_query = sa.select(*[sa.func.cast(sa.func.max(col), sa.String).label(col.name) for col in interval_cols]).select_from(tab)
+
+            with engine.connect() as conn:
+                min_results = conn.execute(min_query).fetchone()
+                max_results = conn.execute(max_query).fetchone()
+
+            for col, min_val, max_val in zip(
+                    interval_cols, t.cast(t.Iterable[t.Any], min_results), t.cast(t.Iterable[t.Any], max_results)
+                ):
+                values[col.name]['min'] = min_val
+                values[col.name]['max'] = max_val
+
+        if possible_values_threshold is not None and len(interval_cols) != 0:
+            tablename = f"\"{tab.name}\"" if tab.schema is None else f"\"{tab.schema}\".\"{tab.name}\""
+            values_query = sa.text(
+                "SELECT " + ','.join([
+                    f"CASE WHEN COUNT(DISTINCT \"{col.name}\") <= {possible_values_threshold} "
+                    f"THEN array_agg(DISTINCT CAST(\"{col.name}\" AS Text)) ELSE ARRAY[]::VARCHAR[] "
+                    f"END AS \"{col.name}\" "
+                    for col in interval_cols
+                ])
+                + f"FROM {tablename}"
+            ) # case very complicate to use with loop
+
+            with engine.connect() as conn:
+                values_results = conn.execute(values_query).fetchone()
+
+            for col, possible_values in zip(interval_cols, t.cast(t.Iterable[t.Any], values_results)):
+                values[col.name]['possible_values'] = [str(v) for v in possible_values]
+
+        return values
+
+    def column(col: sa.Column, min:Optional[str]=None, max:Optional[str]=None, possible_values:List[str]=[]) -> dict:
+        if isinstance(col.type, types.Integer) or isinstance(col.type, types.BigInteger):
+            min = '-9223372036854775808' if min is None else min
+            max = '9223372036854775807' if max is None else max
+            return {
+                'name': col.name,
+                'type': {
+                    'name': 'Integer',
+                    'integer': {
+                        'base': 'INT64',
+                        'min': min,
+                        'max': max,
+                        'possible_values': possible_values,
+                    },
+                    'properties': {},
+                },
+            }
+        elif isinstance(col.type, types.Float) or isinstance(col.type, types.Numeric):
+            min = f'{-MAX_NUMERIC_RANGE}' if min is None else min
+            max = f'{MAX_NUMERIC_RANGE}' if max is None else max
+            return {
+                'name': col.name,
+                'type': {
+                    'name': 'Float64',
+                    'float': {
+                        'base': 'FLOAT64',
+                        'min': min,
+                        'max': max,
+                        'possible_values': [],
+                    },
+                    'properties': {},
+                },
+            }
+        elif isinstance(col.type, types.String) or isinstance(col.type, types.Text) or isinstance(col.type, types.Unicode) or isinstance(col.type, types.UnicodeText):
+
+            return {
+                'name': col.name,
+                'type': {
+                    'name': 'Text UTF-8',
+                    'text': {
+                        'encoding': 'UTF-8',
+                        'min': min,
+                        'max': max,
+                        'possible_values': possible_values,
+                    },
+                    'properties': {},
+                },
+            }
+        elif isinstance(col.type, types.Boolean):
+            return {
+                'name': col.name,
+                'type': {
+                    'name': 'Boolean',
+                    'boolean': {},
+                    'properties': {},
+                },
+            }
+        elif isinstance(col.type, types.Date) or isinstance(col.type, types.DateTime) or isinstance(col.type, types.Time):
+            min = '01-01-01 00:00:00' if min is None else min
+            max = '9999-12-31 00:00:00' if max is None else max
+            return {
+                'name': col.name,
+                'type': {
+                    'name': 'Datetime',
+                    'datetime': {
+                        'format': '%Y-%m-%d %H:%M:%S',
+                        'min': min,
+                        'max': max,
+                    },
+                    'properties': {},
+                },
+            }
+        else:
+            return {
+                'name': col.name,
+                'type': {
+                    'name': 'Type',
+                    'type': {},
+                    'properties': {},
+                },
+            }
+
+    def size(dataset: dict) -> dict:
+        tables = {'fields': [table_size(metadata.tables[name]) for name in metadata.tables]}
+        if schema_name is not None:
+            tables = {
+                'fields': [
+                    {
+                        'name': schema_name,
+                        'statistics': {
+                            'name': 'Union',
+                            'union': tables,
+                            'properties': {},
+                        },
+                        'properties': {},
+                    },
+                ],
+            }
+
+        return {
+            '@type': 'sarus_data_spec/sarus_data_spec.Size',
+            'uuid': generate_uuid().hex,
+            'dataset': dataset['uuid'],
+            'name': f'{name}_sizes',
+            'statistics': {
+                'name': 'Union',
+                'union': tables,
+                'properties': {},
+            },
+            'properties': {},
+        }
+
+    def table_size(tab: sa.Table) -> dict:
+        with engine.connect() as conn:
+            result = conn.execute(sa.select(sa.func.count()).select_from(tab))
+            size = t.cast(int, result.scalar())
+        multiplicity = 1.0
+        return {
+            'name': tab.name,
+            'statistics': {
+                'name': 'Struct',
+                'struct': {
+                    'fields': [column_size(col, size, multiplicity) for col in tab.columns],
+                    'size': str(size),
+                    'multiplicity': multiplicity,
+                },
+                'properties': {},
+            }
+        }
+
+    def column_size(col: sa.Column, size: int, multiplicity: float) -> dict:
+        if isinstance(col.type, types.Integer) or isinstance(col.type, types.BigInteger):
+            return {
+                'name': col.name,
+                'statistics': {
+                    "integer": {
+                        "distribution": {
+                            "integer": {
+                                "max": "9223372036854775807",
+                                "min": "-9223372036854775808",
+                                "points": []
+                            },
+                            "properties": {}
+                            },
+                        "multiplicity": multiplicity,
+                        "size": size
+                    },
+                    "name": "Integer",
+                    "properties": {}
+                }
+            }
+        elif isinstance(col.type, types.Float) or isinstance(col.type, types.Numeric):
+            return {
+                'name': col.name,
+                'statistics': {
+                    "float": {
+                        "distribution": {
+                            "double": {
+                                "max": f'{MAX_NUMERIC_RANGE}',
+                                "min": f'{-MAX_NUMERIC_RANGE}',
+                                "points": []
+                            },
+                            "properties": {}
+                            },
+                        "multiplicity": multiplicity,
+                        "size": size
+                    },
+                    "name": "Float",
+                    "properties": {}
+                }
+            }
+        elif isinstance(col.type, types.String) or isinstance(col.type, types.Text) or isinstance(col.type, types.Unicode) or isinstance(col.type, types.UnicodeText):
+            return {
+                'name': col.name,
+                'statistics': {
+                    "text": {
+                        "distribution": {
+                            "integer": {
+                                "max": "9223372036854775807",
+                                "min": "-9223372036854775808",
+                                "points": []
+                            },
+                            "properties": {}
+                            },
+                        "multiplicity": multiplicity,
+                        "size": size
+                    },
+                    "name": "Text",
+                    "properties": {}
+                }
+            }
+
+        elif isinstance(col.type, types.Boolean):
+            return {
+                'name': col.name,
+                'statistics': {
+                    "boolean": {
+                        "distribution": {
+                            "integer": {
+                                "max": "9223372036854775807",
+                                "min": "-9223372036854775808",
+                                "points": []
+                            },
+                            "properties": {}
+                            },
+                        "multiplicity": multiplicity,
+                        "size": size
+                    },
+                    "name": "Boolean",
+                    "properties": {}
+                }
+            }
+        elif isinstance(col.type, types.Date) or isinstance(col.type, types.DateTime) or isinstance(col.type, types.Time):
+            return {
+                'name': col.name,
+                'statistics': {
+                    "datetime": {
+                        "distribution": {
+                            "integer": {
+                                "max": "9223372036854775807",
+                                "min": "-9223372036854775808",
+                                "points": []
+                            },
+                            "properties": {}
+                            },
+                        "multiplicity": multiplicity,
+                        "size": size
+                    },
+                    "name": "Datetime",
+                    "properties": {}
+                }
+            }
+
+        else: # TODO: support more types
+            raise NotImplementedError(f"SQL -> Sarus Conversion not supported for {col.type} SQL type")
+
+    # Gather protobufs
+    dataset_dict, schema_dict, size_dict = dataset_schema_size()
+    # Display when debugging
+    logging.debug(json.dumps(dataset_dict))
+    logging.debug(json.dumps(schema_dict))
+    logging.debug(json.dumps(size_dict))
+    # Return the result
+    return Dataset.from_str(json.dumps(dataset_dict), json.dumps(schema_dict), json.dumps(size_dict))
@@ -0,0 +1,114 @@
+"""Bounded thread pool running the compilation and rewriting calls of pyqrlew
+for asyncio applications.
+
+The Rust layer releases the GIL while compiling and rewriting, so the calls run
+in parallel on the pool threads while the event loop keeps serving. The number
+of calls submitted by each event loop is bounded: when it is reached, new calls
+wait for a slot before being queued, which gives backpressure to the callers.
+
+Cancelling a call that is still waiting or queued removes it. A call already
+running on a thread runs to completion and its result is discarded.
+
+Example
+----------
+    >>> from pyqrlew.executor import configure_executor
+    >>> configure_executor(max_workers=8, max_pending=64)
+    >>> relation = await dataset.arelation("SELECT AVG(age) FROM extract.census")
+"""
+import asyncio
+import functools
+import os
+import threading
+import typing as t
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+T = t.TypeVar('T')
+
+
+class Executor:
+    """A thread pool with a bound on the calls submitted by each event loop.
+
+    Args:
+        max_workers (Optional[int]): number of threads, defaults to the number
+            of CPUs.
+        max_pending (Optional[int]): maximum number of calls queued or running
+            per event loop, defaults to 4 times the number of threads.
+    """
+    def __init__(self, max_workers: t.Optional[int]=None, max_pending: t.Optional[int]=None) -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.max_workers
+        if self.max_pending < 1:
+            raise ValueError('max_pending should be positive')
+        self.pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='pyqrlew')
+        self._semaphores: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]' = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._shut_down = False
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._semaphores:
+                self._semaphores[loop] = asyncio.Semaphore(self.max_pending)
+            return self._semaphores[loop]
+
+    async def run(self, function: t.Callable[..., T], *args: t.Any, **kwargs: t.Any) -> T:
+        """Runs function(*args, **kwargs) on the pool and returns its result."""
+        async with self._semaphore():
+            with self._lock:
+                future = None if self._shut_down else self.pool.submit(functools.partial(function, *args, **kwargs))
+            if future is None:
+                # The executor was replaced while this call waited for a slot
+                current = get_executor()
+                if current is self:
+                    raise RuntimeError('the executor is shut down')
+                return await current.run(function, *args, **kwargs)
+            return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool=True) -> None:
+        """Shuts the pool down once its queued and running calls are done.
+        Calls submitted afterwards run on the executor of pyqrlew."""
+        with self._lock:
+            self._shut_down = True
+        self.pool.shutdown(wait=wait)
+
+
+_executor: t.Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+def configure_executor(max_workers: t.Optional[int]=None, max_pending: t.Optional[int]=None) -> Executor:
+    """Replaces the executor used by the async methods of pyqrlew.
+    The previous executor finishes its queued and running calls in the
+    background, the calls still waiting for one of its slots run on the new one.
+
+    Args:
+        max_workers (Optional[int]): number of threads, defaults to the number
+            of CPUs.
+        max_pending (Optional[int]): maximum number of calls queued or running
+            per event loop, defaults to 4 times the number of threads.
+
+    Returns:
+        Executor:
+    """
+    global _executor
+    with _executor_lock:
+        previous, _executor = _executor, Executor(max_workers, max_pending)
+    if previous is not None:
+        previous.shutdown(wait=False)
+    return _executor
+
+
+def get_executor() -> Executor:
+    """Returns the executor used by the async methods of pyqrlew, creating a
+    default one if needed."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = Executor()
+        return _executor
+
+
+async def run(function: t.Callable[..., T], *args: t.Any, **kwargs: t.Any) -> T:
+    """Runs function(*args, **kwargs) on the executor of pyqrlew."""
+    return await get_executor().run(function, *args, **kwargs)
@@ -1,9 +1,13 @@
 import types
 import sys
-from pyqrlew.io.postgresql import PostgreSQL, dataset_from_database
-from pyqrlew.io.sqlite import SQLite
-
-from pyqrlew.io.utils import *
+try:
+    from pyqrlew.io.postgresql import PostgreSQL, dataset_from_database
+    from pyqrlew.io.sqlite import SQLite
+    from pyqrlew.io.utils import *
+except ModuleNotFoundError as error:
+    raise ImportError(
+        f"pyqrlew.io requires {error.name}, install it with `pip install 'pyqrlew[io]'`"
+    ) from error
 
 # This is for compatibility with existing notebooks where we do:
 # from pyqrlew.io.dataset import dataset_from_database
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import typing as t
+import weakref
+import sqlalchemy
+from pyqrlew import Relation
+
+if t.TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class AsyncDatabase:
+    """
+    A mixin adding async evaluation to a database, through the asyncio
+    extension of SQLAlchemy.
+
+    Queries share a pool of connections per event loop, so that many queries
+    can be evaluated concurrently without a thread per query. It requires
+    SQLAlchemy with its asyncio extra and an async driver for the database
+    (e.g. aiosqlite or asyncpg).
+
+    Example
+    ----------
+        >>> results = await asyncio.gather(*(qdb.aeval(relation) for relation in relations))
+    """
+    async_pool_size: int = 5
+    async_max_overflow: int = 10
+
+    def async_url(self) -> str:
+        """Get the URL string of the database for an async driver."""
+        raise NotImplementedError()
+
+    def async_engine(self) -> 'AsyncEngine':
+        """Return the SQLAlchemy AsyncEngine of the database for the running
+        event loop, creating it on first use. Its connections are pooled
+        (except for SQLite, which keeps the default pool of its driver)."""
+        if not hasattr(self, '_async_engines'):
+            self._async_engines: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncEngine]' = weakref.WeakKeyDictionary()
+            self._async_engines_lock = threading.Lock()
+        loop = asyncio.get_running_loop()
+        with self._async_engines_lock:
+            if loop not in self._async_engines:
+                try:
+                    from sqlalchemy.ext.asyncio import create_async_engine
+                    url = sqlalchemy.engine.make_url(self.async_url())
+                    # SQLite drivers do not use a QueuePool, which is the
+                    # only pool accepting these arguments
+                    pool_arguments = {} if url.get_backend_name() == 'sqlite' else {
+                        'pool_size': self.async_pool_size,
+                        'max_overflow': self.async_max_overflow,
+                    }
+                    self._async_engines[loop] = create_async_engine(url, **pool_arguments)
+                except ImportError as error:
+                    raise ImportError(
+                        f"Async evaluation requires sqlalchemy[asyncio] and an async driver for {self.async_url()}"
+                    ) from error
+            return self._async_engines[loop]
+
+    async def aexecute(self, query: str) -> t.Sequence[list]:
+        """Execute a raw SQL query and return the result, without blocking the event loop."""
+        async with self.async_engine().connect() as conn:
+            result = (await conn.execute(sqlalchemy.text(query))).all()
+        return t.cast(t.Sequence[list], result)
+
+    async def aeval(self, relation: Relation) -> t.Sequence[list]:
+        """Convert a PyQrlew relation into a sql query string, send it to the
+        database and return the result, without blocking the event loop."""
+        return await self.aexecute(await relation.ato_query(None))
+
+    async def adispose(self) -> None:
+        """Close the pooled connections of the running event loop."""
+        engines = getattr(self, '_async_engines', {})
+        engine = engines.pop(asyncio.get_running_loop(), None)
+        if engine is not None:
+            await engine.dispose()
@@ -2,6 +2,7 @@ import os
 import sqlalchemy
 from qrlew_datasets.database import Database  # type: ignore  #module is installed, but missing library stubs or py.typed marker 
 from pyqrlew import Dataset, Relation, dataset_from_database
+from pyqrlew.io.async_database import AsyncDatabase
 import pandas as pd # type: ignore
 import typing as t
 
@@ -16,7 +17,7 @@ dtype_to_sqlalchemy = {
 }
 
 
-class SQLite(Database):
+class SQLite(AsyncDatabase, Database):
     """
     A class representing an SQLite database with PyQrlew integration.
 
@@ -42,6 +43,8 @@ class SQLite(Database):
         >>> relation = qdb.dataset().sql(query)
         >>> qdb.eval(relation)
         [(3,)]
+        >>> await qdb.aeval(relation) # requires aiosqlite
+        [(3,)]
     """
 
     def __init__(self, db_file:str, ranges: bool) -> None:
@@ -117,6 +120,10 @@ class SQLite(Database):
         """Get the URL string of the SQLite database."""
         return f'sqlite:///{self.db_file}'
 
+    def async_url(self) -> str:
+        """Get the URL string of the SQLite database for the aiosqlite driver."""
+        return f'sqlite+aiosqlite:///{self.db_file}'
+
     def remove(self) -> None:
         """Remove the SQLite database file from the filesystem."""
         os.remove(self.db_file)
@@ -0,0 +1,57 @@
+"""Opt-in profiling of the compilation stages of pyqrlew.
+
+The stages run by the Rust layer (``relations``, ``parse``, ``with_relations``,
+``translate``, ``dataset``, ``rewrite``, ``render``, ``optimize``, ``compact``
+and ``print``) are recorded with their wall time and allocation counts. The
+``optimize`` and ``compact`` stages only run when `to_query` is asked to.
+
+Example
+----------
+    >>> from pyqrlew.profiling import profile
+    >>> with profile() as stages:
+    >>>     relation = dataset.relation("SELECT AVG(age) FROM extract.census")
+    >>>     query = relation.to_query()
+    >>> [stage['stage'] for stage in stages]
+    ['relations', 'parse', 'with_relations', 'translate', 'render', 'print']
+"""
+import typing as t
+from contextlib import contextmanager
+from .pyqrlew import start_profiling, stop_profiling
+
+Stage = t.Dict[str, t.Union[str, float, int]]
+
+
+@contextmanager
+def profile(callback: t.Optional[t.Callable[[Stage], None]]=None) -> t.Iterator[t.List[Stage]]:
+    """Records the compilation stages run by the current thread in the context.
+
+    Stages are recorded in the order they end, so nested stages come before the
+    stage containing them. Profiling contexts cannot be nested: entering a
+    context while the thread is already profiling raises a RuntimeError.
+
+    Args:
+        callback (Optional[Callable[[Dict], None]]): called with each recorded
+            stage when leaving the context, e.g. to export it to a metrics stack.
+
+    Yields:
+        List[Dict]: the recorded stages, filled when leaving the context.
+            Each stage is a dict with the `stage` name, its `duration` in seconds,
+            its number of `allocations` and its `allocated_bytes`.
+    """
+    stages: t.List[Stage] = []
+    start_profiling()
+    try:
+        yield stages
+    finally:
+        stages.extend(
+            {
+                'stage': name,
+                'duration': duration,
+                'allocations': allocations,
+                'allocated_bytes': allocated_bytes,
+            }
+            for (name, duration, allocations, allocated_bytes) in stop_profiling()
+        )
+    if callback is not None:
+        for stage in stages:
+            callback(stage)
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import os
 import typing as t
 import enum
 
@@ -7,19 +8,32 @@ from pyqrlew.typing import PrivacyUnit, SyntheticData
 class _Dataset:
     """Class that ...."""
     def __new__(self, dataset: str, schema: str, size: str) -> '_Dataset': ...
+    @staticmethod
+    def from_files(dataset: t.Union[str, os.PathLike], schema: t.Union[str, os.PathLike], size: t.Optional[t.Union[str, os.PathLike]]=None) -> '_Dataset': ...
+    @staticmethod
+    def from_bytes(dataset: bytes, schema: bytes, size: t.Optional[bytes]=None) -> '_Dataset': ...
+    def to_bytes(self) -> t.Tuple[bytes, bytes, t.Optional[bytes]]: ...
     @property
     def schema(self) -> str: ...
     @property
     def size(self) -> t.Optional[str]: ...
+    def schema_dict(self) -> t.Dict[str, t.Any]: ...
+    def size_dict(self) -> t.Optional[t.Dict[str, t.Any]]: ...
     def with_range(self, schema_name: t.Optional[str], table_name: str, field_name: str, min: float, max: float) -> '_Dataset': ...
     def with_possible_values(self, schema_name: t.Optional[str], table_name: str, field_name: str, possible_values: t.Iterable[str]) -> '_Dataset': ...
     def with_constraint(self, schema_name: t.Optional[str], table_name: str, field_name: str, constraint: t.Optional[str]) -> '_Dataset': ...
     def relations(self) -> t.Iterable[t.Tuple[t.List[str], '_Relation']]: ...
+    def iter_relations(self) -> '_RelationsIterator': ...
     def relation(self, query: str, dialect: t.Optional['Dialect']) -> '_Relation': ...
     def from_queries(self, queries: t.Iterable[t.Tuple[t.Iterable[str], str]], dialect: t.Optional['Dialect']) -> '_Dataset': ...
     def __str__(self) -> str: ...
 
 
+class _RelationsIterator:
+    def __iter__(self) -> '_RelationsIterator': ...
+    def __next__(self) -> t.Tuple[t.List[str], '_Relation']: ...
+
+
 class _Relation:
     """Class that... """
     @staticmethod
@@ -28,7 +42,10 @@ class _Relation:
     def dot(self) -> str: ...
     def schema(self) -> str: ...
     def type_(self) -> str: ...
-    def to_query(self, dialect: t.Optional['Dialect']=None) -> str: ...
+    def type_dict(self) -> t.Dict[str, t.Any]: ...
+    def to_query(self, dialect: t.Optional['Dialect']=None, compact: bool=False, optimize: bool=False) -> str: ...
+    def write_query(self, file: t.Any, dialect: t.Optional['Dialect']=None, compact: bool=False, optimize: bool=False) -> int: ...
+    def to_queries(self, dialects: t.Sequence['Dialect']) -> t.Dict['Dialect', str]: ...
     def rewrite_as_privacy_unit_preserving(
         self,
         dataset: _Dataset,
@@ -53,6 +70,7 @@ class _Relation:
     def with_field(self, name: str, expr: str) -> '_Relation': ...
     def rename_fields(self, fields: t.Iterable[t.Tuple[str, str]])  -> '_Relation': ...
     def compose(self, relations: t.Iterable[t.Tuple[t.Iterable[str], '_Relation']]) -> '_Relation': ...
+    def memory_usage(self) -> t.Mapping[str, int]: ...
 
 class _RelationWithDpEvent:
     def relation(self) -> _Relation: ...
@@ -62,6 +80,31 @@ class _RelationWithDpEvent:
 class DpEvent:
     def to_dict(self) -> t.Mapping[str, t.Union[str, float]]: ...
     def to_named_tuple(self) -> t.NamedTuple: ...
+    def epsilon_for_delta(self, delta: float, accountant: t.Optional[str]=None) -> float: ...
+    @staticmethod
+    def compose(events: t.Sequence['DpEvent']) -> 'DpEvent': ...
+
+
+class BudgetLedger:
+    """A privacy budget and the running RDP composition of the DpEvents charged to it."""
+    def __new__(self, epsilon: float, delta: float) -> 'BudgetLedger': ...
+    def __str__(self) -> str: ...
+    @property
+    def epsilon(self) -> float: ...
+    @property
+    def delta(self) -> float: ...
+    @property
+    def events(self) -> int: ...
+    def spent_epsilon(self) -> float: ...
+    def epsilon_after(self, dp_event: DpEvent) -> float: ...
+    def can_afford(self, dp_event: DpEvent) -> bool: ...
+    def charge(self, dp_event: DpEvent) -> float: ...
+    def to_json(self) -> str: ...
+    @staticmethod
+    def from_json(ledger: str) -> 'BudgetLedger': ...
+    def save(self, path: str) -> None: ...
+    @staticmethod
+    def load(path: str) -> 'BudgetLedger': ...
 
 
 class Dialect(enum.Enum):
@@ -80,3 +123,9 @@ class Strategy(enum.Enum):
 
 
 def tables_prefix(query: str, dialect: 'Dialect') -> t.List[str]: ...
+def tables_prefix_many(queries: t.Sequence[str], dialect: 'Dialect') -> t.Tuple[t.List[t.Optional[t.List[str]]], t.List[t.Optional[str]]]: ...
+def fingerprint(query: str, dialect: t.Optional['Dialect']=None) -> t.Tuple[str, str, t.List[str]]: ...
+def fingerprint_many(queries: t.Sequence[str], dialect: t.Optional['Dialect']=None) -> t.Tuple[t.List[t.Optional[str]], t.List[t.Optional[str]], t.List[t.Optional[t.List[str]]], t.List[t.Optional[str]]]: ...
+
+def start_profiling() -> None: ...
+def stop_profiling() -> t.List[t.Tuple[str, float, int, int]]: ...
@@ -1,3 +1,8 @@
-from .stochatic_dataset import *
-from .tester import StochasticTester
-from .utils import *
+try:
+    from .stochatic_dataset import *
+    from .tester import StochasticTester
+    from .utils import *
+except ModuleNotFoundError as error:
+    raise ImportError(
+        f"pyqrlew.tester requires {error.name}, install it with `pip install 'pyqrlew[tester]'`"
+    ) from error
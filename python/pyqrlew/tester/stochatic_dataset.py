@@ -8,6 +8,29 @@ from sqlalchemy import text
 from enum import Enum
 import typing as t
 
+SeedLike = t.Union[None, int, np.random.SeedSequence, np.random.Generator]
+
+# Statements seeding the random() calls of a connection, by SQLAlchemy dialect name
+SEED_STATEMENTS: t.Dict[str, str] = {
+    'postgresql': "SELECT setseed(:seed)",
+}
+
+
+def seed_sequence(seed: SeedLike = None) -> np.random.SeedSequence:
+    """Returns a SeedSequence from a seed, a SeedSequence or a Generator.
+    A Generator is consumed to draw the entropy of the new SeedSequence."""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    if isinstance(seed, np.random.Generator):
+        return np.random.SeedSequence(int(seed.integers(2**63)))
+    return np.random.SeedSequence(seed)
+
+
+def spawn_generators(seed: SeedLike, n: int) -> List[np.random.Generator]:
+    """Spawns n independent Generators from a seed, e.g. one per worker."""
+    return [np.random.default_rng(child) for child in seed_sequence(seed).spawn(n)]
+
+
 class Distribution(Enum):
     LAPLACE = "laplace"
     UNIFORM = "uniform"
@@ -26,16 +49,17 @@ class StochasticDatabase:
         db = EmptyPostgreSQL(dbname, user, password, port)
         self.schema_name = schema_name
         self.engine = db.engine()
-        with self.engine.connect() as connection:
-            connection.execute(f"CREATE SCHEMA IF NOT EXISTS {schema_name}")
+        with self.engine.begin() as connection:
+            connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema_name}"))
 
-    def create_table(self, name: str, size: int, column_specs: List[ColumnSpec], index_is_unique:bool=True) -> t.Optional[int]:
-        data = RandomTableGenerator(size).create_table(column_specs)
+    def create_table(self, name: str, size: int, column_specs: List[ColumnSpec], index_is_unique:bool=True, seed: SeedLike=None) -> t.Optional[int]:
+        rng = np.random.default_rng(seed)
+        data = RandomTableGenerator(size, rng).create_table(column_specs)
         if index_is_unique:
             data["id"] = np.arange(size)
         else:
             data["id"] = [
-                int(np.random.normal(loc = size / 2, scale = size / 4))
+                int(rng.normal(loc = size / 2, scale = size / 4))
                 for _ in range(size)
             ]
         return data.to_sql(name, schema=self.schema_name, con=self.engine, if_exists='replace', index=False)
@@ -43,17 +67,26 @@ class StochasticDatabase:
     def dataset(self) -> qrl.Dataset:
         return dataset_from_database(self.schema_name, self.engine, self.schema_name)
 
-    def eval(self, relation: qrl.Relation) -> list:
-        return self.execute(relation.to_query(None))
+    def eval(self, relation: qrl.Relation, seed: t.Optional[float]=None) -> list:
+        return self.execute(relation.to_query(None), seed)
 
-    def execute(self, query: str) -> list:
+    def execute(self, query: str, seed: t.Optional[float]=None) -> list:
+        """Executes the query. If a seed in [-1, 1] is given, the random()
+        calls of the query are seeded with it, making the result reproducible.
+        Seeding is only supported by the dialects of SEED_STATEMENTS."""
         with self.engine.connect() as conn:
+            if seed is not None:
+                dialect = self.engine.dialect.name
+                if dialect not in SEED_STATEMENTS:
+                    raise NotImplementedError(f"Seeding the random() calls of {dialect} is not supported")
+                conn.execute(text(SEED_STATEMENTS[dialect]), {"seed": seed})
             result = conn.execute(text(query)).all()
         return list(result)
 
 class RandomTableGenerator:
-    def __init__(self, size: int) -> None:
+    def __init__(self, size: int, rng: SeedLike=None) -> None:
         self.size = size
+        self.rng = np.random.default_rng(rng)
 
     def create_table(self, column_specs: List[ColumnSpec]) -> pd.DataFrame:
         table_data = {
@@ -69,11 +102,11 @@ class RandomTableGenerator:
 
         random_numbers: np.ndarray = np.zeros(self.size)
         if distribution == Distribution.LAPLACE:
-            random_numbers =  np.random.laplace(**kwargs, size=self.size)
+            random_numbers =  self.rng.laplace(**kwargs, size=self.size)
         elif distribution == Distribution.UNIFORM:
-            random_numbers =  np.random.uniform(**kwargs, size=self.size)
+            random_numbers =  self.rng.uniform(**kwargs, size=self.size)
         elif distribution == Distribution.GAUSSIAN:
-            random_numbers =  np.random.normal(**kwargs, size=self.size)
+            random_numbers =  self.rng.normal(**kwargs, size=self.size)
         elif distribution == Distribution.HALTON:
             random_numbers =  self.halton_sequence(**t.cast(dict[str, int], kwargs))
         if  nan_probability > 0:
@@ -1,21 +1,28 @@
 import typing as t
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pyqrlew as qrl
-import qrlew_datasets.database as db  # type: ignore   #module is installed, but missing library stubs or py.typed marker 
 from pyqrlew.typing import PrivacyUnit, SyntheticData
+from .stochatic_dataset import SeedLike, StochasticDatabase, seed_sequence
 
 
 class StochasticTester:
     def __init__(
             self,
-            database: db.Database,
+            database: StochasticDatabase,
             delta: float,
             privacy_unit: PrivacyUnit,
-            synthetic_data: SyntheticData
+            synthetic_data: SyntheticData,
+            seed: SeedLike=None,
         ) -> None:
+        """If a seed is given, each simulation seeds the database random
+        number generator from its own child of the seed sequence. The results
+        are then reproducible and do not depend on the number of workers."""
         self.database = database
         self.delta = delta
         self.privacy_unit = privacy_unit
         self.synthetic_data = synthetic_data
+        self.seed_sequence = None if seed is None else seed_sequence(seed)
 
     def compute_dp_relation(self, query: str, epsilon: float) -> qrl.Relation:
         budget = {"epsilon": epsilon, "delta": self.delta}
@@ -29,11 +36,32 @@ class StochasticTester:
         )
         return t.cast(qrl.Relation, relation_with_privatequeries.relation())
 
+    def simulation_seeds(self, n_sim: int) -> t.List[t.Optional[float]]:
+        """Returns one seed in [-1, 1] per simulation, or None if not seeded."""
+        if self.seed_sequence is None:
+            return [None] * n_sim
+        return [
+            float(child.generate_state(1, dtype=np.uint64)[0]) / 2**64 * 2 - 1
+            for child in self.seed_sequence.spawn(n_sim)
+        ]
+
+    def simulate(self, dp_relation: qrl.Relation, n_sim: int, n_workers: int=1) -> list:
+        """Evaluates n_sim times the DP relation, with n_workers parallel workers."""
+        def evaluate(seed: t.Optional[float]) -> t.Any:
+            return self.database.eval(dp_relation, seed=seed)[0][0]
+
+        seeds = self.simulation_seeds(n_sim)
+        if n_workers <= 1:
+            return [evaluate(seed) for seed in seeds]
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            return list(executor.map(evaluate, seeds))
+
     def utility_per_epsilon(
             self,
             query: str,
             epsilons: t.List[float],
-            n_sim: int
+            n_sim: int,
+            n_workers: int=1
         ) -> t.Dict[float, list]:
 
         print('computing utility per epsilon ...')
@@ -43,10 +71,7 @@ class StochasticTester:
         }
         print('done')
         return {
-            epsilon: [
-                self.database.eval(dp_relation)[0][0]
-                for _ in range(n_sim)
-            ]
+            epsilon: self.simulate(dp_relation, n_sim, n_workers)
             for epsilon, dp_relation in relations.items()
         }
 
@@ -54,10 +79,8 @@ class StochasticTester:
             self,
             query: str,
             epsilon: float,
-            n_sim: int
+            n_sim: int,
+            n_workers: int=1
         ) -> list:
         dp_relation = self.compute_dp_relation(query, epsilon)
-        return [
-            self.database.eval(dp_relation)[0][0]
-            for _ in range(n_sim)
-        ]
\ No newline at end of file
+        return self.simulate(dp_relation, n_sim, n_workers)
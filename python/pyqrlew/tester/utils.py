@@ -2,7 +2,7 @@ import numpy as np
 from typing import List, Callable, Union
 import typing as t
 import textwrap
-from .stochatic_dataset import StochasticDatabase
+from .stochatic_dataset import StochasticDatabase, SeedLike
 from .tester import StochasticTester
 import pandas as pd # type: ignore
 
@@ -83,25 +83,27 @@ def save_data(filename: str, arr_ref: List[float], arr_adj: List[List[float]]) -
     df.to_csv(filename, index=False)
     print(f"file {filename} written.")
 
-def run_test(database: StochasticDatabase, stochastic_tester: StochasticTester, query: str, adj_query_func: Callable[[int], str], name: str, n_sim: int)-> None:
+def run_test(database: StochasticDatabase, stochastic_tester: StochasticTester, query: str, adj_query_func: Callable[[int], str], name: str, n_sim: int, seed: SeedLike=None, n_workers: int=1)-> None:
     if plt is None:
         raise ModuleNotFoundError
+    rng = np.random.default_rng(seed)
     print(f"Query = {query}")
-    dp_results = stochastic_tester.utility_per_epsilon(query, epsilons=[1., 5., 10.], n_sim=n_sim)
+    dp_results = stochastic_tester.utility_per_epsilon(query, epsilons=[1., 5., 10.], n_sim=n_sim, n_workers=n_workers)
     true_res = database.execute(query)[0][0]
     plt.figure(figsize=(6, 15))
     plt.subplot(3, 1, 1)
     plot_utility(dp_results=dp_results, true_res=true_res)
 
     epsilon = 1.
-    ref_res = stochastic_tester.compute_results(query, epsilon=epsilon, n_sim=n_sim)
+    ref_res = stochastic_tester.compute_results(query, epsilon=epsilon, n_sim=n_sim, n_workers=n_workers)
     adj_res = [
         stochastic_tester.compute_results(
             adj_query_func(int(i)),
             epsilon=epsilon,
-            n_sim=n_sim
+            n_sim=n_sim,
+            n_workers=n_workers
         )
-        for i in [np.random.uniform(0, 100) for _ in range(10)]
+        for i in rng.uniform(0, 100, size=10)
     ]
     save_data(f"{name}.txt", ref_res, adj_res)
 
@@ -26,3 +26,15 @@ class DpEvent(t.Protocol):
         """Returns NamedTuple of DP mechanisms compatible with `dp-accounting`
         """
         ...
+
+    def epsilon_for_delta(self, delta: float, accountant: t.Optional[str]=None) -> float:
+        """Returns the epsilon of the DP mechanisms for a given delta.
+        The accountant is either `rdp` (default) or `basic`, the accounting
+        is done natively, without going through `dp-accounting`.
+        """
+        ...
+
+    @staticmethod
+    def compose(events: t.Sequence['DpEvent']) -> 'DpEvent':
+        """Returns the composition of DP mechanisms."""
+        ...
@@ -3,7 +3,13 @@ import os
 import platform
 import subprocess
 import typing as t
-from .pyqrlew import Dialect
+from .pyqrlew import (
+    Dialect,
+    fingerprint as _fingerprint,
+    fingerprint_many as _fingerprint_many,
+    tables_prefix as _tables_prefix,
+    tables_prefix_many as _tables_prefix_many,
+)
 
 MAGENTA_COLOR = '\033[35m'
 BLUE_COLOR = '\033[34m'
@@ -98,5 +104,81 @@ def tables_prefix(query: str, dialect: Dialect) -> t.List[str]:
     Returns:
         t.List[str]: prefix of table names
     """
-    from pyqrlew.pyqrlew import tables_prefix
-    return tables_prefix(query, dialect)
\ No newline at end of file
+    return _tables_prefix(query, dialect)
+
+
+class TablesPrefixes(t.NamedTuple):
+    """The results of `tables_prefix_many`, in columnar form: the i-th items
+    are the results of the i-th query."""
+    prefixes: t.List[t.Optional[t.List[str]]]
+    """The prefixes of table names of each query, None if it failed"""
+    errors: t.List[t.Optional[str]]
+    """The error message of each query, None if it succeeded"""
+
+
+def tables_prefix_many(queries: t.Iterable[str], dialect: Dialect) -> TablesPrefixes:
+    """Batch `tables_prefix`: the queries are parsed in parallel, without
+    holding the GIL. A failing query does not raise, its error is returned.
+
+    Args:
+        queries (Iterable[str]):
+        dialect (Dialect):
+
+    Returns:
+        TablesPrefixes: prefixes of table names and errors of each query
+    """
+    return TablesPrefixes(*_tables_prefix_many(list(queries), dialect))
+
+
+class Fingerprint(t.NamedTuple):
+    """The fingerprint of a query"""
+    hash: str
+    """A stable hash of the template, as 16 hexadecimal digits"""
+    template: str
+    """The normalized query, with its literals replaced by `?`"""
+    parameters: t.List[str]
+    """The literals of the query, in order, as written in SQL"""
+
+
+def fingerprint(query: str, dialect: t.Optional[Dialect]=None) -> Fingerprint:
+    """Fingerprints a query to key caches or group workloads. The query is
+    parsed and printed back in a normalized form, with the literals of its
+    expressions replaced by `?`. `GROUP BY`, `ORDER BY`, `LIMIT`, `OFFSET` and
+    the data types are kept. Queries differing only by their literals, their
+    spacing or the case of their keywords share the same hash.
+
+    Args:
+        query (str):
+        dialect (Optional[Dialect]): dialect of the query. If not provided,
+            it is assumed to be PostgreSql.
+
+    Returns:
+        Fingerprint: the hash, template and literals of the query
+    """
+    hash, template, parameters = _fingerprint(query, dialect)
+    return Fingerprint(hash, template, parameters)
+
+
+class Fingerprints(t.NamedTuple):
+    """The results of `fingerprint_many`, in columnar form: the i-th items
+    are the results of the i-th query, None where it failed."""
+    hashes: t.List[t.Optional[str]]
+    templates: t.List[t.Optional[str]]
+    parameters: t.List[t.Optional[t.List[str]]]
+    errors: t.List[t.Optional[str]]
+    """The error message of each query, None if it succeeded"""
+
+
+def fingerprint_many(queries: t.Iterable[str], dialect: t.Optional[Dialect]=None) -> Fingerprints:
+    """Batch `fingerprint`: the queries are fingerprinted in parallel, without
+    holding the GIL. A failing query does not raise, its error is returned.
+
+    Args:
+        queries (Iterable[str]):
+        dialect (Optional[Dialect]): dialect of the queries. If not provided,
+            they are assumed to be PostgreSql.
+
+    Returns:
+        Fingerprints: hashes, templates, literals and errors of each query
+    """
+    return Fingerprints(*_fingerprint_many(list(queries), dialect))
@@ -1,21 +1,18 @@
 """Module containing wrappers around rust objects and some utils"""
-from collections import namedtuple
 from pyqrlew.typing import PrivacyUnit, SyntheticData, DpEvent
-from .pyqrlew import _Dataset, _Relation, _RelationWithDpEvent, Dialect, Strategy
+from .pyqrlew import _Dataset, _Relation, _RelationWithDpEvent, Dialect, Strategy, BudgetLedger
+from functools import cached_property
+import io
+import os
 import typing as t 
-from sqlalchemy.engine import Engine
 
 from dataclasses import dataclass
-import logging
-from uuid import uuid4 as generate_uuid
 from typing import Optional, Tuple, List, Dict, Union
-import json
-from sqlalchemy import types
-import sqlalchemy as sa
-import typing as t
 
+if t.TYPE_CHECKING:
+    from sqlalchemy.engine import Engine
 
-MAX_NUMERIC_RANGE = 2**50
+Buffer = t.Union[bytes, bytearray, memoryview]
 
 
 class Dataset:
@@ -62,10 +59,52 @@ class Dataset:
         """
         return Dataset(_Dataset(dataset, schema, size))
 
+    @staticmethod
+    def from_files(dataset: t.Union[str, os.PathLike], schema: t.Union[str, os.PathLike], size: t.Optional[t.Union[str, os.PathLike]]=None) -> 'Dataset':
+        """Factory method to create a Dataset from files holding the string representations
+        of `Dataset.from_str`. The files are memory-mapped and parsed without being loaded
+        in Python strings.
+
+        Args:
+            dataset (Union[str, PathLike]): path of the dataset file
+            schema (Union[str, PathLike]): path of the schema file
+            size (Optional[Union[str, PathLike]]): path of the size file
+        """
+        return Dataset(_Dataset.from_files(dataset, schema, size))
+
+    @staticmethod
+    def from_bytes(dataset: Buffer, schema: Buffer, size: t.Optional[Buffer]=None) -> 'Dataset':
+        """Factory method to create a Dataset from the binary protocol buffers
+        defined `here. <https://github.com/Qrlew/sarus/tree/main/sarus_data_spec/protobuf>`_
+        `bytes` are parsed without being copied, other buffers are copied into `bytes` first.
+
+        Args:
+            dataset (Buffer): serialized dataset
+            schema (Buffer): serialized schema of the dataset
+            size (Optional[Buffer]): serialized size of the dataset's tables
+        """
+        def as_bytes(buffer: Buffer) -> bytes:
+            return buffer if isinstance(buffer, bytes) else bytes(buffer)
+
+        return Dataset(_Dataset.from_bytes(
+            as_bytes(dataset),
+            as_bytes(schema),
+            None if size is None else as_bytes(size),
+        ))
+
+    def to_bytes(self) -> t.Tuple[bytes, bytes, t.Optional[bytes]]:
+        """Returns the binary protocol buffers of the dataset, its schema and its size,
+        as accepted by `Dataset.from_bytes`.
+
+        Returns:
+            Tuple[bytes, bytes, Optional[bytes]]:
+        """
+        return self._dataset.to_bytes()
+
     @staticmethod
     def from_database(
         name: str,
-        engine: Engine,
+        engine: 'Engine',
         schema_name: t.Optional[str]=None,
         ranges: bool=False,
         possible_values_threshold: t.Optional[int]=None
@@ -88,14 +127,21 @@ class Dataset:
         Returns:
             Dataset:
         """
+        from .database import dataset_from_database
         return dataset_from_database(name, engine, schema_name, ranges, possible_values_threshold)
 
     def __getattr__(dataset: 'Dataset', schema_or_table: str) -> t.Union['Schema', 'Table']:
-        if has_schema_name(json.loads(dataset.schema), schema_or_table):
+        if schema_or_table in dataset._schema_names:
             return Schema(dataset, schema=schema_or_table)
         else:
             return Table(dataset, schema=None, table=schema_or_table)
 
+    @cached_property
+    def _schema_names(self) -> t.FrozenSet[str]:
+        """The names of the sql schemas of the dataset, read once from its schema"""
+        fields = self.schema_dict()['type']['union']['fields']
+        return frozenset(field['name'] for field in fields if 'union' in field['type'])
+
     @property
     def schema(self) -> str:
         return self._dataset.schema
@@ -103,6 +149,24 @@ class Dataset:
     @property
     def size(self) -> t.Optional[str]:
         return self._dataset.size
+
+    def schema_dict(self) -> t.Dict[str, t.Any]:
+        """Returns the schema as a dict, keyed by the protobuf field names.
+        Its 64 bits integers are ints and not strings as in json.
+
+        Returns:
+            Dict[str, Any]:
+        """
+        return self._dataset.schema_dict()
+
+    def size_dict(self) -> t.Optional[t.Dict[str, t.Any]]:
+        """Returns the size as a dict, keyed by the protobuf field names.
+        Its 64 bits integers are ints and not strings as in json.
+
+        Returns:
+            Optional[Dict[str, Any]]:
+        """
+        return self._dataset.size_dict()
     
     def with_range(self, schema_name: t.Optional[str], table_name: str, field_name: str, min: float, max: float) -> 'Dataset':
         """Returns a new Dataset with a defined range for a given numeric column. Check out more `here! <https://qrlew.readthedocs.io/en/latest/tutorials/getting_started.html#optionally-declare-value-ranges-and-unique-constraints>`_
@@ -146,7 +210,12 @@ class Dataset:
     
     def relations(self) -> t.Iterable[t.Tuple[t.List[str], 'Relation']]:
         """Returns the Dataset's Relations and their corresponding path"""
-        return [(path, Relation(rel)) for (path, rel) in self._dataset.relations()]
+        return list(self.iter_relations())
+
+    def iter_relations(self) -> t.Iterator[t.Tuple[t.List[str], 'Relation']]:
+        """Returns an iterator over the Dataset's Relations and their corresponding path.
+        The Relations are wrapped one at a time, for catalogs with many tables."""
+        return ((path, Relation(rel)) for (path, rel) in self._dataset.iter_relations())
 
     def relation(self, query: str, dialect: t.Optional['Dialect']=None) -> 'Relation':
         """Returns a Relation from am SQL query.
@@ -172,6 +241,16 @@ class Dataset:
         """
         return Dataset(self._dataset.from_queries(queries, dialect))
 
+    async def arelation(self, query: str, dialect: t.Optional['Dialect']=None) -> 'Relation':
+        """Async `relation`, run on the executor of `pyqrlew.executor`."""
+        from . import executor
+        return await executor.run(self.relation, query, dialect)
+
+    async def afrom_queries(self, queries: t.Iterable[t.Tuple[t.Iterable[str], str]], dialect: t.Optional['Dialect']=None) -> 'Dataset':
+        """Async `from_queries`, run on the executor of `pyqrlew.executor`."""
+        from . import executor
+        return await executor.run(self.from_queries, queries, dialect)
+
 
 class Relation:
     """A Relation is a Dataset transformed by a SQL query.
@@ -213,17 +292,69 @@ class Relation:
         """
         return Relation(_Relation.from_query(query, dataset._dataset, dialect))
 
-    def to_query(self, dialect: t.Optional[Dialect]=None) -> str:
+    def to_query(self, dialect: t.Optional[Dialect]=None, compact: bool=False, optimize: bool=False) -> str:
         """Returns an SQL representation of the Relation.
 
         Args:
             dialect (Optional[Dialect]): dialect of generated sql query. If no dialect is provided,
                 the query will be in PostgreSql. 
+            compact (bool): merge the structurally identical `WITH` entries
+                and drop the unused ones. Defaults to False.
+            optimize (bool): fold the constant predicates, remove the `WITH`
+                entries repeating another one and compact the query, for the
+                engines with weak optimizers. Defaults to False.
 
         Returns:
             str:
         """
-        return self._relation.to_query(dialect)
+        return self._relation.to_query(dialect, compact, optimize)
+
+    def write_query(self, file: t.Union[t.IO, int], dialect: t.Optional[Dialect]=None, compact: bool=False, optimize: bool=False) -> int:
+        """Writes the SQL representation of the Relation to a file, in chunks,
+        without building the whole query string in memory.
+
+        Args:
+            file (Union[IO, int]): a writable text or binary file object, or a
+                file descriptor, which is not closed. Binary files and file
+                descriptors are written in UTF-8.
+            dialect (Optional[Dialect]): dialect of generated sql query. If no dialect is provided,
+                the query will be in PostgreSql.
+            compact (bool): merge the structurally identical `WITH` entries
+                and drop the unused ones. Defaults to False.
+            optimize (bool): fold the constant predicates, remove the `WITH`
+                entries repeating another one and compact the query, for the
+                engines with weak optimizers. Defaults to False.
+
+        Returns:
+            int: the number of bytes written.
+        """
+        if isinstance(file, int):
+            with os.fdopen(file, 'w', encoding='utf-8', closefd=False) as text_file:
+                return self._relation.write_query(text_file, dialect, compact, optimize)
+        if isinstance(file, (io.RawIOBase, io.BufferedIOBase)):
+            text_file = io.TextIOWrapper(file, encoding='utf-8', write_through=True)
+            try:
+                return self._relation.write_query(text_file, dialect, compact, optimize)
+            finally:
+                text_file.detach()
+        return self._relation.write_query(file, dialect, compact, optimize)
+
+    def to_queries(self, dialects: t.Iterable[Dialect]) -> t.Dict[Dialect, str]:
+        """Returns SQL representations of the Relation in several dialects,
+        rendered in parallel.
+
+        Args:
+            dialects (Iterable[Dialect]): dialects of the generated sql queries.
+
+        Returns:
+            Dict[Dialect, str]: the sql query of each dialect.
+        """
+        return self._relation.to_queries(list(dialects))
+
+    async def ato_query(self, dialect: t.Optional[Dialect]=None, compact: bool=False, optimize: bool=False) -> str:
+        """Async `to_query`, run on the executor of `pyqrlew.executor`."""
+        from . import executor
+        return await executor.run(self.to_query, dialect, compact, optimize)
 
     def rewrite_as_privacy_unit_preserving(
         self,
@@ -306,6 +437,54 @@ class Relation:
             synthetic_data
         ))
 
+    async def arewrite_as_privacy_unit_preserving(
+        self,
+        dataset: Dataset,
+        privacy_unit: PrivacyUnit,
+        epsilon_delta: t.Dict[str, float],
+        max_multiplicity: t.Optional[float]=None,
+        max_multiplicity_share: t.Optional[float]=None,
+        max_privacy_unit_groups: t.Optional[int]=None,
+        synthetic_data: t.Optional[SyntheticData]=None,
+        strategy: t.Optional[Strategy]=None,
+    ) -> 'RelationWithDpEvent':
+        """Async `rewrite_as_privacy_unit_preserving`, run on the executor of `pyqrlew.executor`."""
+        from . import executor
+        return await executor.run(
+            self.rewrite_as_privacy_unit_preserving,
+            dataset,
+            privacy_unit,
+            epsilon_delta,
+            max_multiplicity,
+            max_multiplicity_share,
+            max_privacy_unit_groups,
+            synthetic_data,
+            strategy
+        )
+
+    async def arewrite_with_differential_privacy(
+        self,
+        dataset: Dataset,
+        privacy_unit: PrivacyUnit,
+        epsilon_delta: t.Dict[str, float],
+        max_multiplicity: t.Optional[float]=None,
+        max_multiplicity_share: t.Optional[float]=None,
+        max_privacy_unit_groups: t.Optional[int]=None,
+        synthetic_data: t.Optional[SyntheticData]=None,
+    ) -> 'RelationWithDpEvent':
+        """Async `rewrite_with_differential_privacy`, run on the executor of `pyqrlew.executor`."""
+        from . import executor
+        return await executor.run(
+            self.rewrite_with_differential_privacy,
+            dataset,
+            privacy_unit,
+            epsilon_delta,
+            max_multiplicity,
+            max_multiplicity_share,
+            max_privacy_unit_groups,
+            synthetic_data
+        )
+
     def compose(self, relations: t.Iterable[t.Tuple[t.Iterable[str], 'Relation']]) -> 'Relation':
         """It composes itself with other relations. It substitute its Tables with the corresponding relation in relations
             with the same path. Schemas in the relations to be composed should be compatible with
@@ -351,10 +530,26 @@ class Relation:
         "Returns a protobuf compatible string representation of the Relation's data type."
         return self._relation.type_()
 
+    def type_dict(self) -> t.Dict[str, t.Any]:
+        "Returns the Relation's data type as a dict, keyed by the protobuf field names."
+        return self._relation.type_dict()
+
     def dot(self) -> str:
         "GraphViz representation of the `Relation`"
         return self._relation.dot()
 
+    def memory_usage(self) -> t.Mapping[str, int]:
+        """Returns the node counts of the Relation.
+
+        Relations are DAGs, a sub-relation can be an input of several relations.
+        `nodes` counts the nodes of the expanded tree, `unique_nodes` the nodes
+        held in memory and `distinct_nodes` the nodes with distinct names and inputs.
+
+        Returns:
+            Mapping[str, int]:
+        """
+        return self._relation.memory_usage()
+
 class RelationWithDpEvent:
     """Object containing a differentially private (DP) or privacy unit
     preserving (PUP) relation and the associated DpEvent."""
@@ -371,527 +566,6 @@ class RelationWithDpEvent:
         return self.relation_with_dpevent.dp_event()
 
 
-def dataset_from_database(
-    name: str,
-    engine: Engine,
-    schema_name: Optional[str]=None,
-    ranges: bool=False,
-    possible_values_threshold: Optional[int]=None
-) -> Dataset:
-    """Builds a `Dataset` from a sqlalchemy `Engine`
-
-    Args:
-        name (str):
-            Name of the Dataset
-        engine (Engine):
-            The sqlalchemy `Engine` to use
-        schema_name (Optional[str], optional):
-            The DB schema to use. Defaults to None.
-        ranges (bool, optional):
-            Use the actual min and max of the data as ranges. **This is unsafe from a privacy perspective**. Defaults to False.
-        possible_values_threshold (Optional[int], optional):
-            Use the actual observed values as range. **This is unsafe from a privacy perspective**. Defaults to None.
-
-    Returns:
-        Dataset:
-    """
-
-    metadata = sa.MetaData()
-    metadata.reflect(engine, schema=schema_name)
-
-    def dataset_schema_size() -> Tuple[dict, dict, Optional[dict]]:
-        """Return a (dataset, schema) pair or (dataset, schema, size) triplet """
-        ds = dataset()
-        return (
-            ds,
-            schema(ds),
-            size(ds),
-        )
-
-    def dataset() -> dict:
-        """Returns a Json representation compatible with [Protocol Buffers](https://protobuf.dev/reference/protobuf/google.protobuf/#google.protobuf.Struct)
-        of the dataset
-        """
-        return {
-            '@type': 'sarus_data_spec/sarus_data_spec.Dataset',
-            'uuid': generate_uuid().hex,
-            'name': 'Transformed',
-            'spec': {
-                'transformed': {
-                    'transform': generate_uuid().hex,
-                    'arguments': [],
-                    'named_arguments': {},
-                },
-            },
-            'properties': {},
-            'doc': 'This ia a demo dataset for testing purpose',
-        }
-
-    def schema(dataset: dict) -> dict:
-        """Returns a Json representation compatible with [Protocol Buffers](https://protobuf.dev/reference/protobuf/google.protobuf/#google.protobuf.Struct)
-        of the schema
-        """
-
-        tables_type = [table(metadata.tables[name]) for name in metadata.tables]
-        has_admin = any([tab.has_admin for tab in tables_type])
-
-        tables = {"fields": [tab.type_ for tab in tables_type]}
-
-        if schema_name is not None:
-            tables = {
-                "fields": [{
-                    'name': schema_name,
-                    'type': {
-                        'name': 'Union',
-                        'union': tables,
-                        'properties': {
-                            'public_fields': '[]'
-                        },
-                    }
-                }],
-            }
-
-        sarus_is_public = {
-            "name": "sarus_is_public",
-            "type": {
-                "boolean": {},
-                "name": "Boolean",
-                "properties": {}
-            }
-        }
-
-        sarus_privacy_unit = {
-            "name": "sarus_privacy_unit",
-            "type": {
-                "name": "Optional",
-                "optional": {
-                "type": {
-                    "id": {
-                    "base": "STRING",
-                    "unique": False
-                    },
-                    "name": "Id",
-                    "properties": {}
-                }
-                },
-                "properties": {}
-            }
-        }
-
-        sarus_weights = {
-            "name": "sarus_weights",
-            "type": {
-                "float": {
-                "base": "FLOAT64",
-                "max": 1.7976931348623157e+308,
-                "min": 0.0,
-                "possible_values": []
-                },
-                "name": "Float64",
-                "properties": {}
-            }
-        }
-        if has_admin:
-            return {
-                '@type': 'sarus_data_spec/sarus_data_spec.Schema',
-                'uuid': generate_uuid().hex,
-                'dataset': dataset['uuid'],
-                'name': name,
-                'type': {
-                    # Slugname
-                    'name': name.lower(),
-                    'struct': {
-                        'fields': [
-                            {
-                                'name': 'sarus_data',
-                                'type': {
-                                    'name': 'Union',
-                                    'union': tables,
-                                    'properties': {
-                                        'public_fields': '[]',
-                                    },
-                                },
-                            },
-                            sarus_is_public,
-                            sarus_privacy_unit,
-                            sarus_weights,
-                        ],
-                    },
-                    'properties': {}
-                },
-                'privacy_unit': {
-                    'label': 'sarus_data',
-                    'paths': [],
-                    'properties': {},
-                },
-                'properties': {
-                    'max_max_multiplicity': '1',
-                    'foreign_keys': '',
-                    'primary_keys': '',
-                }
-            }
-        else:
-            return {
-                '@type': 'sarus_data_spec/sarus_data_spec.Schema',
-                'uuid': generate_uuid().hex,
-                'dataset': dataset['uuid'],
-                'name': name,
-                'type': {
-                    'name': 'Union',
-                    'union': tables,
-                    'properties': {
-                        'public_fields': '[]',
-                    },
-                },
-            }
-
-
-    def table(tab: sa.Table) -> TableType:
-        min_max_possible_values = compute_min_max_possible_values(tab)
-        admin_cols = ['sarus_weights', 'sarus_is_public', 'sarus_privacy_unit']
-        col_names = [col.name for col in tab.columns]
-        has_admin = [admin_col in col_names for admin_col in admin_cols]
-        type_ = {
-            'name': tab.name,
-            'type': {
-                'name': 'Struct',
-                'struct': {
-                    'fields': [
-                        column(
-                            col,
-                            min=t.cast(t.Optional[str], min_max_possible_values[col.name]["min"]),
-                            max=t.cast(t.Optional[str], min_max_possible_values[col.name]["max"]),
-                            possible_values=t.cast(t.List[str], min_max_possible_values[col.name]["possible_values"])
-                        ) for col in tab.columns
-                        if col.name not in admin_cols
-                    ],
-                },
-                'properties': {},
-            }
-        }
-        return TableType(type_, all(has_admin))
-
-    def compute_min_max_possible_values(tab: sa.Table) -> Dict[str, Dict[str, Union[t.Optional[str], List[str]]]]:
-        """Send 3 SQL queries for loading the bounds"""
-        values: Dict[str, Dict[str, Union[t.Optional[str], List[str]]]] = {
-            col.name: {
-                'min': None,
-                'max': None,
-                'possible_values': []
-            } for col in tab.columns
-        }
-        intervals_types = [
-            types.Integer, types.BigInteger,
-            types.Float, types.Numeric,
-            types.String, types.Text, types.Unicode, types.UnicodeText,
-            types.Date, types.DateTime, types.Time
-        ]
-        interval_cols = [
-            col for col in tab.columns
-            if any(isinstance(col.type, t) for t in intervals_types)
-        ]
-
-        if ranges and len(interval_cols) != 0:
-            min_query = sa.select(*[sa.func.cast(sa.func.min(col), sa.String).label(col.name) for col in interval_cols]).select_from(tab)
-            max_query = sa.select(*[sa.func.cast(sa.func.max(col), sa.String).label(col.name) for col in interval_cols]).select_from(tab)
-
-            with engine.connect() as conn:
-                min_results = conn.execute(min_query).fetchone()
-                max_results = conn.execute(max_query).fetchone()
-
-            for col, min_val, max_val in zip(
-                    interval_cols, t.cast(t.Iterable[t.Any], min_results), t.cast(t.Iterable[t.Any], max_results)
-                ):
-                values[col.name]['min'] = min_val
-                values[col.name]['max'] = max_val
-
-        if possible_values_threshold is not None and len(interval_cols) != 0:
-            tablename = f"\"{tab.name}\"" if tab.schema is None else f"\"{tab.schema}\".\"{tab.name}\""
-            values_query = sa.text(
-                "SELECT " + ','.join([
-                    f"CASE WHEN COUNT(DISTINCT \"{col.name}\") <= {possible_values_threshold} "
-                    f"THEN array_agg(DISTINCT CAST(\"{col.name}\" AS Text)) ELSE ARRAY[]::VARCHAR[] "
-                    f"END AS \"{col.name}\" "
-                    for col in interval_cols
-                ])
-                + f"FROM {tablename}"
-            ) # case very complicate to use with loop
-
-            with engine.connect() as conn:
-                values_results = conn.execute(values_query).fetchone()
-
-            for col, possible_values in zip(interval_cols, t.cast(t.Iterable[t.Any], values_results)):
-                values[col.name]['possible_values'] = [str(v) for v in possible_values]
-
-        return values
-
-    def column(col: sa.Column, min:Optional[str]=None, max:Optional[str]=None, possible_values:List[str]=[]) -> dict:
-        if isinstance(col.type, types.Integer) or isinstance(col.type, types.BigInteger):
-            min = '-9223372036854775808' if min is None else min
-            max = '9223372036854775807' if max is None else max
-            return {
-                'name': col.name,
-                'type': {
-                    'name': 'Integer',
-                    'integer': {
-                        'base': 'INT64',
-                        'min': min,
-                        'max': max,
-                        'possible_values': possible_values,
-                    },
-                    'properties': {},
-                },
-            }
-        elif isinstance(col.type, types.Float) or isinstance(col.type, types.Numeric):
-            min = f'{-MAX_NUMERIC_RANGE}' if min is None else min
-            max = f'{MAX_NUMERIC_RANGE}' if max is None else max
-            return {
-                'name': col.name,
-                'type': {
-                    'name': 'Float64',
-                    'float': {
-                        'base': 'FLOAT64',
-                        'min': min,
-                        'max': max,
-                        'possible_values': [],
-                    },
-                    'properties': {},
-                },
-            }
-        elif isinstance(col.type, types.String) or isinstance(col.type, types.Text) or isinstance(col.type, types.Unicode) or isinstance(col.type, types.UnicodeText):
-
-            return {
-                'name': col.name,
-                'type': {
-                    'name': 'Text UTF-8',
-                    'text': {
-                        'encoding': 'UTF-8',
-                        'min': min,
-                        'max': max,
-                        'possible_values': possible_values,
-                    },
-                    'properties': {},
-                },
-            }
-        elif isinstance(col.type, types.Boolean):
-            return {
-                'name': col.name,
-                'type': {
-                    'name': 'Boolean',
-                    'boolean': {},
-                    'properties': {},
-                },
-            }
-        elif isinstance(col.type, types.Date) or isinstance(col.type, types.DateTime) or isinstance(col.type, types.Time):
-            min = '01-01-01 00:00:00' if min is None else min
-            max = '9999-12-31 00:00:00' if max is None else max
-            return {
-                'name': col.name,
-                'type': {
-                    'name': 'Datetime',
-                    'datetime': {
-                        'format': '%Y-%m-%d %H:%M:%S',
-                        'min': min,
-                        'max': max,
-                    },
-                    'properties': {},
-                },
-            }
-        else:
-            return {
-                'name': col.name,
-                'type': {
-                    'name': 'Type',
-                    'type': {},
-                    'properties': {},
-                },
-            }
-
-    def size(dataset: dict) -> dict:
-        tables = {'fields': [table_size(metadata.tables[name]) for name in metadata.tables]}
-        if schema_name is not None:
-            tables = {
-                'fields': [
-                    {
-                        'name': schema_name,
-                        'statistics': {
-                            'name': 'Union',
-                            'union': tables,
-                            'properties': {},
-                        },
-                        'properties': {},
-                    },
-                ],
-            }
-
-        return {
-            '@type': 'sarus_data_spec/sarus_data_spec.Size',
-            'uuid': generate_uuid().hex,
-            'dataset': dataset['uuid'],
-            'name': f'{name}_sizes',
-            'statistics': {
-                'name': 'Union',
-                'union': tables,
-                'properties': {},
-            },
-            'properties': {},
-        }
-
-    def table_size(tab: sa.Table) -> dict:
-        with engine.connect() as conn:
-            result = conn.execute(sa.select(sa.func.count()).select_from(tab))
-            size = t.cast(int, result.scalar())
-        multiplicity = 1.0
-        return {
-            'name': tab.name,
-            'statistics': {
-                'name': 'Struct',
-                'struct': {
-                    'fields': [column_size(col, size, multiplicity) for col in tab.columns],
-                    'size': str(size),
-                    'multiplicity': multiplicity,
-                },
-                'properties': {},
-            }
-        }
-
-    def column_size(col: sa.Column, size: int, multiplicity: float) -> dict:
-        if isinstance(col.type, types.Integer) or isinstance(col.type, types.BigInteger):
-            return {
-                'name': col.name,
-                'statistics': {
-                    "integer": {
-                        "distribution": {
-                            "integer": {
-                                "max": "9223372036854775807",
-                                "min": "-9223372036854775808",
-                                "points": []
-                            },
-                            "properties": {}
-                            },
-                        "multiplicity": multiplicity,
-                        "size": size
-                    },
-                    "name": "Integer",
-                    "properties": {}
-                }
-            }
-        elif isinstance(col.type, types.Float) or isinstance(col.type, types.Numeric):
-            return {
-                'name': col.name,
-                'statistics': {
-                    "float": {
-                        "distribution": {
-                            "double": {
-                                "max": f'{MAX_NUMERIC_RANGE}',
-                                "min": f'{-MAX_NUMERIC_RANGE}',
-                                "points": []
-                            },
-                            "properties": {}
-                            },
-                        "multiplicity": multiplicity,
-                        "size": size
-                    },
-                    "name": "Float",
-                    "properties": {}
-                }
-            }
-        elif isinstance(col.type, types.String) or isinstance(col.type, types.Text) or isinstance(col.type, types.Unicode) or isinstance(col.type, types.UnicodeText):
-            return {
-                'name': col.name,
-                'statistics': {
-                    "text": {
-                        "distribution": {
-                            "integer": {
-                                "max": "9223372036854775807",
-                                "min": "-9223372036854775808",
-                                "points": []
-                            },
-                            "properties": {}
-                            },
-                        "multiplicity": multiplicity,
-                        "size": size
-                    },
-                    "name": "Text",
-                    "properties": {}
-                }
-            }
-
-        elif isinstance(col.type, types.Boolean):
-            return {
-                'name': col.name,
-                'statistics': {
-                    "boolean": {
-                        "distribution": {
-                            "integer": {
-                                "max": "9223372036854775807",
-                                "min": "-9223372036854775808",
-                                "points": []
-                            },
-                            "properties": {}
-                            },
-                        "multiplicity": multiplicity,
-                        "size": size
-                    },
-                    "name": "Boolean",
-                    "properties": {}
-                }
-            }
-        elif isinstance(col.type, types.Date) or isinstance(col.type, types.DateTime) or isinstance(col.type, types.Time):
-            return {
-                'name': col.name,
-                'statistics': {
-                    "datetime": {
-                        "distribution": {
-                            "integer": {
-                                "max": "9223372036854775807",
-                                "min": "-9223372036854775808",
-                                "points": []
-                            },
-                            "properties": {}
-                            },
-                        "multiplicity": multiplicity,
-                        "size": size
-                    },
-                    "name": "Datetime",
-                    "properties": {}
-                }
-            }
-
-        else: # TODO: support more types
-            raise NotImplementedError(f"SQL -> Sarus Conversion not supported for {col.type} SQL type")
-
-    # Gather protobufs
-    dataset_dict, schema_dict, size_dict = dataset_schema_size()
-    # Display when debugging
-    logging.debug(json.dumps(dataset_dict))
-    logging.debug(json.dumps(schema_dict))
-    logging.debug(json.dumps(size_dict))
-    # Return the result
-    return Dataset.from_str(json.dumps(dataset_dict), json.dumps(schema_dict), json.dumps(size_dict))
-
-
-def schema_data_type(schema_dict: dict) -> dict:
-    schema_type_ = schema_dict['type']
-    if "stuct" in schema_type_:
-        return schema_type_["struct"]["fields"][0]['type']
-    return schema_type_
-
-def has_schema_name(schema_dict: dict, schema_name: str) -> bool:
-    """It checks if the dataset schema has an sql schema called as schema_name."""
-    fields = schema_data_type(schema_dict)['union']['fields']
-    for field in fields:
-        if field["name"] == schema_name and "union" in field["type"]:
-            return True
-    return False
-
-
-@dataclass
-class TableType:
-    type_: dict
-    has_admin: bool
-
-
 # A method to get select a schema
 def schema(dataset: Dataset, schema: str) -> 'Schema':
     return Schema(dataset, schema)
@@ -948,4 +622,12 @@ class Column:
     
     def with_no_constraint(self) -> Dataset:
         return self.with_constraint(None)
-    
\ No newline at end of file
+    
+
+
+def __getattr__(name: str) -> t.Any:
+    # `dataset_from_database` moved to `pyqrlew.database`, it imports sqlalchemy
+    if name == 'dataset_from_database':
+        from .database import dataset_from_database
+        return dataset_from_database
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,362 @@
+use crate::error::{AccountingError, Result};
+use qrlew::differential_privacy::dp_event::DpEvent;
+use std::{result, str::FromStr};
+
+/*
+Privacy accounting of DpEvents.
+
+The basic accountant sums the (epsilon, delta) guarantees of the mechanisms.
+The RDP accountant composes their Rényi DP guarantees [Mironov 2017] and converts
+the result into an (epsilon, delta) guarantee [Canonne, Kamath and Steinke 2020],
+the (epsilon, delta) events being composed separately with the basic composition.
+ */
+
+/// The supported accountants
+#[derive(Clone, Copy, Debug, PartialEq)]
+pub enum Accountant {
+    Basic,
+    Rdp,
+}
+
+impl FromStr for Accountant {
+    type Err = AccountingError;
+
+    fn from_str(accountant: &str) -> result::Result<Self, Self::Err> {
+        match accountant {
+            "basic" => Ok(Accountant::Basic),
+            "rdp" => Ok(Accountant::Rdp),
+            _ => Err(AccountingError(format!(
+                "Unknown accountant {accountant}, expected basic or rdp"
+            ))),
+        }
+    }
+}
+
+/// The Rényi orders at which the RDP guarantees are tracked
+pub fn orders() -> impl Iterator<Item = f64> {
+    (1..100)
+        .map(|x| 1. + x as f64 / 10.)
+        .chain((11..=64).map(f64::from))
+        .chain([128., 256., 512., 1024.])
+}
+
+fn log_sum_exp(values: Vec<f64>) -> f64 {
+    let max = values.iter().cloned().fold(-f64::INFINITY, f64::max);
+    if max.is_infinite() {
+        return max;
+    }
+    max + values.iter().map(|value| (value - max).exp()).sum::<f64>().ln()
+}
+
+fn gaussian_rdp(order: f64, noise_multiplier: f64) -> f64 {
+    order / (2. * noise_multiplier * noise_multiplier)
+}
+
+fn laplace_rdp(order: f64, noise_multiplier: f64) -> f64 {
+    log_sum_exp(vec![
+        (order / (2. * order - 1.)).ln() + (order - 1.) / noise_multiplier,
+        ((order - 1.) / (2. * order - 1.)).ln() - order / noise_multiplier,
+    ]) / (order - 1.)
+}
+
+/// The RDP of the Poisson sampled Gaussian mechanism [Mironov, Talwar and Zhang 2019].
+/// It is only computed at integer orders, the other orders are left unbounded.
+fn poisson_sampled_gaussian_rdp(order: f64, sampling_probability: f64, noise_multiplier: f64) -> f64 {
+    if sampling_probability == 0. {
+        return 0.;
+    }
+    if sampling_probability == 1. {
+        return gaussian_rdp(order, noise_multiplier);
+    }
+    if order.fract() != 0. {
+        return f64::INFINITY;
+    }
+    let alpha = order as u64;
+    let mut log_binomial = 0.;
+    let terms = (0..=alpha)
+        .map(|k| {
+            let k = k as f64;
+            let term = log_binomial
+                + (order - k) * (1. - sampling_probability).ln()
+                + k * sampling_probability.ln()
+                + (k * k - k) / (2. * noise_multiplier * noise_multiplier);
+            log_binomial += (order - k).ln() - (k + 1.).ln();
+            term
+        })
+        .collect();
+    log_sum_exp(terms) / (order - 1.)
+}
+
+/// Converts RDP guarantees at each order into an epsilon for a given delta
+fn rdp_epsilon(rdp: &[f64], delta: f64) -> f64 {
+    if delta <= 0. {
+        return if rdp.iter().all(|value| *value == 0.) { 0. } else { f64::INFINITY };
+    }
+    orders()
+        .zip(rdp)
+        .map(|(order, value)| {
+            value + ((order - 1.) / order).ln() - (delta.ln() + order.ln()) / (order - 1.)
+        })
+        .fold(f64::INFINITY, f64::min)
+        .max(0.)
+}
+
+/// The running RDP composition of DpEvents
+#[derive(Clone, Debug, PartialEq)]
+pub struct RdpAccount {
+    /// The RDP of the composed mechanisms at each order
+    pub rdp: Vec<f64>,
+    /// The sum of the epsilons of the (epsilon, delta) events
+    pub epsilon: f64,
+    /// The sum of the deltas of the (epsilon, delta) events
+    pub delta: f64,
+}
+
+impl Default for RdpAccount {
+    fn default() -> Self {
+        RdpAccount {
+            rdp: orders().map(|_| 0.).collect(),
+            epsilon: 0.,
+            delta: 0.,
+        }
+    }
+}
+
+impl RdpAccount {
+    /// Returns the account composed with an event, leaving self unchanged
+    pub fn composed(&self, event: &DpEvent) -> Result<Self> {
+        let mut account = self.clone();
+        account.add(event)?;
+        Ok(account)
+    }
+
+    /// Composes the account with an event, the account is unchanged if the event is not supported
+    pub fn compose(&mut self, event: &DpEvent) -> Result<()> {
+        *self = self.composed(event)?;
+        Ok(())
+    }
+
+    fn add_rdp<F: Fn(f64) -> f64>(&mut self, rdp: F) {
+        self.rdp
+            .iter_mut()
+            .zip(orders())
+            .for_each(|(value, order)| *value += rdp(order));
+    }
+
+    fn add(&mut self, event: &DpEvent) -> Result<()> {
+        match event {
+            DpEvent::NoOp => {}
+            DpEvent::Gaussian { noise_multiplier } => {
+                let noise_multiplier = *noise_multiplier as f64;
+                self.add_rdp(|order| gaussian_rdp(order, noise_multiplier))
+            }
+            DpEvent::Laplace { noise_multiplier } => {
+                let noise_multiplier = *noise_multiplier as f64;
+                self.add_rdp(|order| laplace_rdp(order, noise_multiplier))
+            }
+            DpEvent::EpsilonDelta { epsilon, delta } => {
+                self.epsilon += *epsilon as f64;
+                self.delta += *delta as f64;
+            }
+            DpEvent::Composed { events } => {
+                for event in events {
+                    self.add(event)?
+                }
+            }
+            DpEvent::PoissonSampled {
+                sampling_probability,
+                event,
+            } => match &**event {
+                DpEvent::NoOp => {}
+                DpEvent::Gaussian { noise_multiplier } => {
+                    let sampling_probability = *sampling_probability as f64;
+                    let noise_multiplier = *noise_multiplier as f64;
+                    self.add_rdp(|order| {
+                        poisson_sampled_gaussian_rdp(order, sampling_probability, noise_multiplier)
+                    })
+                }
+                _ => {
+                    return Err(AccountingError(format!(
+                        "The RDP accountant only supports Poisson sampled Gaussian events, got {event}"
+                    ))
+                    .into())
+                }
+            },
+            _ => {
+                return Err(AccountingError(format!(
+                    "The RDP accountant does not support {event}"
+                ))
+                .into())
+            }
+        }
+        Ok(())
+    }
+
+    /// Returns the epsilon of the composed events for a given delta
+    pub fn epsilon(&self, delta: f64) -> Result<f64> {
+        if delta < self.delta {
+            return Err(AccountingError(format!(
+                "delta={delta} is smaller than the delta={} of the composed (epsilon, delta) events",
+                self.delta
+            ))
+            .into());
+        }
+        Ok(self.epsilon + rdp_epsilon(&self.rdp, delta - self.delta))
+    }
+}
+
+/// Returns the number of Gaussian events and the sum of the deltas of the (epsilon, delta) events
+fn basic_delta(event: &DpEvent) -> (usize, f64) {
+    match event {
+        DpEvent::Gaussian { .. } => (1, 0.),
+        DpEvent::EpsilonDelta { delta, .. } => (0, *delta as f64),
+        DpEvent::Composed { events } => events.iter().map(basic_delta).fold(
+            (0, 0.),
+            |(gaussians, delta), (event_gaussians, event_delta)| {
+                (gaussians + event_gaussians, delta + event_delta)
+            },
+        ),
+        DpEvent::PoissonSampled { event, .. }
+        | DpEvent::SampledWithReplacement { event, .. }
+        | DpEvent::SampledWithoutReplacement { event, .. } => basic_delta(event),
+        _ => (0, 0.),
+    }
+}
+
+/// Amplification by sampling of an (epsilon, delta) guarantee [Balle, Barthe and Gaboardi 2018]
+fn amplified(sampling_probability: f64, (epsilon, delta): (f64, f64)) -> (f64, f64) {
+    (
+        (sampling_probability * epsilon.exp_m1()).ln_1p(),
+        sampling_probability * delta,
+    )
+}
+
+/// Returns the (epsilon, delta) guarantee of an event, each Gaussian event using gaussian_delta
+fn basic_epsilon_delta(event: &DpEvent, gaussian_delta: f64) -> Result<(f64, f64)> {
+    Ok(match event {
+        DpEvent::NoOp => (0., 0.),
+        DpEvent::Gaussian { noise_multiplier } => {
+            let noise_multiplier = *noise_multiplier as f64;
+            let rdp: Vec<f64> = orders()
+                .map(|order| gaussian_rdp(order, noise_multiplier))
+                .collect();
+            (rdp_epsilon(&rdp, gaussian_delta), gaussian_delta)
+        }
+        DpEvent::Laplace { noise_multiplier } => (1. / *noise_multiplier as f64, 0.),
+        DpEvent::EpsilonDelta { epsilon, delta } => (*epsilon as f64, *delta as f64),
+        DpEvent::Composed { events } => events.iter().try_fold((0., 0.), |(epsilon, delta), event| {
+            let (event_epsilon, event_delta) = basic_epsilon_delta(event, gaussian_delta)?;
+            Ok::<_, crate::error::Error>((epsilon + event_epsilon, delta + event_delta))
+        })?,
+        DpEvent::PoissonSampled {
+            sampling_probability,
+            event,
+        } => amplified(
+            *sampling_probability as f64,
+            basic_epsilon_delta(event, gaussian_delta)?,
+        ),
+        DpEvent::SampledWithoutReplacement {
+            source_dataset_size,
+            sample_size,
+            event,
+        } => amplified(
+            *sample_size as f64 / *source_dataset_size as f64,
+            basic_epsilon_delta(event, gaussian_delta)?,
+        ),
+        _ => {
+            return Err(AccountingError(format!(
+                "The basic accountant does not support {event}"
+            ))
+            .into())
+        }
+    })
+}
+
+/// Returns the epsilon of an event with the basic composition,
+/// the delta left by the (epsilon, delta) events being shared equally by the Gaussian events.
+fn basic_epsilon(event: &DpEvent, delta: f64) -> Result<f64> {
+    let (gaussians, fixed_delta) = basic_delta(event);
+    if fixed_delta > delta || (gaussians > 0 && fixed_delta == delta) {
+        return Err(AccountingError(format!(
+            "delta={delta} leaves no delta to the Gaussian events after the delta={fixed_delta} of the (epsilon, delta) events"
+        ))
+        .into());
+    }
+    let gaussian_delta = if gaussians > 0 {
+        (delta - fixed_delta) / gaussians as f64
+    } else {
+        0.
+    };
+    Ok(basic_epsilon_delta(event, gaussian_delta)?.0)
+}
+
+/// Returns the epsilon of an event for a given delta
+pub fn epsilon_for_delta(event: &DpEvent, delta: f64, accountant: Accountant) -> Result<f64> {
+    if !(0. ..=1.).contains(&delta) {
+        return Err(AccountingError(format!("delta={delta} should be in [0, 1]")).into());
+    }
+    match accountant {
+        Accountant::Basic => basic_epsilon(event, delta),
+        Accountant::Rdp => RdpAccount::default().composed(event)?.epsilon(delta),
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn laplaces(n: usize, noise_multiplier: f64) -> DpEvent {
+        DpEvent::Composed {
+            events: (0..n).map(|_| DpEvent::Laplace { noise_multiplier }).collect(),
+        }
+    }
+
+    #[test]
+    fn test_basic() {
+        let event = laplaces(10, 2.);
+        assert!((epsilon_for_delta(&event, 0., Accountant::Basic).unwrap() - 5.).abs() < 1e-12);
+        let event = DpEvent::Composed {
+            events: vec![
+                DpEvent::EpsilonDelta { epsilon: 1., delta: 1e-6 },
+                DpEvent::Laplace { noise_multiplier: 1. },
+            ],
+        };
+        assert!((epsilon_for_delta(&event, 1e-5, Accountant::Basic).unwrap() - 2.).abs() < 1e-12);
+        assert!(epsilon_for_delta(&event, 1e-7, Accountant::Basic).is_err());
+    }
+
+    #[test]
+    fn test_rdp() {
+        // Composing many mechanisms is cheaper with RDP
+        let event = laplaces(100, 10.);
+        let basic = epsilon_for_delta(&event, 1e-5, Accountant::Basic).unwrap();
+        let rdp = epsilon_for_delta(&event, 1e-5, Accountant::Rdp).unwrap();
+        assert!(rdp < basic);
+        // A single Gaussian with noise multiplier 1 and delta 1e-5
+        let gaussian = DpEvent::Gaussian { noise_multiplier: 1. };
+        let epsilon = epsilon_for_delta(&gaussian, 1e-5, Accountant::Rdp).unwrap();
+        assert!(epsilon > 3. && epsilon < 5.);
+        // Poisson sampling amplifies privacy
+        let sampled = DpEvent::PoissonSampled {
+            sampling_probability: 0.01,
+            event: Box::new(gaussian.clone()).into(),
+        };
+        assert!(epsilon_for_delta(&sampled, 1e-5, Accountant::Rdp).unwrap() < epsilon);
+        assert!(epsilon_for_delta(&gaussian, 2., Accountant::Rdp).is_err());
+    }
+
+    #[test]
+    fn test_incremental() {
+        let mut account = RdpAccount::default();
+        for _ in 0..10 {
+            account.compose(&DpEvent::Gaussian { noise_multiplier: 2. }).unwrap();
+        }
+        let composed = DpEvent::Composed {
+            events: (0..10).map(|_| DpEvent::Gaussian { noise_multiplier: 2. }).collect(),
+        };
+        assert_eq!(
+            account.epsilon(1e-5).unwrap(),
+            epsilon_for_delta(&composed, 1e-5, Accountant::Rdp).unwrap()
+        );
+    }
+}
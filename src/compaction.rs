@@ -0,0 +1,201 @@
+use qrlew::ast;
+use std::collections::{HashMap, HashSet};
+
+/*
+Compaction of the rendered SQL.
+
+Structurally identical `WITH` entries are merged into the first one and the
+entries no longer referenced are dropped. The queries handled here are rendered
+by the qrlew translators, which only reference the `WITH` entries in `FROM`
+clauses, never in expressions.
+
+Entries calling volatile functions are never merged: the noise of the
+differentially private mechanisms is drawn with `RANDOM()`, and two identical
+noisy entries must stay independent.
+ */
+
+/// The functions whose value may change at each call, in upper case
+const VOLATILE_FUNCTIONS: &[&str] = &[
+    "RANDOM(",
+    "RAND(",
+    "NEWID(",
+    "UUID(",
+    "GEN_RANDOM_UUID(",
+    "NOW(",
+    "CURRENT_TIMESTAMP",
+    "CLOCK_TIMESTAMP(",
+];
+
+/// Merges the identical `WITH` entries of a query and drops the unused ones
+pub fn compact(mut query: ast::Query) -> ast::Query {
+    let Some(mut with) = query.with.take() else {
+        return query;
+    };
+    // The entries are ordered, each one only references the previous ones
+    let mut renamed: HashMap<String, ast::Ident> = HashMap::new();
+    let mut canonical: HashMap<ast::Cte, ast::Ident> = HashMap::new();
+    for cte in with.cte_tables.iter_mut() {
+        // Without aliases, equal entries still use the same qualified names
+        let mut key = cte.clone();
+        key.alias.name = ast::Ident::new("");
+        rename_tables(&mut key.query, &renamed, false);
+        if let Some(name) = canonical
+            .get(&key)
+            .filter(|_| !is_volatile(&key.query))
+            .cloned()
+        {
+            renamed.insert(cte.alias.name.value.clone(), name);
+        } else {
+            rename_tables(&mut cte.query, &renamed, true);
+            canonical.insert(key, cte.alias.name.clone());
+        }
+    }
+    // The entries are taken out of the query, only its body is renamed
+    rename_tables(&mut query, &renamed, true);
+    query.with = Some(with);
+    drop_unused(query)
+}
+
+/// Drops the `WITH` entries of a query not referenced by its body, directly or not
+pub(crate) fn drop_unused(mut query: ast::Query) -> ast::Query {
+    let Some(mut with) = query.with.take() else {
+        return query;
+    };
+    // Keep the entries referenced by the body or by a kept entry
+    let mut used = HashSet::new();
+    collect_tables(&mut query, &mut used);
+    let mut kept = vec![false; with.cte_tables.len()];
+    for (index, cte) in with.cte_tables.iter_mut().enumerate().rev() {
+        if used.contains(&cte.alias.name.value) {
+            kept[index] = true;
+            collect_tables(&mut cte.query, &mut used);
+        }
+    }
+    let mut kept = kept.into_iter();
+    with.cte_tables.retain(|_| kept.next().unwrap_or(true));
+    if !with.cte_tables.is_empty() {
+        query.with = Some(with);
+    }
+    query
+}
+
+/// Whether a query may call a volatile function
+fn is_volatile(query: &ast::Query) -> bool {
+    let query = query.to_string().to_uppercase();
+    VOLATILE_FUNCTIONS
+        .iter()
+        .any(|function| query.contains(function))
+}
+
+/// Points the single-part table names of a query to their new names,
+/// aliased as their old names if `alias_old_names`
+pub(crate) fn rename_tables(query: &mut ast::Query, renamed: &HashMap<String, ast::Ident>, alias_old_names: bool) {
+    if renamed.is_empty() {
+        return;
+    }
+    visit_query(query, &mut |name: &mut ast::ObjectName, alias: &mut Option<ast::TableAlias>| {
+        if let [table] = name.0.as_mut_slice() {
+            if let Some(new_name) = renamed.get(&table.value) {
+                // The old name stays valid in the qualified column names
+                let old_name = std::mem::replace(table, new_name.clone());
+                if alias_old_names && alias.is_none() {
+                    *alias = Some(ast::TableAlias {
+                        name: old_name,
+                        columns: vec![],
+                    });
+                }
+            }
+        }
+    })
+}
+
+/// Collects the single-part table names of a query
+fn collect_tables(query: &mut ast::Query, tables: &mut HashSet<String>) {
+    visit_query(query, &mut |name: &mut ast::ObjectName, _: &mut Option<ast::TableAlias>| {
+        if let [table] = name.0.as_slice() {
+            tables.insert(table.value.clone());
+        }
+    })
+}
+
+fn visit_query<F: FnMut(&mut ast::ObjectName, &mut Option<ast::TableAlias>)>(query: &mut ast::Query, f: &mut F) {
+    if let Some(with) = query.with.as_mut() {
+        for cte in with.cte_tables.iter_mut() {
+            visit_query(&mut cte.query, f);
+        }
+    }
+    visit_set_expr(&mut query.body, f)
+}
+
+fn visit_set_expr<F: FnMut(&mut ast::ObjectName, &mut Option<ast::TableAlias>)>(set_expr: &mut ast::SetExpr, f: &mut F) {
+    match set_expr {
+        ast::SetExpr::Select(select) => {
+            for table_with_joins in select.from.iter_mut() {
+                visit_table_with_joins(table_with_joins, f);
+            }
+        }
+        ast::SetExpr::Query(query) => visit_query(query, f),
+        ast::SetExpr::SetOperation { left, right, .. } => {
+            visit_set_expr(left, f);
+            visit_set_expr(right, f);
+        }
+        _ => {}
+    }
+}
+
+fn visit_table_with_joins<F: FnMut(&mut ast::ObjectName, &mut Option<ast::TableAlias>)>(
+    table_with_joins: &mut ast::TableWithJoins,
+    f: &mut F,
+) {
+    visit_table_factor(&mut table_with_joins.relation, f);
+    for join in table_with_joins.joins.iter_mut() {
+        visit_table_factor(&mut join.relation, f);
+    }
+}
+
+fn visit_table_factor<F: FnMut(&mut ast::ObjectName, &mut Option<ast::TableAlias>)>(table_factor: &mut ast::TableFactor, f: &mut F) {
+    match table_factor {
+        ast::TableFactor::Table { name, alias, .. } => f(name, alias),
+        ast::TableFactor::Derived { subquery, .. } => visit_query(subquery, f),
+        ast::TableFactor::NestedJoin {
+            table_with_joins, ..
+        } => visit_table_with_joins(table_with_joins, f),
+        _ => {}
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use qrlew::sql::relation::parse;
+
+    #[test]
+    fn test_compact() {
+        let query = parse(
+            "WITH a (x) AS (SELECT x FROM t), b (x) AS (SELECT x FROM t), \
+            c (y) AS (SELECT x AS y FROM a), d (y) AS (SELECT x AS y FROM b), \
+            unused (x) AS (SELECT x FROM t WHERE x > 0) \
+            SELECT c.y, d.y FROM c JOIN d ON c.y = d.y",
+        )
+        .unwrap();
+        let compacted = compact(query).to_string();
+        println!("{compacted}");
+        assert_eq!(
+            compacted,
+            "WITH a (x) AS (SELECT x FROM t), c (y) AS (SELECT x AS y FROM a) \
+            SELECT c.y, d.y FROM c JOIN c AS d ON c.y = d.y"
+        );
+        let query = parse(
+            "WITH a (x) AS (SELECT RANDOM() AS x FROM t), b (x) AS (SELECT RANDOM() AS x FROM t) \
+            SELECT a.x, b.x FROM a JOIN b ON a.x = b.x",
+        )
+        .unwrap();
+        let compacted = compact(query).to_string();
+        println!("{compacted}");
+        assert_eq!(
+            compacted,
+            "WITH a (x) AS (SELECT RANDOM() AS x FROM t), b (x) AS (SELECT RANDOM() AS x FROM t) \
+            SELECT a.x, b.x FROM a JOIN b ON a.x = b.x"
+        );
+    }
+}
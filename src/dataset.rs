@@ -1,6 +1,13 @@
-use crate::{dialect::Dialect, error::Result, relation::Relation};
-use pyo3::prelude::*;
+use crate::{
+    dialect::Dialect, error::Result, messages, profiling, relation::Relation, threads,
+};
+use ::protobuf::Message;
+use pyo3::{
+    prelude::*,
+    types::{PyBytes, PyDict},
+};
 use qrlew::{
+    ast,
     builder::With,
     dialect_translation::{
         bigquery::BigQueryTranslator,
@@ -15,9 +22,16 @@ use qrlew::{
     hierarchy::Hierarchy,
     relation, sql,
 };
-use qrlew_sarus::{data_spec, protobuf::print_to_string};
+use qrlew_sarus::{
+    data_spec,
+    protobuf::{dataset, print_to_string, schema, size},
+};
+use memmap2::Mmap;
+use std::collections::{HashMap, HashSet};
+use std::fs::File;
 use std::ops::Deref;
-use std::sync::Arc;
+use std::path::{Path, PathBuf};
+use std::sync::{Arc, OnceLock};
 
 #[pyclass(name = "_Dataset")]
 #[derive(Clone)]
@@ -27,19 +41,108 @@ use std::sync::Arc;
 ///     dataset (str): a string representation of the Dataset.
 ///     schema (str): a json compatible string representation of its schema.
 ///     size (str): a json compatible string representation of its table's size.
-pub struct Dataset(data_spec::Dataset);
+pub struct Dataset {
+    dataset: data_spec::Dataset,
+    // Computed on first use and shared by the clones of the Dataset
+    cache: Arc<Cache>,
+}
+
+/// What is derived from an immutable Dataset
+#[derive(Default)]
+struct Cache {
+    relations: OnceLock<Relations>,
+    schema: OnceLock<String>,
+    size: OnceLock<Option<String>>,
+}
 
 impl Deref for Dataset {
     type Target = data_spec::Dataset;
 
     fn deref(&self) -> &Self::Target {
-        &self.0
+        &self.dataset
+    }
+}
+
+impl From<data_spec::Dataset> for Dataset {
+    fn from(dataset: data_spec::Dataset) -> Self {
+        Dataset {
+            dataset,
+            cache: Arc::new(Cache::default()),
+        }
     }
 }
 
 impl From<Dataset> for data_spec::Dataset {
     fn from(value: Dataset) -> Self {
-        value.0
+        value.dataset
+    }
+}
+
+impl Dataset {
+    fn cached_relations(&self) -> &Relations {
+        self.cache
+            .relations
+            .get_or_init(|| Relations::new(self.dataset.relations()))
+    }
+
+    /// The Relations of the Dataset's tables, decoded once
+    pub fn hierarchy(&self) -> &Hierarchy<Arc<relation::Relation>> {
+        &self.cached_relations().hierarchy
+    }
+
+    /// `relation`, holding the GIL
+    pub fn _relation(&self, query: &str, dialect: Option<Dialect>) -> Result<Relation> {
+        let dialect = dialect.unwrap_or(Dialect::PostgreSql);
+        let relations = profiling::stage("relations", || self.cached_relations().referenced(query));
+        let parsed = parse_query(query, &dialect)?;
+        Ok(Relation::new(Arc::new(query_relation(
+            parsed, &relations, &dialect,
+        )?)))
+    }
+
+    /// `from_queries`, holding the GIL
+    pub fn _from_queries(
+        &self,
+        queries: Vec<(Vec<String>, String)>,
+        dialect: Option<Dialect>,
+    ) -> Result<Self> {
+        let relations = profiling::stage("relations", || self.cached_relations());
+        let dialect = dialect.unwrap_or(Dialect::PostgreSql);
+
+        let result_relations: Hierarchy<Arc<relation::Relation>> = queries
+            .iter()
+            .map(|(path, query)| {
+                let parsed = parse_query(query, &dialect)?;
+                let rel = query_relation(parsed, &relations.referenced(query), &dialect)?;
+                Ok((path.clone(), Arc::new(rel)))
+            })
+            .collect::<Result<_>>()?;
+
+        let ds = profiling::stage("dataset", || -> Result<data_spec::Dataset> {
+            Ok((&result_relations).try_into()?)
+        })?;
+        Ok(Dataset::from(ds))
+    }
+
+    /// `from_files`, holding the GIL
+    pub fn _from_files(dataset: &Path, schema: &Path, size: Option<&Path>) -> Result<Self> {
+        let dataset = MappedFile::open(dataset)?;
+        let schema = MappedFile::open(schema)?;
+        let size = size.map(MappedFile::open).transpose()?;
+        Dataset::new(
+            dataset.as_str()?,
+            schema.as_str()?,
+            size.as_ref().map(MappedFile::as_str).transpose()?.unwrap_or(""),
+        )
+    }
+
+    /// `from_bytes`, holding the GIL
+    pub fn _from_bytes(dataset: &[u8], schema: &[u8], size: Option<&[u8]>) -> Result<Self> {
+        Ok(Dataset::from(data_spec::Dataset::new(
+            dataset::Dataset::parse_from_bytes(dataset)?,
+            schema::Schema::parse_from_bytes(schema)?,
+            size.map(size::Size::parse_from_bytes).transpose()?,
+        )))
     }
 }
 
@@ -47,21 +150,98 @@ impl From<Dataset> for data_spec::Dataset {
 impl Dataset {
     #[new]
     pub fn new(dataset: &str, schema: &str, size: &str) -> Result<Self> {
-        Ok(Dataset(data_spec::Dataset::parse_from_dataset_schema_size(
+        Ok(Dataset::from(data_spec::Dataset::parse_from_dataset_schema_size(
             dataset, schema, size,
         )?))
     }
+    /// Returns a Dataset from binary protobuf messages.
+    /// The bytes are parsed in place, without the GIL.
+    ///
+    /// Args:
+    ///     dataset (bytes): the serialized dataset
+    ///     schema (bytes): the serialized schema
+    ///     size (Optional[bytes]): the serialized size
+    /// Returns:
+    ///     Dataset:
+    #[staticmethod]
+    #[pyo3(signature = (dataset, schema, size=None))]
+    pub fn from_bytes(dataset: &[u8], schema: &[u8], size: Option<&[u8]>, py: Python) -> Result<Self> {
+        threads::allow_threads(py, || Dataset::_from_bytes(dataset, schema, size))
+    }
+
+    /// Returns a Dataset from files holding the json representations of the dataset,
+    /// its schema and its size. The files are memory-mapped and parsed in place, without the GIL.
+    ///
+    /// Args:
+    ///     dataset (str): path of the dataset file
+    ///     schema (str): path of the schema file
+    ///     size (Optional[str]): path of the size file
+    /// Returns:
+    ///     Dataset:
+    #[staticmethod]
+    #[pyo3(signature = (dataset, schema, size=None))]
+    pub fn from_files(dataset: PathBuf, schema: PathBuf, size: Option<PathBuf>, py: Python) -> Result<Self> {
+        threads::allow_threads(py, || {
+            Dataset::_from_files(&dataset, &schema, size.as_deref())
+        })
+    }
+
+    /// Returns the binary protobuf messages of the dataset, its schema and its size.
+    ///
+    /// Returns:
+    ///     Tuple[bytes, bytes, Optional[bytes]]:
+    pub fn to_bytes<'py>(
+        &self,
+        py: Python<'py>,
+    ) -> Result<(&'py PyBytes, &'py PyBytes, Option<&'py PyBytes>)> {
+        let size = match self.dataset.size() {
+            Some(size) => Some(PyBytes::new(py, &size.write_to_bytes()?)),
+            None => None,
+        };
+        Ok((
+            PyBytes::new(py, &self.dataset.dataset().write_to_bytes()?),
+            PyBytes::new(py, &self.dataset.schema().write_to_bytes()?),
+            size,
+        ))
+    }
+
     #[getter]
     pub fn schema(&self) -> Result<String> {
-        Ok(print_to_string(self.0.schema())?)
+        if let Some(schema) = self.cache.schema.get() {
+            return Ok(schema.clone());
+        }
+        let schema = print_to_string(self.dataset.schema())?;
+        Ok(self.cache.schema.get_or_init(|| schema).clone())
     }
 
     #[getter]
     pub fn size(&self) -> Option<String> {
-        match self.0.size() {
-            Some(size_proto) => print_to_string(size_proto).ok(),
-            None => None,
-        }
+        self.cache
+            .size
+            .get_or_init(|| match self.dataset.size() {
+                Some(size_proto) => print_to_string(size_proto).ok(),
+                None => None,
+            })
+            .clone()
+    }
+
+    /// Returns the schema as a dict, built from the protobuf message without going through json.
+    ///
+    /// Returns:
+    ///     Dict[str, Any]:
+    pub fn schema_dict<'py>(&self, py: Python<'py>) -> PyResult<&'py PyDict> {
+        messages::to_dict(self.dataset.schema(), py)
+    }
+
+    /// Returns the size as a dict, built from the protobuf message without going through json.
+    ///
+    /// Returns:
+    ///     Optional[Dict[str, Any]]:
+    pub fn size_dict<'py>(&self, py: Python<'py>) -> PyResult<Option<&'py PyDict>> {
+        self.dataset
+            .size()
+            .map(|size| messages::to_dict(size, py))
+            .transpose()
     }
 
     /// Returns a new Dataset with a defined range for a given numeric column.
@@ -83,7 +263,7 @@ impl Dataset {
         min: f64,
         max: f64,
     ) -> Result<Self> {
-        Ok(Dataset(self.0.with_range(
+        Ok(Dataset::from(self.dataset.with_range(
             schema_name,
             table_name,
             field_name,
@@ -109,7 +289,7 @@ impl Dataset {
         field_name: &str,
         possible_values: Vec<String>,
     ) -> Result<Self> {
-        Ok(Dataset(self.0.with_possible_values(
+        Ok(Dataset::from(self.dataset.with_possible_values(
             schema_name,
             table_name,
             field_name,
@@ -134,7 +314,7 @@ impl Dataset {
         field_name: &str,
         constraint: Option<&str>,
     ) -> Result<Self> {
-        Ok(Dataset(self.0.with_constraint(
+        Ok(Dataset::from(self.dataset.with_constraint(
             schema_name,
             table_name,
             field_name,
@@ -147,13 +327,28 @@ impl Dataset {
     /// Returns:
     ///     Sequence[Sequence[str], Relation]:
     pub fn relations(&self) -> Vec<(Vec<String>, Relation)> {
-        self.deref()
-            .relations()
-            .into_iter()
-            .map(|(i, r)| (i, Relation::new(r)))
+        self.cached_relations()
+            .entries
+            .iter()
+            .map(|(i, r)| (i.clone(), Relation::new(r.clone())))
             .collect()
     }
 
+    /// Returns an iterator over the Dataset's Relations and their corresponding path.
+    /// The Relations are decoded once, then wrapped one at a time.
+    ///
+    /// Returns:
+    ///     Iterator[Tuple[Sequence[str], Relation]]:
+    pub fn iter_relations(&self, py: Python) -> RelationsIterator {
+        py.allow_threads(|| {
+            self.cached_relations();
+        });
+        RelationsIterator {
+            cache: self.cache.clone(),
+            index: 0,
+        }
+    }
+
     /// Returns a Relation from am SQL query.
     ///
     /// Args:
@@ -163,74 +358,8 @@ impl Dataset {
     ///     a new Relation
     /// Returns:
     ///     Relation:
-    pub fn relation(&self, query: &str, dialect: Option<Dialect>) -> Result<Relation> {
-        let dialect = dialect.unwrap_or(Dialect::PostgreSql);
-        let relations = self.deref().relations();
-        match dialect {
-            Dialect::PostgreSql => {
-                let translator = PostgreSqlTranslator;
-                let query = sql::relation::parse_with_dialect(query, translator.dialect())?;
-                let query_with_relations = query.with(&relations);
-                Ok(Relation::new(Arc::new(relation::Relation::try_from((
-                    query_with_relations,
-                    translator,
-                ))?)))
-            }
-            Dialect::MsSql => {
-                let translator = MsSqlTranslator;
-                let query = sql::relation::parse_with_dialect(query, translator.dialect())?;
-                let query_with_relations = query.with(&relations);
-                Ok(Relation::new(Arc::new(relation::Relation::try_from((
-                    query_with_relations,
-                    translator,
-                ))?)))
-            }
-            Dialect::BigQuery => {
-                let translator = BigQueryTranslator;
-                let query = sql::relation::parse_with_dialect(query, translator.dialect())?;
-                let query_with_relations = query.with(&relations);
-                Ok(Relation::new(Arc::new(relation::Relation::try_from((
-                    query_with_relations,
-                    translator,
-                ))?)))
-            }
-            Dialect::MySql => {
-                let translator = MySqlTranslator;
-                let query = sql::relation::parse_with_dialect(query, translator.dialect())?;
-                let query_with_relations = query.with(&relations);
-                Ok(Relation::new(Arc::new(relation::Relation::try_from((
-                    query_with_relations,
-                    translator,
-                ))?)))
-            }
-            Dialect::Hive => {
-                let translator = HiveTranslator;
-                let query = sql::relation::parse_with_dialect(query, translator.dialect())?;
-                let query_with_relations = query.with(&relations);
-                Ok(Relation::new(Arc::new(relation::Relation::try_from((
-                    query_with_relations,
-                    translator,
-                ))?)))
-            }
-            Dialect::Databricks => {
-                let translator = DatabricksTranslator;
-                let query = sql::relation::parse_with_dialect(query, translator.dialect())?;
-                let query_with_relations = query.with(&relations);
-                Ok(Relation::new(Arc::new(relation::Relation::try_from((
-                    query_with_relations,
-                    translator,
-                ))?)))
-            }
-            Dialect::RedshiftSql => {
-                let translator = RedshiftSqlTranslator;
-                let query = sql::relation::parse_with_dialect(query, translator.dialect())?;
-                let query_with_relations = query.with(&relations);
-                Ok(Relation::new(Arc::new(relation::Relation::try_from((
-                    query_with_relations,
-                    translator,
-                ))?)))
-            }
-        }
+    pub fn relation(&self, query: &str, dialect: Option<Dialect>, py: Python) -> Result<Relation> {
+        threads::allow_threads(py, || self._relation(query, dialect))
     }
 
     /// Returns a dataset from queries.
@@ -244,70 +373,220 @@ impl Dataset {
         &self,
         queries: Vec<(Vec<String>, String)>,
         dialect: Option<Dialect>,
+        py: Python,
     ) -> Result<Self> {
-        let relations = self.deref().relations();
-        let dialect = dialect.unwrap_or(Dialect::PostgreSql);
+        threads::allow_threads(py, || self._from_queries(queries, dialect))
+    }
+
+    pub fn __str__(&self) -> String {
+        format!("{}", self.dataset)
+    }
+}
+
+/// An iterator over the Relations of a Dataset, sharing its cache
+#[pyclass(name = "_RelationsIterator")]
+pub struct RelationsIterator {
+    cache: Arc<Cache>,
+    index: usize,
+}
+
+#[pymethods]
+impl RelationsIterator {
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
 
-        let result_relations: Result<Hierarchy<Arc<relation::Relation>>> = queries
+    fn __next__(&mut self) -> Option<(Vec<String>, Relation)> {
+        let (path, relation) = self.cache.relations.get()?.entries.get(self.index)?;
+        self.index += 1;
+        Some((path.clone(), Relation::new(relation.clone())))
+    }
+
+    fn __length_hint__(&self) -> usize {
+        self.cache
+            .relations
+            .get()
+            .map_or(0, |relations| relations.entries.len() - self.index)
+    }
+}
+
+/// The Relations of a Dataset's tables, indexed by their lowercase table names
+struct Relations {
+    entries: Vec<(Vec<String>, Arc<relation::Relation>)>,
+    hierarchy: Hierarchy<Arc<relation::Relation>>,
+    by_name: HashMap<String, Vec<usize>>,
+}
+
+impl Relations {
+    fn new(hierarchy: Hierarchy<Arc<relation::Relation>>) -> Self {
+        let entries: Vec<(Vec<String>, Arc<relation::Relation>)> = hierarchy.into_iter().collect();
+        let mut by_name: HashMap<String, Vec<usize>> = HashMap::new();
+        for (index, (path, _)) in entries.iter().enumerate() {
+            if let Some(name) = path.last() {
+                by_name.entry(name.to_lowercase()).or_default().push(index);
+            }
+        }
+        let hierarchy = entries.iter().cloned().collect();
+        Relations {
+            entries,
+            hierarchy,
+            by_name,
+        }
+    }
+
+    /// The Relations of the tables a query may reference: those named by one of its identifiers.
+    /// Over-matching is harmless, the query is still resolved against all the tables with its names.
+    fn referenced(&self, query: &str) -> Hierarchy<Arc<relation::Relation>> {
+        identifiers(query)
             .iter()
-            .map(|(path, query)| match dialect {
-                Dialect::PostgreSql => {
-                    let translator = PostgreSqlTranslator;
-                    let parsed = sql::relation::parse_with_dialect(query, translator.dialect())?;
-                    let query_with_rel = parsed.with(&relations);
-                    let rel = relation::Relation::try_from((query_with_rel, translator))?;
-                    Ok((path.clone(), Arc::new(rel)))
-                }
-                Dialect::MsSql => {
-                    let translator = MsSqlTranslator;
-                    let parsed = sql::relation::parse_with_dialect(query, translator.dialect())?;
-                    let query_with_rel = parsed.with(&relations);
-                    let rel = relation::Relation::try_from((query_with_rel, translator))?;
-                    Ok((path.clone(), Arc::new(rel)))
-                }
-                Dialect::BigQuery => {
-                    let translator = BigQueryTranslator;
-                    let parsed = sql::relation::parse_with_dialect(query, translator.dialect())?;
-                    let query_with_rel = parsed.with(&relations);
-                    let rel = relation::Relation::try_from((query_with_rel, translator))?;
-                    Ok((path.clone(), Arc::new(rel)))
-                }
-                Dialect::MySql => {
-                    let translator = MySqlTranslator;
-                    let parsed = sql::relation::parse_with_dialect(query, translator.dialect())?;
-                    let query_with_rel = parsed.with(&relations);
-                    let rel = relation::Relation::try_from((query_with_rel, translator))?;
-                    Ok((path.clone(), Arc::new(rel)))
-                }
-                Dialect::Hive => {
-                    let translator = HiveTranslator;
-                    let parsed = sql::relation::parse_with_dialect(query, translator.dialect())?;
-                    let query_with_rel = parsed.with(&relations);
-                    let rel = relation::Relation::try_from((query_with_rel, translator))?;
-                    Ok((path.clone(), Arc::new(rel)))
-                }
-                Dialect::Databricks => {
-                    let translator = DatabricksTranslator;
-                    let parsed = sql::relation::parse_with_dialect(query, translator.dialect())?;
-                    let query_with_rel = parsed.with(&relations);
-                    let rel = relation::Relation::try_from((query_with_rel, translator))?;
-                    Ok((path.clone(), Arc::new(rel)))
-                }
-                Dialect::RedshiftSql => {
-                    let translator = RedshiftSqlTranslator;
-                    let parsed = sql::relation::parse_with_dialect(query, translator.dialect())?;
-                    let query_with_rel = parsed.with(&relations);
-                    let rel = relation::Relation::try_from((query_with_rel, translator))?;
-                    Ok((path.clone(), Arc::new(rel)))
-                }
-            })
-            .collect();
+            .filter_map(|identifier| self.by_name.get(identifier))
+            .flatten()
+            .map(|&index| self.entries[index].clone())
+            .collect()
+    }
+}
+
+/// The lowercase identifiers of a query, quoted or not.
+/// String literals are not skipped: their words are collected too, which only adds candidates.
+fn identifiers(query: &str) -> HashSet<String> {
+    let mut identifiers = HashSet::new();
+    let mut word = String::new();
+    let mut chars = query.chars().peekable();
+    while let Some(c) = chars.next() {
+        if c.is_alphanumeric() || c == '_' || c == '$' {
+            word.push(c);
+            continue;
+        }
+        if !word.is_empty() {
+            identifiers.insert(word.to_lowercase());
+            word.clear();
+        }
+        let close = match c {
+            '"' | '`' => c,
+            '[' => ']',
+            _ => continue,
+        };
+        // Quoted identifiers may hold any character, a doubled closing quote stands for itself
+        while let Some(c) = chars.next() {
+            if c != close {
+                word.push(c);
+            } else if chars.peek() == Some(&close) {
+                word.push(close);
+                chars.next();
+            } else {
+                break;
+            }
+        }
+        identifiers.insert(word.to_lowercase());
+        word.clear();
+    }
+    if !word.is_empty() {
+        identifiers.insert(word.to_lowercase());
+    }
+    identifiers
+}
+
+/// A file mapped in memory, read as text
+struct MappedFile {
+    path: PathBuf,
+    // Empty files cannot be mapped
+    mmap: Option<Mmap>,
+}
 
-        let ds: data_spec::Dataset = (&result_relations?).try_into()?;
-        Ok(Dataset(ds))
+impl MappedFile {
+    fn open(path: &Path) -> Result<Self> {
+        let file = File::open(path)?;
+        let mmap = if file.metadata()?.len() == 0 {
+            None
+        } else {
+            // SAFETY: the file must not be modified while the Dataset is parsed from it
+            Some(unsafe { Mmap::map(&file)? })
+        };
+        Ok(MappedFile {
+            path: path.to_path_buf(),
+            mmap,
+        })
     }
 
-    pub fn __str__(&self) -> String {
-        format!("{}", self.0)
+    fn as_str(&self) -> Result<&str> {
+        let bytes = self.mmap.as_deref().unwrap_or_default();
+        Ok(std::str::from_utf8(bytes)
+            .map_err(|err| format!("{} is not valid UTF-8: {err}", self.path.display()))?)
+    }
+}
+
+/// Parses a query written in a given dialect
+pub(crate) fn parse_query(query: &str, dialect: &Dialect) -> Result<ast::Query> {
+    profiling::stage("parse", || -> Result<ast::Query> {
+        Ok(match dialect {
+            Dialect::PostgreSql => {
+                sql::relation::parse_with_dialect(query, PostgreSqlTranslator.dialect())?
+            }
+            Dialect::MsSql => sql::relation::parse_with_dialect(query, MsSqlTranslator.dialect())?,
+            Dialect::BigQuery => {
+                sql::relation::parse_with_dialect(query, BigQueryTranslator.dialect())?
+            }
+            Dialect::MySql => sql::relation::parse_with_dialect(query, MySqlTranslator.dialect())?,
+            Dialect::Hive => sql::relation::parse_with_dialect(query, HiveTranslator.dialect())?,
+            Dialect::Databricks => {
+                sql::relation::parse_with_dialect(query, DatabricksTranslator.dialect())?
+            }
+            Dialect::RedshiftSql => {
+                sql::relation::parse_with_dialect(query, RedshiftSqlTranslator.dialect())?
+            }
+        })
+    })
+}
+
+/// Builds the Relation of a parsed query, resolving its tables in `relations`
+fn query_relation(
+    query: ast::Query,
+    relations: &Hierarchy<Arc<relation::Relation>>,
+    dialect: &Dialect,
+) -> Result<relation::Relation> {
+    let query_with_relations = profiling::stage("with_relations", || query.with(relations));
+    profiling::stage("translate", || -> Result<relation::Relation> {
+        Ok(match dialect {
+            Dialect::PostgreSql => {
+                relation::Relation::try_from((query_with_relations, PostgreSqlTranslator))?
+            }
+            Dialect::MsSql => relation::Relation::try_from((query_with_relations, MsSqlTranslator))?,
+            Dialect::BigQuery => {
+                relation::Relation::try_from((query_with_relations, BigQueryTranslator))?
+            }
+            Dialect::MySql => relation::Relation::try_from((query_with_relations, MySqlTranslator))?,
+            Dialect::Hive => relation::Relation::try_from((query_with_relations, HiveTranslator))?,
+            Dialect::Databricks => {
+                relation::Relation::try_from((query_with_relations, DatabricksTranslator))?
+            }
+            Dialect::RedshiftSql => {
+                relation::Relation::try_from((query_with_relations, RedshiftSqlTranslator))?
+            }
+        })
+    })
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_identifiers() {
+        let identifiers = identifiers(
+            r#"SELECT a.x, "My Table".y FROM bench.Census_1 AS a JOIN "My Table" ON a.x = 'z' JOIN [dbo].[t2] USING (x)"#,
+        );
+        for identifier in ["census_1", "bench", "my table", "dbo", "t2", "x", "z"] {
+            assert!(identifiers.contains(identifier), "{identifier}");
+        }
+        assert!(!identifiers.contains("census"));
+    }
+
+    #[test]
+    fn test_escaped_identifiers() {
+        let identifiers = identifiers(r#"SELECT * FROM "a""b" JOIN `c``d` ON TRUE JOIN [e]]f] ON TRUE"#);
+        for identifier in ["a\"b", "c`d", "e]f", "true"] {
+            assert!(identifiers.contains(identifier), "{identifier}");
+        }
+        assert!(!identifiers.contains("b"));
     }
 }
@@ -2,7 +2,7 @@ use pyo3::prelude::*;
 
 /// An Enum with supported SQL Datasets
 #[pyclass]
-#[derive(Clone)]
+#[derive(Clone, Copy, Debug, PartialEq, Eq, Hash)]
 pub enum Dialect {
     PostgreSql,
     MsSql,
@@ -11,4 +11,12 @@ pub enum Dialect {
     Hive,
     Databricks,
     RedshiftSql,
-}
\ No newline at end of file
+}
+
+#[pymethods]
+impl Dialect {
+    /// Dialects can be used as dict keys, they hash as their integer value
+    fn __hash__(&self) -> u64 {
+        *self as u64
+    }
+}
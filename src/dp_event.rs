@@ -1,10 +1,10 @@
-use crate::relation::Relation;
+use crate::{accounting, error::Result, relation::Relation};
 use pyo3::{
     exceptions::PyAttributeError,
     prelude::*,
     types::{PyDict, PyList},
 };
-use qrlew::{differential_privacy::dp_event, rewriting::rewriting_rule};
+use qrlew::{differential_privacy::dp_event, relation, rewriting::rewriting_rule};
 use std::{ops::Deref, str, sync::Arc};
 
 #[pyclass]
@@ -19,98 +19,107 @@ impl DpEvent {
     pub fn _to_dict<'py>(event: &dp_event::DpEvent, py: Python<'py>) -> &'py PyDict {
         let dict = PyDict::new(py);
         let fields = PyList::empty(py);
-        dict.set_item("module_name", "dp_accounting.dp_event")
-            .unwrap();
-        fields.append("module_name").unwrap();
-        match event {
-            dp_event::DpEvent::NoOp => {
-                dict.set_item("class_name", "NoOpDpEvent").unwrap();
-                fields.append("class_name").unwrap();
-            }
-            dp_event::DpEvent::Gaussian { noise_multiplier } => {
-                dict.set_item("class_name", "GaussianDpEvent").unwrap();
-                fields.append("class_name").unwrap();
-                dict.set_item("noise_multiplier", noise_multiplier).unwrap();
-                fields.append("noise_multiplier").unwrap();
-            }
-            dp_event::DpEvent::Laplace { noise_multiplier } => {
-                dict.set_item("class_name", "LaplaceDpEvent").unwrap();
-                fields.append("class_name").unwrap();
-                dict.set_item("noise_multiplier", noise_multiplier).unwrap();
-                fields.append("noise_multiplier").unwrap();
-            }
-            dp_event::DpEvent::EpsilonDelta { epsilon, delta } => {
-                dict.set_item("class_name", "EpsilonDeltaDpEvent").unwrap();
-                fields.append("class_name").unwrap();
-                dict.set_item("epsilon", epsilon).unwrap();
-                fields.append("epsilon").unwrap();
-                dict.set_item("delta", delta).unwrap();
-                fields.append("delta").unwrap();
-            }
-            dp_event::DpEvent::Composed { events } => {
-                dict.set_item("class_name", "ComposedDpEvent").unwrap();
-                fields.append("class_name").unwrap();
-                dict.set_item(
-                    "events",
-                    PyList::new(
-                        py,
-                        events.into_iter().map(|event| DpEvent::_to_dict(event, py)),
-                    ),
+        for field in fields_names(event) {
+            let value: PyObject = match (field, event) {
+                ("events", dp_event::DpEvent::Composed { events }) => PyList::new(
+                    py,
+                    events.into_iter().map(|event| DpEvent::_to_dict(event, py)),
                 )
-                .unwrap();
-                fields.append("events").unwrap();
-            }
+                .into_py(py),
+                ("event", _) => DpEvent::_to_dict(sub_event(event, 0), py).into_py(py),
+                _ => scalar_field(event, field, py).unwrap(),
+            };
+            dict.set_item(field, value).unwrap();
+            fields.append(field).unwrap();
+        }
+        dict.set_item("_fields", fields).unwrap();
+        dict
+    }
+}
+
+/// The dp-accounting class name of an event
+fn class_name(event: &dp_event::DpEvent) -> &'static str {
+    match event {
+        dp_event::DpEvent::NoOp => "NoOpDpEvent",
+        dp_event::DpEvent::Gaussian { .. } => "GaussianDpEvent",
+        dp_event::DpEvent::Laplace { .. } => "LaplaceDpEvent",
+        dp_event::DpEvent::EpsilonDelta { .. } => "EpsilonDeltaDpEvent",
+        dp_event::DpEvent::Composed { .. } => "ComposedDpEvent",
+        dp_event::DpEvent::PoissonSampled { .. } => "PoissonSampledDpEvent",
+        dp_event::DpEvent::SampledWithReplacement { .. } => "SampledWithReplacementDpEvent",
+        dp_event::DpEvent::SampledWithoutReplacement { .. } => "SampledWitoutReplacement",
+    }
+}
+
+/// The dp-accounting field names of an event
+fn fields_names(event: &dp_event::DpEvent) -> Vec<&'static str> {
+    let fields: &[&'static str] = match event {
+        dp_event::DpEvent::NoOp => &[],
+        dp_event::DpEvent::Gaussian { .. } | dp_event::DpEvent::Laplace { .. } => {
+            &["noise_multiplier"]
+        }
+        dp_event::DpEvent::EpsilonDelta { .. } => &["epsilon", "delta"],
+        dp_event::DpEvent::Composed { .. } => &["events"],
+        dp_event::DpEvent::PoissonSampled { .. } => &["sampling_probability", "event"],
+        dp_event::DpEvent::SampledWithReplacement { .. }
+        | dp_event::DpEvent::SampledWithoutReplacement { .. } => {
+            &["source_dataset_size", "sample_size", "event"]
+        }
+    };
+    ["module_name", "class_name"]
+        .into_iter()
+        .chain(fields.iter().cloned())
+        .collect()
+}
+
+/// The value of a field of an event which is not a sub-event
+fn scalar_field(event: &dp_event::DpEvent, field: &str, py: Python) -> Option<PyObject> {
+    match (field, event) {
+        ("module_name", _) => Some("dp_accounting.dp_event".to_object(py)),
+        ("class_name", _) => Some(class_name(event).to_object(py)),
+        ("noise_multiplier", dp_event::DpEvent::Gaussian { noise_multiplier })
+        | ("noise_multiplier", dp_event::DpEvent::Laplace { noise_multiplier }) => {
+            Some(noise_multiplier.to_object(py))
+        }
+        ("epsilon", dp_event::DpEvent::EpsilonDelta { epsilon, .. }) => Some(epsilon.to_object(py)),
+        ("delta", dp_event::DpEvent::EpsilonDelta { delta, .. }) => Some(delta.to_object(py)),
+        (
+            "sampling_probability",
             dp_event::DpEvent::PoissonSampled {
                 sampling_probability,
-                event,
-            } => {
-                dict.set_item("class_name", "PoissonSampledDpEvent")
-                    .unwrap();
-                fields.append("class_name").unwrap();
-                dict.set_item("sampling_probability", sampling_probability)
-                    .unwrap();
-                fields.append("sampling_probability").unwrap();
-                dict.set_item("event", DpEvent::_to_dict(event, py))
-                    .unwrap();
-                fields.append("event").unwrap();
-            }
+                ..
+            },
+        ) => Some(sampling_probability.to_object(py)),
+        (
+            "source_dataset_size",
             dp_event::DpEvent::SampledWithReplacement {
                 source_dataset_size,
-                sample_size,
-                event,
-            } => {
-                dict.set_item("class_name", "SampledWithReplacementDpEvent")
-                    .unwrap();
-                fields.append("class_name").unwrap();
-                dict.set_item("source_dataset_size", source_dataset_size)
-                    .unwrap();
-                fields.append("source_dataset_size").unwrap();
-                dict.set_item("sample_size", sample_size).unwrap();
-                fields.append("sample_size").unwrap();
-                dict.set_item("event", DpEvent::_to_dict(event, py))
-                    .unwrap();
-                fields.append("event").unwrap();
-            }
+                ..
+            },
+        )
+        | (
+            "source_dataset_size",
             dp_event::DpEvent::SampledWithoutReplacement {
                 source_dataset_size,
-                sample_size,
-                event,
-            } => {
-                dict.set_item("class_name", "SampledWitoutReplacement")
-                    .unwrap();
-                fields.append("class_name").unwrap();
-                dict.set_item("source_dataset_size", source_dataset_size)
-                    .unwrap();
-                fields.append("source_dataset_size").unwrap();
-                dict.set_item("sample_size", sample_size).unwrap();
-                fields.append("sample_size").unwrap();
-                dict.set_item("event", DpEvent::_to_dict(event, py))
-                    .unwrap();
-                fields.append("event").unwrap();
-            }
+                ..
+            },
+        ) => Some(source_dataset_size.to_object(py)),
+        ("sample_size", dp_event::DpEvent::SampledWithReplacement { sample_size, .. })
+        | ("sample_size", dp_event::DpEvent::SampledWithoutReplacement { sample_size, .. }) => {
+            Some(sample_size.to_object(py))
         }
-        dict.set_item("_fields", fields).unwrap();
-        dict
+        _ => None,
+    }
+}
+
+/// The index-th sub-event of a composed or sampled event
+fn sub_event(event: &dp_event::DpEvent, index: usize) -> &dp_event::DpEvent {
+    match event {
+        dp_event::DpEvent::Composed { events } => &events[index],
+        dp_event::DpEvent::PoissonSampled { event, .. }
+        | dp_event::DpEvent::SampledWithReplacement { event, .. }
+        | dp_event::DpEvent::SampledWithoutReplacement { event, .. } => &**event,
+        _ => panic!("{event} has no sub-event"),
     }
 }
 
@@ -134,68 +143,123 @@ impl DpEvent {
     }
 
     /// Generate a namedtuple-like usable with https://github.com/google/differential-privacy/blob/main/python/dp_accounting/dp_event.py
+    /// Its attributes are read from the DpEvent when accessed, sub-events included.
     pub fn to_named_tuple<'py>(&self, py: Python<'py>) -> Py<NamedTuple> {
-        Py::new(py, NamedTuple::new(self.to_dict(py).into())).unwrap()
+        Py::new(py, NamedTuple::new(self.0.clone(), vec![])).unwrap()
+    }
+
+    /// Returns the epsilon of the DpEvent for a given delta, computed without building Python objects.
+    ///
+    /// Args:
+    ///     delta (float): the delta of the guarantee.
+    ///     accountant (Optional[str]): `rdp` (default) composes the Rényi DP guarantees of the mechanisms,
+    ///         `basic` sums their (epsilon, delta) guarantees.
+    ///
+    /// Returns:
+    ///     float:
+    pub fn epsilon_for_delta(&self, delta: f64, accountant: Option<&str>) -> Result<f64> {
+        let accountant = accountant.unwrap_or("rdp").parse()?;
+        accounting::epsilon_for_delta(self.deref(), delta, accountant)
+    }
+
+    #[staticmethod]
+    /// Composes DpEvents into a single DpEvent
+    ///
+    /// Args:
+    ///     events (Sequence[DpEvent]): the DpEvents to compose.
+    ///
+    /// Returns:
+    ///     DpEvent:
+    pub fn compose(events: Vec<DpEvent>) -> DpEvent {
+        DpEvent::new(Arc::new(dp_event::DpEvent::Composed {
+            events: events.iter().map(|event| event.deref().clone()).collect(),
+        }))
     }
 }
 
+/// A rewritten Relation and its DpEvent.
+/// Both are shared, the accessors return new handles without copying them.
 #[pyclass(name = "_RelationWithDpEvent")]
 #[derive(Clone, Debug)]
-pub struct RelationWithDpEvent(Arc<rewriting_rule::RelationWithDpEvent>);
+pub struct RelationWithDpEvent {
+    relation: Arc<relation::Relation>,
+    dp_event: Arc<dp_event::DpEvent>,
+}
 
 impl RelationWithDpEvent {
-    pub fn new(relation_with_dp_event: Arc<rewriting_rule::RelationWithDpEvent>) -> Self {
-        RelationWithDpEvent(relation_with_dp_event)
+    pub fn new(relation: Arc<relation::Relation>, dp_event: Arc<dp_event::DpEvent>) -> Self {
+        RelationWithDpEvent { relation, dp_event }
     }
 }
 
-impl Deref for RelationWithDpEvent {
-    type Target = rewriting_rule::RelationWithDpEvent;
-
-    fn deref(&self) -> &Self::Target {
-        &self.0
+impl From<rewriting_rule::RelationWithDpEvent> for RelationWithDpEvent {
+    /// The rewriting rule only lends its components, they are copied once here
+    fn from(relation_with_dp_event: rewriting_rule::RelationWithDpEvent) -> Self {
+        RelationWithDpEvent::new(
+            Arc::new(relation_with_dp_event.relation().clone()),
+            Arc::new(relation_with_dp_event.dp_event().clone()),
+        )
     }
 }
 
 #[pymethods]
 impl RelationWithDpEvent {
     pub fn __str__(&self) -> String {
-        let relation_with_qiery = self.0.as_ref();
-        format!(
-            "Relation: {}\nDpEvent: {}",
-            relation_with_qiery.relation(),
-            relation_with_qiery.dp_event()
-        )
+        format!("Relation: {}\nDpEvent: {}", self.relation, self.dp_event)
     }
+
     pub fn relation(&self) -> Relation {
-        let relation_with_qiery = self.0.as_ref();
-        Relation::new(Arc::new(relation_with_qiery.relation().clone()))
+        Relation::new(self.relation.clone())
     }
 
     pub fn dp_event(&self) -> DpEvent {
-        let relation_with_qiery = self.0.as_ref();
-        DpEvent::new(Arc::new(relation_with_qiery.dp_event().clone()))
+        DpEvent::new(self.dp_event.clone())
     }
 }
 
+/// A lazy view of a sub-event of a DpEvent, located by its path from the root event
 #[pyclass]
 #[derive(Clone, Debug)]
 pub struct NamedTuple {
-    dict: Py<PyDict>,
+    root: Arc<dp_event::DpEvent>,
+    path: Vec<usize>,
 }
 
-#[pymethods]
 impl NamedTuple {
-    #[new]
-    fn new(dict: Py<PyDict>) -> Self {
-        NamedTuple { dict }
+    fn new(root: Arc<dp_event::DpEvent>, path: Vec<usize>) -> Self {
+        NamedTuple { root, path }
+    }
+
+    fn event(&self) -> &dp_event::DpEvent {
+        self.path
+            .iter()
+            .fold(self.root.as_ref(), |event, index| sub_event(event, *index))
+    }
+
+    fn sub_event(&self, index: usize) -> Self {
+        let mut path = self.path.clone();
+        path.push(index);
+        NamedTuple::new(self.root.clone(), path)
     }
+}
 
-    fn __getattribute__<'py>(&'py self, name: &str, py: Python<'py>) -> PyResult<&'py PyAny> {
-        self.dict
-            .as_ref(py)
-            .get_item(name)?
-            .ok_or(PyAttributeError::new_err("Unknown attribute: {name}"))
+#[pymethods]
+impl NamedTuple {
+    fn __getattribute__(&self, name: &str, py: Python) -> PyResult<PyObject> {
+        let event = self.event();
+        match (name, event) {
+            ("_fields", _) => Ok(PyList::new(py, fields_names(event)).into_py(py)),
+            ("events", dp_event::DpEvent::Composed { events }) => Ok(PyList::new(
+                py,
+                (0..events.len()).map(|index| Py::new(py, self.sub_event(index)).unwrap()),
+            )
+            .into_py(py)),
+            ("event", _) if fields_names(event).contains(&"event") => {
+                Ok(Py::new(py, self.sub_event(0))?.into_py(py))
+            }
+            _ => scalar_field(event, name, py)
+                .ok_or_else(|| PyAttributeError::new_err(format!("Unknown attribute: {name}"))),
+        }
     }
 }
 
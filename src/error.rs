@@ -2,7 +2,7 @@ use pyo3::exceptions::PyRuntimeError;
 use pyo3::prelude::PyErr;
 use qrlew::{differential_privacy, relation, rewriting, sql};
 use qrlew_sarus::{data_spec, protobuf};
-use std::{error, fmt, result};
+use std::{error, fmt, io, result};
 
 /*
 Error management
@@ -11,6 +11,18 @@ Error management
 #[derive(Debug)]
 pub struct Error(Box<dyn error::Error>);
 
+impl fmt::Display for Error {
+    fn fmt(&self, f: &mut fmt::Formatter) -> fmt::Result {
+        write!(f, "{}", self.0)
+    }
+}
+
+impl From<String> for Error {
+    fn from(message: String) -> Error {
+        Error(message.into())
+    }
+}
+
 impl From<Error> for PyErr {
     fn from(err: Error) -> PyErr {
         PyRuntimeError::new_err(err.0.to_string())
@@ -29,6 +41,12 @@ impl From<protobuf::PrintError> for Error {
     }
 }
 
+impl From<::protobuf::Error> for Error {
+    fn from(err: ::protobuf::Error) -> Error {
+        Error(Box::new(err))
+    }
+}
+
 impl From<data_spec::Error> for Error {
     fn from(err: data_spec::Error) -> Error {
         Error(Box::new(err))
@@ -59,6 +77,18 @@ impl From<rewriting::Error> for Error {
     }
 }
 
+impl From<serde_json::Error> for Error {
+    fn from(err: serde_json::Error) -> Error {
+        Error(Box::new(err))
+    }
+}
+
+impl From<io::Error> for Error {
+    fn from(err: io::Error) -> Error {
+        Error(Box::new(err))
+    }
+}
+
 #[derive(Debug, Clone)]
 pub struct MissingKeyError(pub String);
 
@@ -76,4 +106,21 @@ impl fmt::Display for MissingKeyError {
     }
 }
 
+#[derive(Debug, Clone)]
+pub struct AccountingError(pub String);
+
+impl error::Error for AccountingError {}
+
+impl From<AccountingError> for Error {
+    fn from(err: AccountingError) -> Error {
+        Error(Box::new(err))
+    }
+}
+
+impl fmt::Display for AccountingError {
+    fn fmt(&self, f: &mut fmt::Formatter) -> fmt::Result {
+        write!(f, "AccountingError: {}", self.0)
+    }
+}
+
 pub type Result<T> = result::Result<T, Error>;
@@ -0,0 +1,237 @@
+use crate::{
+    accounting::{orders, RdpAccount},
+    dp_event::DpEvent,
+    error::{AccountingError, Result},
+};
+use pyo3::prelude::*;
+use serde_json::{json, Value};
+use std::{fs, ops::Deref};
+
+/// A privacy budget and the running RDP composition of the DpEvents charged to it.
+/// Charging a DpEvent updates the composition in O(1) in the number of past events.
+///
+/// Args:
+///     epsilon (float): the epsilon of the budget.
+///     delta (float): the delta of the budget.
+#[pyclass]
+#[derive(Clone, Debug)]
+pub struct BudgetLedger {
+    epsilon: f64,
+    delta: f64,
+    account: RdpAccount,
+    events: usize,
+}
+
+impl BudgetLedger {
+    fn to_value(&self) -> Value {
+        json!({
+            "epsilon": self.epsilon,
+            "delta": self.delta,
+            "events": self.events,
+            "orders": orders().collect::<Vec<f64>>(),
+            "rdp": self.account.rdp,
+            "composed_epsilon": self.account.epsilon,
+            "composed_delta": self.account.delta,
+        })
+    }
+
+    fn from_value(value: &Value) -> Result<Self> {
+        let float = |key: &str| {
+            value[key]
+                .as_f64()
+                .ok_or_else(|| AccountingError(format!("Invalid ledger, {key} should be a number")))
+        };
+        let floats = |key: &str| {
+            value[key]
+                .as_array()
+                .and_then(|values| {
+                    // Unbounded RDP values are serialized as null
+                    values
+                        .iter()
+                        .map(|value| if value.is_null() { Some(f64::INFINITY) } else { value.as_f64() })
+                        .collect::<Option<Vec<f64>>>()
+                })
+                .ok_or_else(|| AccountingError(format!("Invalid ledger, {key} should be a list of numbers")))
+        };
+        if floats("orders")? != orders().collect::<Vec<f64>>() {
+            return Err(AccountingError("Invalid ledger, its RDP orders are not supported".to_string()).into());
+        }
+        let rdp = floats("rdp")?;
+        if rdp.len() != orders().count() {
+            return Err(AccountingError("Invalid ledger, it should have one RDP value per order".to_string()).into());
+        }
+        Ok(BudgetLedger {
+            epsilon: float("epsilon")?,
+            delta: float("delta")?,
+            account: RdpAccount {
+                rdp,
+                epsilon: float("composed_epsilon")?,
+                delta: float("composed_delta")?,
+            },
+            events: value["events"]
+                .as_u64()
+                .ok_or_else(|| AccountingError("Invalid ledger, events should be an integer".to_string()))?
+                as usize,
+        })
+    }
+}
+
+#[pymethods]
+impl BudgetLedger {
+    #[new]
+    pub fn new(epsilon: f64, delta: f64) -> Self {
+        BudgetLedger {
+            epsilon,
+            delta,
+            account: RdpAccount::default(),
+            events: 0,
+        }
+    }
+
+    pub fn __str__(&self) -> String {
+        format!(
+            "BudgetLedger(epsilon={}, delta={}, events={})",
+            self.epsilon, self.delta, self.events
+        )
+    }
+
+    #[getter]
+    pub fn epsilon(&self) -> f64 {
+        self.epsilon
+    }
+
+    #[getter]
+    pub fn delta(&self) -> f64 {
+        self.delta
+    }
+
+    /// The number of DpEvents charged
+    #[getter]
+    pub fn events(&self) -> usize {
+        self.events
+    }
+
+    /// Returns the epsilon spent by the charged DpEvents at the delta of the budget.
+    ///
+    /// Returns:
+    ///     float:
+    pub fn spent_epsilon(&self) -> Result<f64> {
+        self.account.epsilon(self.delta)
+    }
+
+    /// Returns the epsilon spent if a DpEvent was charged, without charging it.
+    ///
+    /// Args:
+    ///     dp_event (DpEvent): the DpEvent of a rewritten relation.
+    ///
+    /// Returns:
+    ///     float:
+    pub fn epsilon_after(&self, dp_event: &DpEvent) -> Result<f64> {
+        self.account.composed(dp_event.deref())?.epsilon(self.delta)
+    }
+
+    /// Returns whether a DpEvent fits in the remaining budget.
+    /// DpEvents the accountant does not support, or which overflow the delta of the budget, do not fit.
+    ///
+    /// Args:
+    ///     dp_event (DpEvent): the DpEvent of a rewritten relation.
+    ///
+    /// Returns:
+    ///     bool:
+    pub fn can_afford(&self, dp_event: &DpEvent) -> bool {
+        self.epsilon_after(dp_event)
+            .map(|epsilon| epsilon <= self.epsilon)
+            .unwrap_or(false)
+    }
+
+    /// Charges a DpEvent to the budget.
+    /// It raises an error and leaves the ledger unchanged if the DpEvent does not fit in the remaining budget.
+    ///
+    /// Args:
+    ///     dp_event (DpEvent): the DpEvent of a rewritten relation.
+    ///
+    /// Returns:
+    ///     float: the epsilon spent after the charge.
+    pub fn charge(&mut self, dp_event: &DpEvent) -> Result<f64> {
+        let account = self.account.composed(dp_event.deref())?;
+        let epsilon = account.epsilon(self.delta)?;
+        if epsilon > self.epsilon {
+            return Err(AccountingError(format!(
+                "Charging {} would spend epsilon={epsilon} out of a budget of epsilon={}",
+                dp_event.deref(),
+                self.epsilon
+            ))
+            .into());
+        }
+        self.account = account;
+        self.events += 1;
+        Ok(epsilon)
+    }
+
+    /// Returns a JSON representation of the ledger
+    ///
+    /// Returns:
+    ///     str:
+    pub fn to_json(&self) -> String {
+        self.to_value().to_string()
+    }
+
+    #[staticmethod]
+    /// Builds a ledger from its JSON representation
+    ///
+    /// Args:
+    ///     ledger (str): the JSON representation of a ledger.
+    ///
+    /// Returns:
+    ///     BudgetLedger:
+    pub fn from_json(ledger: &str) -> Result<Self> {
+        BudgetLedger::from_value(&serde_json::from_str(ledger)?)
+    }
+
+    /// Saves the ledger in a JSON file
+    ///
+    /// Args:
+    ///     path (str): the path of the file.
+    pub fn save(&self, path: &str) -> Result<()> {
+        Ok(fs::write(path, self.to_json())?)
+    }
+
+    #[staticmethod]
+    /// Loads a ledger from a JSON file
+    ///
+    /// Args:
+    ///     path (str): the path of the file.
+    ///
+    /// Returns:
+    ///     BudgetLedger:
+    pub fn load(path: &str) -> Result<Self> {
+        BudgetLedger::from_json(&fs::read_to_string(path)?)
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use qrlew::differential_privacy::dp_event;
+    use std::sync::Arc;
+
+    #[test]
+    fn test_ledger() {
+        let gaussian = DpEvent::new(Arc::new(dp_event::DpEvent::Gaussian {
+            noise_multiplier: 10.,
+        }));
+        let mut ledger = BudgetLedger::new(1., 1e-5);
+        while ledger.can_afford(&gaussian) {
+            ledger.charge(&gaussian).unwrap();
+        }
+        assert!(ledger.events() > 1);
+        assert!(ledger.spent_epsilon().unwrap() <= 1.);
+        assert!(ledger.charge(&gaussian).is_err());
+        let loaded = BudgetLedger::from_json(&ledger.to_json()).unwrap();
+        assert_eq!(loaded.account, ledger.account);
+        assert_eq!(loaded.events(), ledger.events());
+        let mut truncated = ledger.to_value();
+        truncated["rdp"].as_array_mut().unwrap().pop();
+        assert!(BudgetLedger::from_value(&truncated).is_err());
+    }
+}
@@ -1,28 +1,45 @@
+pub mod accounting;
+pub mod compaction;
 pub mod dataset;
 pub mod dialect;
 pub mod dp_event;
 pub mod error;
+pub mod ledger;
+pub mod messages;
+pub mod optimization;
+pub mod profiling;
 pub mod relation;
+pub mod threads;
 pub mod utils;
 use pyo3::wrap_pyfunction;
 
 pub use crate::{
-    dataset::Dataset,
+    dataset::{Dataset, RelationsIterator},
     dialect::Dialect,
     relation::{Relation, Strategy}
 };
-use dp_event::RelationWithDpEvent;
-use utils::tables_prefix;
+use dp_event::{DpEvent, RelationWithDpEvent};
+use ledger::BudgetLedger;
+use profiling::{start_profiling, stop_profiling};
+use utils::{fingerprint, fingerprint_many, tables_prefix, tables_prefix_many};
 use pyo3::prelude::*;
 
 /// A Python module implemented in Rust.
 #[pymodule]
 fn pyqrlew(_py: Python, m: &PyModule) -> PyResult<()> {
     m.add_class::<Dataset>()?;
+    m.add_class::<RelationsIterator>()?;
     m.add_class::<Relation>()?;
     m.add_class::<Dialect>()?;
     m.add_class::<Strategy>()?;
     m.add_class::<RelationWithDpEvent>()?;
+    m.add_class::<DpEvent>()?;
+    m.add_class::<BudgetLedger>()?;
     m.add_function(wrap_pyfunction!(tables_prefix, m)?)?;
+    m.add_function(wrap_pyfunction!(tables_prefix_many, m)?)?;
+    m.add_function(wrap_pyfunction!(fingerprint, m)?)?;
+    m.add_function(wrap_pyfunction!(fingerprint_many, m)?)?;
+    m.add_function(wrap_pyfunction!(start_profiling, m)?)?;
+    m.add_function(wrap_pyfunction!(stop_profiling, m)?)?;
     Ok(())
 }
@@ -0,0 +1,69 @@
+use ::protobuf::{
+    reflect::{ReflectFieldRef, ReflectValueRef},
+    MessageDyn,
+};
+use pyo3::{
+    prelude::*,
+    types::{PyBytes, PyDict, PyList},
+};
+
+/*
+Conversion of the protobuf messages into Python objects, through the protobuf reflection.
+
+The dicts are keyed by the names of the fields in the proto files and omit the fields with
+default values, as the json representations do. The 64 bits integers are Python ints and the enums their names.
+ */
+
+/// Converts a protobuf message into a dict
+pub fn to_dict<'py>(message: &dyn MessageDyn, py: Python<'py>) -> PyResult<&'py PyDict> {
+    let dict = PyDict::new(py);
+    for field in message.descriptor_dyn().fields() {
+        let value = match field.get_reflect(message) {
+            ReflectFieldRef::Optional(optional) => match optional.value() {
+                Some(value) => to_object(value, py)?,
+                None => continue,
+            },
+            ReflectFieldRef::Repeated(repeated) => {
+                if repeated.len() == 0 {
+                    continue;
+                }
+                let list = PyList::empty(py);
+                for index in 0..repeated.len() {
+                    list.append(to_object(repeated.get(index), py)?)?;
+                }
+                list.into_py(py)
+            }
+            ReflectFieldRef::Map(map) => {
+                if map.len() == 0 {
+                    continue;
+                }
+                let items = PyDict::new(py);
+                for (key, value) in &map {
+                    items.set_item(to_object(key, py)?, to_object(value, py)?)?;
+                }
+                items.into_py(py)
+            }
+        };
+        dict.set_item(field.name(), value)?;
+    }
+    Ok(dict)
+}
+
+fn to_object(value: ReflectValueRef, py: Python) -> PyResult<PyObject> {
+    Ok(match value {
+        ReflectValueRef::U32(value) => value.into_py(py),
+        ReflectValueRef::U64(value) => value.into_py(py),
+        ReflectValueRef::I32(value) => value.into_py(py),
+        ReflectValueRef::I64(value) => value.into_py(py),
+        ReflectValueRef::F32(value) => value.into_py(py),
+        ReflectValueRef::F64(value) => value.into_py(py),
+        ReflectValueRef::Bool(value) => value.into_py(py),
+        ReflectValueRef::String(value) => value.into_py(py),
+        ReflectValueRef::Bytes(value) => PyBytes::new(py, value).into_py(py),
+        ReflectValueRef::Enum(descriptor, number) => match descriptor.value_by_number(number) {
+            Some(value) => value.name().into_py(py),
+            None => number.into_py(py),
+        },
+        ReflectValueRef::Message(message) => to_dict(&*message, py)?.into_py(py),
+    })
+}
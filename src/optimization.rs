@@ -0,0 +1,314 @@
+use crate::compaction::{compact, rename_tables};
+use qrlew::ast;
+use std::{cmp::Ordering, collections::HashMap};
+
+/*
+Optimization of the rendered SQL, for the engines with weak optimizers.
+
+The passes only rewrite what keeps the types and the values of the query:
+- the boolean predicates on literals are folded (`(90) >= (0)` becomes `true`),
+  the numbers are compared exactly or not folded,
+  `WHERE true` is removed,
+- the `WITH` entries selecting all the columns of a previous entry, in order,
+  are replaced by this entry,
+- the identical entries are merged and the unused ones dropped, as in `compact`.
+The expressions are folded up to the function calls, their arguments are kept as is.
+ */
+
+/// Optimizes a query rendered by the qrlew translators
+pub fn optimize(mut query: ast::Query) -> ast::Query {
+    if let Some(with) = query.with.as_mut() {
+        for cte in with.cte_tables.iter_mut() {
+            fold_query(&mut cte.query);
+        }
+    }
+    fold_query(&mut query);
+    compact(remove_identities(query))
+}
+
+/// Replaces the `WITH` entries identical to a previous entry by this entry
+fn remove_identities(mut query: ast::Query) -> ast::Query {
+    let Some(mut with) = query.with.take() else {
+        return query;
+    };
+    let mut renamed: HashMap<String, ast::Ident> = HashMap::new();
+    let mut entries: HashMap<String, (ast::Ident, Vec<String>)> = HashMap::new();
+    for cte in with.cte_tables.iter_mut() {
+        let columns: Vec<String> = cte.alias.columns.iter().map(|column| column.to_string()).collect();
+        // Without aliases, the source is a bare table name
+        let mut unaliased = cte.query.clone();
+        rename_tables(&mut unaliased, &renamed, false);
+        match identity_source(&unaliased, &columns, &entries) {
+            Some(source) => {
+                renamed.insert(cte.alias.name.value.clone(), source);
+            }
+            None => {
+                rename_tables(&mut cte.query, &renamed, true);
+                entries.insert(cte.alias.name.value.clone(), (cte.alias.name.clone(), columns));
+            }
+        }
+    }
+    // The entries are taken out of the query, only its body is renamed
+    rename_tables(&mut query, &renamed, true);
+    query.with = Some(with);
+    query
+}
+
+/// If a query selects all the columns of a previous entry, in order and with the same names,
+/// returns the name of this entry
+fn identity_source(
+    query: &ast::Query,
+    columns: &[String],
+    entries: &HashMap<String, (ast::Ident, Vec<String>)>,
+) -> Option<ast::Ident> {
+    let ast::SetExpr::Select(select) = query.body.as_ref() else {
+        return None;
+    };
+    let [table] = select.from.as_slice() else {
+        return None;
+    };
+    let ast::TableFactor::Table {
+        name, alias: None, ..
+    } = &table.relation
+    else {
+        return None;
+    };
+    let [source] = name.0.as_slice() else {
+        return None;
+    };
+    let (source, source_columns) = entries.get(&source.value)?;
+    if source_columns.as_slice() != columns {
+        return None;
+    }
+    // No clause other than the projection and the table
+    let projection: Vec<String> = select.projection.iter().map(|item| item.to_string()).collect();
+    let bare_select = format!("SELECT {} FROM {}", projection.join(", "), table);
+    if query.to_string() != bare_select {
+        return None;
+    }
+    let is_identity = projection == ["*"]
+        || (projection.len() == columns.len()
+            && projection
+                .iter()
+                .zip(columns)
+                .all(|(item, column)| *item == *column || *item == format!("{column} AS {column}")));
+    is_identity.then(|| source.clone())
+}
+
+/// Folds the constant predicates of the selects of a query, but not of its `WITH` entries
+fn fold_query(query: &mut ast::Query) {
+    fold_set_expr(&mut query.body)
+}
+
+fn fold_set_expr(set_expr: &mut ast::SetExpr) {
+    match set_expr {
+        ast::SetExpr::Select(select) => {
+            for item in select.projection.iter_mut() {
+                match item {
+                    ast::SelectItem::UnnamedExpr(expr) => fold_expr(expr),
+                    ast::SelectItem::ExprWithAlias { expr, .. } => fold_expr(expr),
+                    _ => {}
+                }
+            }
+            if let Some(selection) = select.selection.as_mut() {
+                fold_expr(selection);
+            }
+            if matches!(select.selection, Some(ast::Expr::Value(ast::Value::Boolean(true)))) {
+                select.selection = None;
+            }
+            if let Some(having) = select.having.as_mut() {
+                fold_expr(having);
+            }
+        }
+        ast::SetExpr::Query(query) => fold_query(query),
+        ast::SetExpr::SetOperation { left, right, .. } => {
+            fold_set_expr(left);
+            fold_set_expr(right);
+        }
+        _ => {}
+    }
+}
+
+/// A numeric literal, kept exact: the integers are compared as integers and the
+/// decimals only if a f64 orders them exactly
+#[derive(Clone, Copy, Debug, PartialEq)]
+enum Number {
+    Integer(i128),
+    Decimal(f64),
+}
+
+/// The decimals with at most 15 significant digits are distinct f64 and rounding is monotonic
+const EXACT_DIGITS: usize = 15;
+
+impl Number {
+    fn parse(number: &str) -> Option<Number> {
+        if let Ok(integer) = number.parse::<i128>() {
+            return Some(Number::Integer(integer));
+        }
+        let mantissa = number.split(['e', 'E']).next()?;
+        let digits = mantissa.chars().filter(char::is_ascii_digit).collect::<String>();
+        let significant = digits.trim_start_matches('0').trim_end_matches('0').len();
+        let decimal: f64 = number.parse().ok()?;
+        // Subnormal values lose precision
+        (significant <= EXACT_DIGITS && decimal.is_finite() && (decimal == 0. || decimal.abs() >= f64::MIN_POSITIVE))
+            .then_some(Number::Decimal(decimal))
+    }
+
+    fn decimal(self) -> Option<f64> {
+        match self {
+            Number::Integer(integer) => {
+                (integer.unsigned_abs() < 10u128.pow(EXACT_DIGITS as u32)).then_some(integer as f64)
+            }
+            Number::Decimal(decimal) => Some(decimal),
+        }
+    }
+
+    fn compare(self, other: Number) -> Option<Ordering> {
+        match (self, other) {
+            (Number::Integer(left), Number::Integer(right)) => Some(left.cmp(&right)),
+            (left, right) => left.decimal()?.partial_cmp(&right.decimal()?),
+        }
+    }
+}
+
+fn number(expr: &ast::Expr) -> Option<Number> {
+    match expr {
+        ast::Expr::Value(ast::Value::Number(number, _)) => Number::parse(number),
+        _ => None,
+    }
+}
+
+fn boolean(expr: &ast::Expr) -> Option<bool> {
+    match expr {
+        ast::Expr::Value(ast::Value::Boolean(boolean)) => Some(*boolean),
+        _ => None,
+    }
+}
+
+fn literal(value: bool) -> ast::Expr {
+    ast::Expr::Value(ast::Value::Boolean(value))
+}
+
+/// Folds the predicates on literals of an expression.
+/// Only boolean expressions are replaced, so that the types of the expressions are kept.
+fn fold_expr(expr: &mut ast::Expr) {
+    let folded = match expr {
+        ast::Expr::Nested(inner) => {
+            fold_expr(inner);
+            matches!(**inner, ast::Expr::Value(_)).then(|| (**inner).clone())
+        }
+        ast::Expr::UnaryOp { op, expr: inner } => {
+            fold_expr(inner);
+            match (op, &**inner) {
+                (ast::UnaryOperator::Not, inner) => boolean(inner).map(|value| literal(!value)),
+                (ast::UnaryOperator::Minus, ast::Expr::Value(ast::Value::Number(number, long)))
+                    if !number.starts_with('-') =>
+                {
+                    Some(ast::Expr::Value(ast::Value::Number(format!("-{number}"), *long)))
+                }
+                _ => None,
+            }
+        }
+        ast::Expr::BinaryOp { left, op, right } => {
+            fold_expr(left);
+            fold_expr(right);
+            match op {
+                ast::BinaryOperator::Gt
+                | ast::BinaryOperator::GtEq
+                | ast::BinaryOperator::Lt
+                | ast::BinaryOperator::LtEq => match (number(left), number(right)) {
+                    (Some(left), Some(right)) => left.compare(right).map(|ordering| {
+                        literal(match op {
+                            ast::BinaryOperator::Gt => ordering.is_gt(),
+                            ast::BinaryOperator::GtEq => ordering.is_ge(),
+                            ast::BinaryOperator::Lt => ordering.is_lt(),
+                            _ => ordering.is_le(),
+                        })
+                    }),
+                    _ => None,
+                },
+                // `false AND x` is false and `true OR x` is true, even if x is NULL
+                ast::BinaryOperator::And => match (boolean(left), boolean(right)) {
+                    (Some(false), _) | (_, Some(false)) => Some(literal(false)),
+                    (Some(true), _) => Some((**right).clone()),
+                    (_, Some(true)) => Some((**left).clone()),
+                    _ => None,
+                },
+                ast::BinaryOperator::Or => match (boolean(left), boolean(right)) {
+                    (Some(true), _) | (_, Some(true)) => Some(literal(true)),
+                    (Some(false), _) => Some((**right).clone()),
+                    (_, Some(false)) => Some((**left).clone()),
+                    _ => None,
+                },
+                _ => None,
+            }
+        }
+        ast::Expr::Case {
+            operand,
+            conditions,
+            results,
+            else_result,
+        } => {
+            // The branches are kept, as removing one may change the type of the CASE
+            if let Some(operand) = operand.as_mut() {
+                fold_expr(operand);
+            }
+            for expr in conditions.iter_mut().chain(results.iter_mut()) {
+                fold_expr(expr);
+            }
+            if let Some(else_result) = else_result.as_mut() {
+                fold_expr(else_result);
+            }
+            None
+        }
+        _ => None,
+    };
+    if let Some(folded) = folded {
+        *expr = folded;
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use qrlew::sql::relation::parse;
+
+    #[test]
+    fn test_optimize() {
+        let query = parse(
+            "WITH a (x, y) AS (SELECT x, y FROM t), b (x, y) AS (SELECT x AS x, y AS y FROM a), \
+            c (z) AS (SELECT CASE WHEN ((90) >= (-(0.5))) OR (x > 1) THEN x ELSE 0 END AS z FROM b WHERE (1 < 2) AND (y > 0)) \
+            SELECT * FROM c",
+        )
+        .unwrap();
+        let optimized = optimize(query).to_string();
+        println!("{optimized}");
+        assert_eq!(
+            optimized,
+            "WITH a (x, y) AS (SELECT x, y FROM t), \
+            c (z) AS (SELECT CASE WHEN true THEN x ELSE 0 END AS z FROM a AS b WHERE (y > 0)) \
+            SELECT * FROM c"
+        );
+    }
+
+    #[test]
+    fn test_fold_exact_numbers() {
+        let query = parse(
+            "SELECT x FROM t WHERE (9223372036854775807 > 9223372036854775806) \
+            AND (x > 0) AND (0.1 < 0.10000000000000001) AND (9007199254740993 > 9007199254740992.5)",
+        )
+        .unwrap();
+        let optimized = optimize(query).to_string();
+        println!("{optimized}");
+        // The large integers are compared exactly, the decimals not representable exactly are kept
+        assert_eq!(
+            optimized,
+            "SELECT x FROM t WHERE (x > 0) AND (0.1 < 0.10000000000000001) AND (9007199254740993 > 9007199254740992.5)"
+        );
+        assert_eq!(Number::parse("1.50e3"), Some(Number::Decimal(1500.)));
+        assert_eq!(
+            Number::parse("9223372036854775807").unwrap().compare(Number::parse("9223372036854775806").unwrap()),
+            Some(Ordering::Greater)
+        );
+    }
+}
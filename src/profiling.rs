@@ -0,0 +1,154 @@
+use pyo3::{exceptions::PyRuntimeError, prelude::*};
+use std::{
+    alloc::{GlobalAlloc, Layout, System},
+    cell::{Cell, RefCell},
+    sync::atomic::{AtomicUsize, Ordering},
+    time::Instant,
+};
+
+/*
+Opt-in profiling of the compilation stages.
+
+Stages are recorded per thread, between `start_profiling` and `stop_profiling`.
+Allocations are counted by a thin wrapper around the system allocator,
+only while a thread is profiling: otherwise it costs a relaxed atomic load.
+ */
+
+/// The system allocator, counting the allocations made by each thread
+pub struct CountingAllocator;
+
+#[global_allocator]
+static GLOBAL: CountingAllocator = CountingAllocator;
+
+/// The number of threads recording their stages
+static PROFILING_THREADS: AtomicUsize = AtomicUsize::new(0);
+
+thread_local! {
+    static ALLOCATIONS: Cell<usize> = const { Cell::new(0) };
+    static ALLOCATED_BYTES: Cell<usize> = const { Cell::new(0) };
+    static STAGES: RefCell<Option<Vec<Stage>>> = const { RefCell::new(None) };
+}
+
+fn count_allocation(size: usize) {
+    if PROFILING_THREADS.load(Ordering::Relaxed) == 0 {
+        return;
+    }
+    // `try_with` as the allocator may be called while the thread is torn down
+    let _ = ALLOCATIONS.try_with(|allocations| allocations.set(allocations.get() + 1));
+    let _ = ALLOCATED_BYTES.try_with(|bytes| bytes.set(bytes.get() + size));
+}
+
+unsafe impl GlobalAlloc for CountingAllocator {
+    unsafe fn alloc(&self, layout: Layout) -> *mut u8 {
+        count_allocation(layout.size());
+        System.alloc(layout)
+    }
+
+    unsafe fn alloc_zeroed(&self, layout: Layout) -> *mut u8 {
+        count_allocation(layout.size());
+        System.alloc_zeroed(layout)
+    }
+
+    unsafe fn realloc(&self, ptr: *mut u8, layout: Layout, new_size: usize) -> *mut u8 {
+        count_allocation(new_size);
+        System.realloc(ptr, layout, new_size)
+    }
+
+    unsafe fn dealloc(&self, ptr: *mut u8, layout: Layout) {
+        System.dealloc(ptr, layout)
+    }
+}
+
+/// The measures of a compilation stage
+#[derive(Clone, Debug)]
+pub struct Stage {
+    pub name: &'static str,
+    pub duration: f64,
+    pub allocations: usize,
+    pub allocated_bytes: usize,
+}
+
+fn is_profiling() -> bool {
+    STAGES.with(|stages| stages.borrow().is_some())
+}
+
+/// Runs `f` and records it as the stage `name` if profiling is on.
+/// Nested stages are recorded before the stage containing them.
+pub fn stage<T, F: FnOnce() -> T>(name: &'static str, f: F) -> T {
+    if !is_profiling() {
+        return f();
+    }
+    let allocations = ALLOCATIONS.with(Cell::get);
+    let allocated_bytes = ALLOCATED_BYTES.with(Cell::get);
+    let start = Instant::now();
+    let result = f();
+    let stage = Stage {
+        name,
+        duration: start.elapsed().as_secs_f64(),
+        allocations: ALLOCATIONS.with(Cell::get) - allocations,
+        allocated_bytes: ALLOCATED_BYTES.with(Cell::get) - allocated_bytes,
+    };
+    STAGES.with(|stages| {
+        if let Some(stages) = stages.borrow_mut().as_mut() {
+            stages.push(stage)
+        }
+    });
+    result
+}
+
+#[pyfunction]
+/// Starts recording the compilation stages run by the current thread.
+/// Raises a RuntimeError if the thread is already recording its stages.
+pub fn start_profiling() -> PyResult<()> {
+    STAGES.with(|stages| {
+        let mut stages = stages.borrow_mut();
+        if stages.is_some() {
+            return Err(PyRuntimeError::new_err(
+                "Profiling is already started in this thread",
+            ));
+        }
+        *stages = Some(Vec::new());
+        PROFILING_THREADS.fetch_add(1, Ordering::Relaxed);
+        Ok(())
+    })
+}
+
+#[pyfunction]
+/// Stops recording the compilation stages and returns them.
+///
+/// Returns:
+///     Sequence[Tuple[str, float, int, int]]: the name, the wall time in seconds,
+///         the number of allocations and the allocated bytes of each stage.
+pub fn stop_profiling() -> Vec<(&'static str, f64, usize, usize)> {
+    let stages = STAGES.with(|stages| stages.borrow_mut().take());
+    if stages.is_some() {
+        PROFILING_THREADS.fetch_sub(1, Ordering::Relaxed);
+    }
+    stages
+        .unwrap_or_default()
+        .into_iter()
+        .map(|stage| (stage.name, stage.duration, stage.allocations, stage.allocated_bytes))
+        .collect()
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_stage() {
+        assert_eq!(stage("not_recorded", || 1), 1);
+        start_profiling().unwrap();
+        assert!(start_profiling().is_err());
+        let values = stage("outer", || stage("inner", || vec![1, 2, 3]));
+        assert_eq!(values, vec![1, 2, 3]);
+        let stages = stop_profiling();
+        assert_eq!(
+            stages.iter().map(|(name, _, _, _)| *name).collect::<Vec<_>>(),
+            vec!["inner", "outer"]
+        );
+        assert!(stages[0].2 >= 1);
+        assert!(stages[1].3 >= stages[0].3);
+        assert!(stop_profiling().is_empty());
+    }
+}
@@ -1,10 +1,12 @@
 use crate::{
+    compaction,
     dataset::Dataset,
     dialect::Dialect,
     dp_event::RelationWithDpEvent,
     error::{MissingKeyError, Result},
+    messages, optimization, profiling, threads,
 };
-use pyo3::prelude::*;
+use pyo3::{exceptions::PyRuntimeError, prelude::*, types::PyDict};
 use qrlew::{
     ast,
     data_type::DataTyped,
@@ -27,12 +29,26 @@ use qrlew::{
     synthetic_data::SyntheticData,
 };
 use qrlew_sarus::protobuf::{print_to_string, type_};
-use std::{collections::HashMap, ops::Deref, str, sync::Arc};
+use std::{
+    collections::{HashMap, HashSet},
+    fmt::{self, Write},
+    ops::Deref,
+    str,
+    sync::{Arc, OnceLock},
+    thread,
+};
 
 /// A Relation is a Dataset transformed by a SQL query
 #[pyclass(name = "_Relation")]
 #[derive(Clone)]
-pub struct Relation(Arc<relation::Relation>);
+pub struct Relation(Arc<relation::Relation>, Arc<Cache>);
+
+/// What is derived from an immutable Relation, computed on first use and shared by its clones
+#[derive(Default)]
+struct Cache {
+    type_: OnceLock<type_::Type>,
+    type_string: OnceLock<String>,
+}
 
 impl Deref for Relation {
     type Target = relation::Relation;
@@ -44,7 +60,224 @@ impl Deref for Relation {
 
 impl Relation {
     pub fn new(relation: Arc<relation::Relation>) -> Self {
-        Relation(relation)
+        Relation(relation, Arc::new(Cache::default()))
+    }
+
+    /// The protobuf message of the Relation's schema data type
+    fn type_proto(&self) -> Result<&type_::Type> {
+        if let Some(type_proto) = self.1.type_.get() {
+            return Ok(type_proto);
+        }
+        let type_proto: type_::Type = (&self.0.schema().data_type()).try_into()?;
+        Ok(self.1.type_.get_or_init(|| type_proto))
+    }
+
+    /// `rewrite_as_privacy_unit_preserving`, holding the GIL
+    pub fn _rewrite_as_privacy_unit_preserving<'a>(
+        &'a self,
+        dataset: &'a Dataset,
+        privacy_unit: PrivacyUnitType<'a>,
+        epsilon_delta: HashMap<&'a str, f64>,
+        max_multiplicity: Option<f64>,
+        max_multiplicity_share: Option<f64>,
+        max_privacy_unit_groups: Option<u64>,
+        synthetic_data: Option<Vec<(Vec<&'a str>, Vec<&'a str>)>>,
+        strategy: Option<Strategy>,
+    ) -> Result<RelationWithDpEvent> {
+        let relation = self.deref().clone();
+        let relations = profiling::stage("relations", || dataset.hierarchy());
+        let synthetic_data = synthetic_data.map(|sd| {
+            SyntheticData::new(
+                sd.into_iter()
+                    .map(|(path, iden)| {
+                        let iden_as_vec_of_strings: Vec<String> =
+                            iden.iter().map(|s| s.to_string()).collect();
+                        (path, Identifier::from(iden_as_vec_of_strings))
+                    })
+                    .collect(),
+            )
+        });
+        let privacy_unit = PrivacyUnit::from(privacy_unit);
+        let epsilon = epsilon_delta
+            .get("epsilon")
+            .ok_or(MissingKeyError("epsilon".to_string()))?;
+        let delta = epsilon_delta
+            .get("delta")
+            .ok_or(MissingKeyError("delta".to_string()))?;
+        let dp_parameters = {
+            let mut dp_parameters = DpParameters::from_epsilon_delta(*epsilon, *delta);
+            if let Some(max_multiplicity) = max_multiplicity {
+                dp_parameters = dp_parameters.with_privacy_unit_max_multiplicity(max_multiplicity);
+            }
+            if let Some(max_multiplicity_share) = max_multiplicity_share {
+                dp_parameters =
+                    dp_parameters.with_privacy_unit_max_multiplicity_share(max_multiplicity_share);
+            }
+            if let Some(max_privacy_unit_groups) = max_privacy_unit_groups {
+                dp_parameters = dp_parameters.with_max_privacy_unit_groups(max_privacy_unit_groups)
+            }
+            dp_parameters
+        };
+        let relation_with_dp_event = profiling::stage("rewrite", || {
+            relation.rewrite_as_privacy_unit_preserving(
+                relations,
+                synthetic_data,
+                privacy_unit,
+                dp_parameters,
+                strategy.map(|s| s.into()),
+            )
+        })?;
+        Ok(RelationWithDpEvent::from(relation_with_dp_event))
+    }
+
+
+    /// `rewrite_with_differential_privacy`, holding the GIL
+    pub fn _rewrite_with_differential_privacy<'a>(
+        &'a self,
+        dataset: &'a Dataset,
+        privacy_unit: PrivacyUnitType<'a>,
+        epsilon_delta: HashMap<&'a str, f64>,
+        max_multiplicity: Option<f64>,
+        max_multiplicity_share: Option<f64>,
+        max_privacy_unit_groups: Option<u64>,
+        synthetic_data: Option<Vec<(Vec<&'a str>, Vec<&'a str>)>>,
+    ) -> Result<RelationWithDpEvent> {
+        let relation = self.deref().clone();
+        let relations = profiling::stage("relations", || dataset.hierarchy());
+        let synthetic_data = synthetic_data.map(|sd| {
+            SyntheticData::new(
+                sd.into_iter()
+                    .map(|(path, iden)| {
+                        let iden_as_vec_of_strings: Vec<String> =
+                            iden.iter().map(|s| s.to_string()).collect();
+                        (path, Identifier::from(iden_as_vec_of_strings))
+                    })
+                    .collect(),
+            )
+        });
+        let privacy_unit = PrivacyUnit::from(privacy_unit);
+        let epsilon = epsilon_delta
+            .get("epsilon")
+            .ok_or(MissingKeyError("epsion".to_string()))?;
+        let delta = epsilon_delta
+            .get("delta")
+            .ok_or(MissingKeyError("delta".to_string()))?;
+        let dp_parameters = {
+            let mut dp_parameters = DpParameters::from_epsilon_delta(*epsilon, *delta);
+            if let Some(max_multiplicity) = max_multiplicity {
+                dp_parameters = dp_parameters.with_privacy_unit_max_multiplicity(max_multiplicity);
+            }
+            if let Some(max_multiplicity_share) = max_multiplicity_share {
+                dp_parameters =
+                    dp_parameters.with_privacy_unit_max_multiplicity_share(max_multiplicity_share);
+            }
+            if let Some(max_privacy_unit_groups) = max_privacy_unit_groups {
+                dp_parameters = dp_parameters.with_max_privacy_unit_groups(max_privacy_unit_groups)
+            } 
+            dp_parameters
+        };
+        let relation_with_dp_event = profiling::stage("rewrite", || {
+            relation.rewrite_with_differential_privacy(
+                relations,
+                synthetic_data,
+                privacy_unit,
+                dp_parameters,
+            )
+        })?;
+        Ok(RelationWithDpEvent::from(relation_with_dp_event))
+    }
+
+    /// `to_query`, holding the GIL
+    pub fn _to_query(&self, dialect: Option<Dialect>, compact: bool, optimize: bool) -> String {
+        let query = self.to_ast(dialect, compact, optimize);
+        profiling::stage("print", || query.to_string())
+    }
+
+    /// The SQL AST of the Relation in a dialect, compacted if `compact` and optimized if `optimize`
+    fn to_ast(&self, dialect: Option<Dialect>, compact: bool, optimize: bool) -> ast::Query {
+        let relation = &*(self.0);
+        let dialect = dialect.unwrap_or(Dialect::PostgreSql);
+        let query = profiling::stage("render", || match dialect {
+            Dialect::PostgreSql => {
+                ast::Query::from(RelationWithTranslator(&relation, PostgreSqlTranslator))
+            }
+            Dialect::MsSql => ast::Query::from(RelationWithTranslator(&relation, MsSqlTranslator)),
+            Dialect::BigQuery => {
+                ast::Query::from(RelationWithTranslator(&relation, BigQueryTranslator))
+            }
+            Dialect::MySql => ast::Query::from(RelationWithTranslator(&relation, MySqlTranslator)),
+            Dialect::Hive => ast::Query::from(RelationWithTranslator(&relation, HiveTranslator)),
+            Dialect::Databricks => {
+                ast::Query::from(RelationWithTranslator(&relation, DatabricksTranslator))
+            }
+            Dialect::RedshiftSql => {
+                ast::Query::from(RelationWithTranslator(&relation, RedshiftSqlTranslator))
+            }
+        });
+        if optimize {
+            profiling::stage("optimize", || optimization::optimize(query))
+        } else if compact {
+            profiling::stage("compact", || compaction::compact(query))
+        } else {
+            query
+        }
+    }
+}
+
+/// The size of the chunks written by `Relation.write_query`
+const WRITE_CHUNK_SIZE: usize = 1 << 16;
+
+/// A `fmt::Write` forwarding the formatted text to the `write` method of a Python object
+/// in chunks of `WRITE_CHUNK_SIZE` bytes, so that the full text is never held in memory
+struct ChunkedWriter<'py> {
+    file: &'py PyAny,
+    buffer: String,
+    written: usize,
+    error: Option<PyErr>,
+}
+
+impl<'py> ChunkedWriter<'py> {
+    fn new(file: &'py PyAny) -> Self {
+        ChunkedWriter {
+            file,
+            buffer: String::with_capacity(WRITE_CHUNK_SIZE),
+            written: 0,
+            error: None,
+        }
+    }
+
+    fn flush(&mut self) -> fmt::Result {
+        if self.buffer.is_empty() {
+            return Ok(());
+        }
+        if let Err(err) = self.file.call_method1("write", (self.buffer.as_str(),)) {
+            self.error = Some(err);
+            return Err(fmt::Error);
+        }
+        self.written += self.buffer.len();
+        self.buffer.clear();
+        Ok(())
+    }
+
+    /// Flushes the remaining text and returns the number of bytes written
+    fn finish(mut self, result: fmt::Result) -> PyResult<usize> {
+        let result = result.and_then(|_| self.flush());
+        match (result, self.error) {
+            (Ok(()), _) => Ok(self.written),
+            (Err(_), Some(err)) => Err(err),
+            (Err(_), None) => Err(PyRuntimeError::new_err("Could not format the query")),
+        }
+    }
+}
+
+impl fmt::Write for ChunkedWriter<'_> {
+    fn write_str(&mut self, s: &str) -> fmt::Result {
+        self.buffer.push_str(s);
+        if self.buffer.len() >= WRITE_CHUNK_SIZE {
+            self.flush()
+        } else {
+            Ok(())
+        }
     }
 }
 
@@ -106,8 +339,13 @@ impl Relation {
     ///
     /// Returns:
     ///     Relation:
-    pub fn from_query(query: &str, dataset: &Dataset, dialect: Option<Dialect>) -> Result<Self> {
-        dataset.relation(query, dialect)
+    pub fn from_query(
+        query: &str,
+        dataset: &Dataset,
+        dialect: Option<Dialect>,
+        py: Python,
+    ) -> Result<Self> {
+        dataset.relation(query, dialect, py)
     }
 
     /// String representation of the `Relation` in the default dialect
@@ -138,10 +376,22 @@ impl Relation {
     /// Returns:
     ///     str:
     pub fn type_(&self) -> Result<String> {
-        let data_type = self.0.schema().data_type();
-        let struct_type_proto: type_::Type = (&data_type).try_into()?;
-        Ok(print_to_string(&struct_type_proto)?)
+        if let Some(type_string) = self.1.type_string.get() {
+            return Ok(type_string.clone());
+        }
+        let type_string = print_to_string(self.type_proto()?)?;
+        Ok(self.1.type_string.get_or_init(|| type_string).clone())
+    }
+
+    /// Returns the Relation's schema data type as a dict, built from the protobuf message
+    /// without going through json.
+    ///
+    /// Returns:
+    ///     Dict[str, Any]:
+    pub fn type_dict<'py>(&self, py: Python<'py>) -> PyResult<&'py PyDict> {
+        messages::to_dict(self.type_proto()?, py)
     }
+
     /// Returns as RelationWithDpEvent where it's relation propagates the privacy unit
     /// through the query.
     ///
@@ -175,49 +425,20 @@ impl Relation {
         max_privacy_unit_groups: Option<u64>,
         synthetic_data: Option<Vec<(Vec<&'a str>, Vec<&'a str>)>>,
         strategy: Option<Strategy>,
+        py: Python,
     ) -> Result<RelationWithDpEvent> {
-        let relation = self.deref().clone();
-        let relations = dataset.deref().relations();
-        let synthetic_data = synthetic_data.map(|sd| {
-            SyntheticData::new(
-                sd.into_iter()
-                    .map(|(path, iden)| {
-                        let iden_as_vec_of_strings: Vec<String> =
-                            iden.iter().map(|s| s.to_string()).collect();
-                        (path, Identifier::from(iden_as_vec_of_strings))
-                    })
-                    .collect(),
+        threads::allow_threads(py, || {
+            self._rewrite_as_privacy_unit_preserving(
+                dataset,
+                privacy_unit,
+                epsilon_delta,
+                max_multiplicity,
+                max_multiplicity_share,
+                max_privacy_unit_groups,
+                synthetic_data,
+                strategy,
             )
-        });
-        let privacy_unit = PrivacyUnit::from(privacy_unit);
-        let epsilon = epsilon_delta
-            .get("epsilon")
-            .ok_or(MissingKeyError("epsilon".to_string()))?;
-        let delta = epsilon_delta
-            .get("delta")
-            .ok_or(MissingKeyError("delta".to_string()))?;
-        let dp_parameters = {
-            let mut dp_parameters = DpParameters::from_epsilon_delta(*epsilon, *delta);
-            if let Some(max_multiplicity) = max_multiplicity {
-                dp_parameters = dp_parameters.with_privacy_unit_max_multiplicity(max_multiplicity);
-            }
-            if let Some(max_multiplicity_share) = max_multiplicity_share {
-                dp_parameters =
-                    dp_parameters.with_privacy_unit_max_multiplicity_share(max_multiplicity_share);
-            }
-            if let Some(max_privacy_unit_groups) = max_privacy_unit_groups {
-                dp_parameters = dp_parameters.with_max_privacy_unit_groups(max_privacy_unit_groups)
-            }
-            dp_parameters
-        };
-        let relation_with_dp_event = relation.rewrite_as_privacy_unit_preserving(
-            &relations,
-            synthetic_data,
-            privacy_unit,
-            dp_parameters,
-            strategy.map(|s| s.into()),
-        )?;
-        Ok(RelationWithDpEvent::new(Arc::new(relation_with_dp_event)))
+        })
     }
 
     /// It transforms a Relation into its differentially private equivalent.
@@ -251,48 +472,19 @@ impl Relation {
         max_multiplicity_share: Option<f64>,
         max_privacy_unit_groups: Option<u64>,
         synthetic_data: Option<Vec<(Vec<&'a str>, Vec<&'a str>)>>,
+        py: Python,
     ) -> Result<RelationWithDpEvent> {
-        let relation = self.deref().clone();
-        let relations = dataset.deref().relations();
-        let synthetic_data = synthetic_data.map(|sd| {
-            SyntheticData::new(
-                sd.into_iter()
-                    .map(|(path, iden)| {
-                        let iden_as_vec_of_strings: Vec<String> =
-                            iden.iter().map(|s| s.to_string()).collect();
-                        (path, Identifier::from(iden_as_vec_of_strings))
-                    })
-                    .collect(),
+        threads::allow_threads(py, || {
+            self._rewrite_with_differential_privacy(
+                dataset,
+                privacy_unit,
+                epsilon_delta,
+                max_multiplicity,
+                max_multiplicity_share,
+                max_privacy_unit_groups,
+                synthetic_data,
             )
-        });
-        let privacy_unit = PrivacyUnit::from(privacy_unit);
-        let epsilon = epsilon_delta
-            .get("epsilon")
-            .ok_or(MissingKeyError("epsion".to_string()))?;
-        let delta = epsilon_delta
-            .get("delta")
-            .ok_or(MissingKeyError("delta".to_string()))?;
-        let dp_parameters = {
-            let mut dp_parameters = DpParameters::from_epsilon_delta(*epsilon, *delta);
-            if let Some(max_multiplicity) = max_multiplicity {
-                dp_parameters = dp_parameters.with_privacy_unit_max_multiplicity(max_multiplicity);
-            }
-            if let Some(max_multiplicity_share) = max_multiplicity_share {
-                dp_parameters =
-                    dp_parameters.with_privacy_unit_max_multiplicity_share(max_multiplicity_share);
-            }
-            if let Some(max_privacy_unit_groups) = max_privacy_unit_groups {
-                dp_parameters = dp_parameters.with_max_privacy_unit_groups(max_privacy_unit_groups)
-            } 
-            dp_parameters
-        };
-        let relation_with_dp_event = relation.rewrite_with_differential_privacy(
-            &relations,
-            synthetic_data,
-            privacy_unit,
-            dp_parameters,
-        )?;
-        Ok(RelationWithDpEvent::new(Arc::new(relation_with_dp_event)))
+        })
     }
 
     /// Returns an SQL representation of the Relation.
@@ -300,36 +492,70 @@ impl Relation {
     /// Args:
     ///     dialect (Optional[Dialect]): dialect of generated sql query. If no dialect is provided,
     ///         the query will be in PostgreSql.
+    ///     compact (bool): merge the identical `WITH` entries and drop the unused ones.
+    ///     optimize (bool): fold the constant predicates, remove the identity `WITH` entries and compact the query.
     ///
     /// Returns:
     ///     str:
-    pub fn to_query(&self, dialect: Option<Dialect>) -> String {
-        let relation = &*(self.0);
-        let dialect = dialect.unwrap_or(Dialect::PostgreSql);
-        match dialect {
-            Dialect::PostgreSql => {
-                ast::Query::from(RelationWithTranslator(&relation, PostgreSqlTranslator))
-                    .to_string()
-            }
-            Dialect::MsSql => {
-                ast::Query::from(RelationWithTranslator(&relation, MsSqlTranslator)).to_string()
-            }
-            Dialect::BigQuery => {
-                ast::Query::from(RelationWithTranslator(&relation, BigQueryTranslator)).to_string()
-            }
-            Dialect::MySql => {
-                ast::Query::from(RelationWithTranslator(&relation, MySqlTranslator)).to_string()
-            }
-            Dialect::Hive => {
-                ast::Query::from(RelationWithTranslator(&relation, HiveTranslator)).to_string()
-            }
-            Dialect::Databricks => {
-                ast::Query::from(RelationWithTranslator(&relation, DatabricksTranslator)).to_string()
-            }
-            Dialect::RedshiftSql => {
-                ast::Query::from(RelationWithTranslator(&relation, RedshiftSqlTranslator)).to_string()
+    #[pyo3(signature = (dialect=None, compact=false, optimize=false))]
+    pub fn to_query(&self, dialect: Option<Dialect>, compact: bool, optimize: bool, py: Python) -> String {
+        py.allow_threads(|| self._to_query(dialect, compact, optimize))
+    }
+
+    /// Writes the SQL representation of the Relation to a writable text file object.
+    /// The query is written in chunks as it is printed, instead of being built as a whole string first.
+    ///
+    /// Args:
+    ///     file (TextIO): an object with a `write(str)` method.
+    ///     dialect (Optional[Dialect]): dialect of generated sql query. If no dialect is provided, the query will be in PostgreSql.
+    ///     compact (bool): merge the identical `WITH` entries and drop the unused ones.
+    ///     optimize (bool): fold the constant predicates, remove the identity `WITH` entries and compact the query.
+    ///
+    /// Returns:
+    ///     int: the number of bytes written.
+    #[pyo3(signature = (file, dialect=None, compact=false, optimize=false))]
+    pub fn write_query(
+        &self,
+        file: &PyAny,
+        dialect: Option<Dialect>,
+        compact: bool,
+        optimize: bool,
+        py: Python,
+    ) -> PyResult<usize> {
+        let query = py.allow_threads(|| self.to_ast(dialect, compact, optimize));
+        let mut writer = ChunkedWriter::new(file);
+        let result = profiling::stage("print", || write!(writer, "{query}"));
+        writer.finish(result)
+    }
+
+    /// Returns SQL representations of the Relation in several dialects.
+    /// The dialects are rendered in parallel threads.
+    ///
+    /// Args:
+    ///     dialects (Sequence[Dialect]): dialects of the generated sql queries.
+    ///
+    /// Returns:
+    ///     Mapping[Dialect, str]:
+    pub fn to_queries(&self, dialects: Vec<Dialect>, py: Python) -> HashMap<Dialect, String> {
+        let dialects: HashSet<Dialect> = dialects.into_iter().collect();
+        py.allow_threads(|| {
+            if dialects.len() <= 1 {
+                return dialects
+                    .into_iter()
+                    .map(|dialect| (dialect, self._to_query(Some(dialect), false, false)))
+                    .collect();
             }
-        }
+            thread::scope(|scope| {
+                let renderings: Vec<_> = dialects
+                    .into_iter()
+                    .map(|dialect| scope.spawn(move || (dialect, self._to_query(Some(dialect), false, false))))
+                    .collect();
+                renderings
+                    .into_iter()
+                    .map(|rendering| rendering.join().unwrap())
+                    .collect()
+            })
+        })
     }
 
     pub fn rename_fields(&self, fields: Vec<(&str, &str)>) -> Result<Self> {
@@ -356,6 +582,54 @@ impl Relation {
             self.deref().clone().with_field(name, (&expr).try_into()?),
         )))
     }
+
+    /// Returns the node counts of the Relation.
+    /// Relations are DAGs: a sub-relation can be an input of several relations.
+    ///
+    /// Returns:
+    ///     Mapping[str, int]: `nodes` the number of nodes of the expanded tree,
+    ///         `unique_nodes` the number of nodes held in memory
+    ///         and `distinct_nodes` the number of nodes with distinct names and inputs.
+    pub fn memory_usage(&self) -> HashMap<&'static str, usize> {
+        let mut counter = NodeCounter::default();
+        let (nodes, _) = counter.visit(self.deref());
+        HashMap::from([
+            ("nodes", nodes),
+            ("unique_nodes", counter.visited.len()),
+            ("distinct_nodes", counter.structures.len()),
+        ])
+    }
+}
+
+/// Counts the nodes of a Relation, visiting each shared node once
+#[derive(Default)]
+struct NodeCounter<'a> {
+    /// The tree size and the structure id of each visited node
+    visited: HashMap<*const relation::Relation, (usize, usize)>,
+    /// The structure ids by name and input structure ids
+    structures: HashMap<(&'a str, Vec<usize>), usize>,
+}
+
+impl<'a> NodeCounter<'a> {
+    fn visit(&mut self, relation: &'a relation::Relation) -> (usize, usize) {
+        let key = relation as *const relation::Relation;
+        if let Some(visited) = self.visited.get(&key) {
+            return *visited;
+        }
+        let (sizes, ids): (Vec<usize>, Vec<usize>) = relation
+            .inputs()
+            .into_iter()
+            .map(|input| self.visit(input))
+            .unzip();
+        let size = sizes.into_iter().fold(1, usize::saturating_add);
+        let next_id = self.structures.len();
+        let id = *self
+            .structures
+            .entry((relation.name(), ids))
+            .or_insert(next_id);
+        self.visited.insert(key, (size, id));
+        (size, id)
+    }
 }
 
 #[cfg(test)]
@@ -418,10 +692,10 @@ mod tests {
         ];
 
         for query in queries {
-            let relation = Relation::from_query(query, &dataset, None).unwrap();
+            let relation = dataset._relation(query, None).unwrap();
             println!("{}", relation.0);
             let dp_relation = relation
-                .rewrite_with_differential_privacy(
+                ._rewrite_with_differential_privacy(
                     &dataset,
                     privacy_unit.clone(),
                     budget.clone(),
@@ -431,16 +705,16 @@ mod tests {
                     synthetic_data.clone(),
                 )
                 .unwrap();
-            let dp_query = dp_relation.relation().to_query(None);
+            let dp_query = dp_relation.relation()._to_query(None, false, false);
             println!("\n\n{dp_query}");
         }
 
         // No synthetic data
         for query in queries {
-            let relation = Relation::from_query(query, &dataset, None).unwrap();
+            let relation = dataset._relation(query, None).unwrap();
             println!("{}", relation.0);
             let dp_relation = relation
-                .rewrite_with_differential_privacy(
+                ._rewrite_with_differential_privacy(
                     &dataset,
                     privacy_unit.clone(),
                     budget.clone(),
@@ -450,7 +724,7 @@ mod tests {
                     None,
                 )
                 .unwrap();
-            let dp_query = dp_relation.relation().to_query(None);
+            let dp_query = dp_relation.relation()._to_query(None, false, false);
             println!("\n\n{dp_query}");
         }
     }
@@ -461,7 +735,7 @@ mod tests {
         println!("{:?}", dataset.relations()[1].0);
 
         let query = r#"SELECT "age" AS s1 FROM census;"#;
-        let relation = Relation::from_query(query, &dataset, None).unwrap();
+        let relation = dataset._relation(query, None).unwrap();
 
         let trans =
             ast::Query::from(RelationWithTranslator(&relation, PostgreSqlTranslator)).to_string();
@@ -509,7 +783,7 @@ mod tests {
                 "SELECT * FROM extract.census WHERE age < 30".to_string(),
             ),
         ];
-        let new_ds = dataset.from_queries(queries, None).unwrap();
+        let new_ds = dataset._from_queries(queries, None).unwrap();
 
         println!("{:?}", new_ds.schema());
         let rels = new_ds.relations();
@@ -0,0 +1,18 @@
+use crate::error::{Error, Result};
+use pyo3::prelude::*;
+
+/*
+Running the compilation and rewriting work without holding the GIL,
+so that other Python threads can run meanwhile.
+ */
+
+/// Runs `f` with the GIL released.
+/// Errors are not `Send`, they cross the boundary as their messages.
+pub fn allow_threads<T, F>(py: Python, f: F) -> Result<T>
+where
+    T: Send,
+    F: Send + FnOnce() -> Result<T>,
+{
+    py.allow_threads(|| f().map_err(|err| err.to_string()))
+        .map_err(Error::from)
+}
@@ -1,6 +1,7 @@
-use crate::{dialect::Dialect, error::Result};
+use crate::{dataset::parse_query, dialect::Dialect, error::Result};
 use pyo3::prelude::*;
-use qrlew::{dialect_translation::{bigquery::BigQueryTranslator, databricks::DatabricksTranslator, hive::HiveTranslator, mssql::MsSqlTranslator, mysql::MySqlTranslator, postgresql::PostgreSqlTranslator, redshiftsql::RedshiftSqlTranslator}, sql};
+use qrlew::{ast, dialect_translation::{bigquery::BigQueryTranslator, databricks::DatabricksTranslator, hive::HiveTranslator, mssql::MsSqlTranslator, mysql::MySqlTranslator, postgresql::PostgreSqlTranslator, redshiftsql::RedshiftSqlTranslator}, sql};
+use std::thread;
 
 
 
@@ -20,6 +21,301 @@ pub fn tables_prefix(query: &str, dialect: Dialect) -> Result<Vec<String>> {
     }
 }
 
+/// Runs `f` on each query, in parallel threads, and returns the results in the order of the queries.
+/// Errors are returned as their messages.
+fn map_queries<T, F>(queries: &[String], f: F) -> Vec<std::result::Result<T, String>>
+where
+    T: Send,
+    F: Fn(&str) -> Result<T> + Sync,
+{
+    let threads = thread::available_parallelism().map_or(1, |threads| threads.get());
+    let chunk_size = queries.len().div_ceil(threads).max(1);
+    let f = &f;
+    thread::scope(|scope| {
+        let chunks: Vec<_> = queries
+            .chunks(chunk_size)
+            .map(|chunk| {
+                scope.spawn(move || {
+                    chunk
+                        .iter()
+                        .map(|query| f(query).map_err(|err| err.to_string()))
+                        .collect::<Vec<_>>()
+                })
+            })
+            .collect();
+        chunks
+            .into_iter()
+            .flat_map(|chunk| chunk.join().unwrap())
+            .collect()
+    })
+}
+
+#[pyfunction]
+/// Extracts the prefix of fully qualified table names from many queries, parsed in parallel.
+/// The results are returned in columnar form: the prefixes of each query, or None if it failed,
+/// and the error message of each query, or None if it succeeded.
+pub fn tables_prefix_many(
+    queries: Vec<String>,
+    dialect: Dialect,
+    py: Python,
+) -> (Vec<Option<Vec<String>>>, Vec<Option<String>>) {
+    py.allow_threads(|| {
+        map_queries(&queries, |query| tables_prefix(query, dialect))
+            .into_iter()
+            .map(|result| match result {
+                Ok(prefixes) => (Some(prefixes), None),
+                Err(err) => (None, Some(err)),
+            })
+            .unzip()
+    })
+}
+
+/// Replaces the literals in the expressions of a query by `?` placeholders and returns them in order,
+/// as written in SQL. The literals are parameterized in the projections, the `WHERE`, `HAVING` and
+/// `JOIN ... ON` clauses, the function arguments and the subqueries. `GROUP BY`, `ORDER BY`, `LIMIT`,
+/// `OFFSET` and the data types are part of the structure of the query and are kept as is,
+/// as are the existing placeholders.
+fn parameterize_query(query: &mut ast::Query, parameters: &mut Vec<String>) {
+    if let Some(with) = query.with.as_mut() {
+        for cte in with.cte_tables.iter_mut() {
+            parameterize_query(&mut cte.query, parameters);
+        }
+    }
+    parameterize_set_expr(&mut query.body, parameters)
+}
+
+fn parameterize_set_expr(set_expr: &mut ast::SetExpr, parameters: &mut Vec<String>) {
+    match set_expr {
+        ast::SetExpr::Select(select) => {
+            for item in select.projection.iter_mut() {
+                match item {
+                    ast::SelectItem::UnnamedExpr(expr) => parameterize_expr(expr, parameters),
+                    ast::SelectItem::ExprWithAlias { expr, .. } => parameterize_expr(expr, parameters),
+                    _ => {}
+                }
+            }
+            for table_with_joins in select.from.iter_mut() {
+                parameterize_table_with_joins(table_with_joins, parameters);
+            }
+            if let Some(selection) = select.selection.as_mut() {
+                parameterize_expr(selection, parameters);
+            }
+            if let Some(having) = select.having.as_mut() {
+                parameterize_expr(having, parameters);
+            }
+        }
+        ast::SetExpr::Query(query) => parameterize_query(query, parameters),
+        ast::SetExpr::SetOperation { left, right, .. } => {
+            parameterize_set_expr(left, parameters);
+            parameterize_set_expr(right, parameters);
+        }
+        _ => {}
+    }
+}
+
+fn parameterize_table_with_joins(table_with_joins: &mut ast::TableWithJoins, parameters: &mut Vec<String>) {
+    parameterize_table_factor(&mut table_with_joins.relation, parameters);
+    for join in table_with_joins.joins.iter_mut() {
+        parameterize_table_factor(&mut join.relation, parameters);
+        match &mut join.join_operator {
+            ast::JoinOperator::Inner(ast::JoinConstraint::On(expr))
+            | ast::JoinOperator::LeftOuter(ast::JoinConstraint::On(expr))
+            | ast::JoinOperator::RightOuter(ast::JoinConstraint::On(expr))
+            | ast::JoinOperator::FullOuter(ast::JoinConstraint::On(expr)) => parameterize_expr(expr, parameters),
+            _ => {}
+        }
+    }
+}
+
+fn parameterize_table_factor(table_factor: &mut ast::TableFactor, parameters: &mut Vec<String>) {
+    match table_factor {
+        ast::TableFactor::Derived { subquery, .. } => parameterize_query(subquery, parameters),
+        ast::TableFactor::NestedJoin {
+            table_with_joins, ..
+        } => parameterize_table_with_joins(table_with_joins, parameters),
+        _ => {}
+    }
+}
+
+fn placeholder() -> ast::Expr {
+    ast::Expr::Value(ast::Value::Placeholder("?".to_string()))
+}
+
+fn parameterize_expr(expr: &mut ast::Expr, parameters: &mut Vec<String>) {
+    match expr {
+        ast::Expr::Value(ast::Value::Placeholder(_)) => {}
+        ast::Expr::Value(_) | ast::Expr::TypedString { .. } => {
+            parameters.push(expr.to_string());
+            *expr = placeholder();
+        }
+        // A negative number is a single parameter
+        ast::Expr::UnaryOp {
+            op: ast::UnaryOperator::Minus,
+            expr: number,
+        } if matches!(number.as_ref(), ast::Expr::Value(ast::Value::Number(..))) => {
+            parameters.push(expr.to_string());
+            *expr = placeholder();
+        }
+        ast::Expr::UnaryOp { expr, .. }
+        | ast::Expr::Nested(expr)
+        | ast::Expr::Cast { expr, .. }
+        | ast::Expr::IsFalse(expr)
+        | ast::Expr::IsNotFalse(expr)
+        | ast::Expr::IsTrue(expr)
+        | ast::Expr::IsNotTrue(expr)
+        | ast::Expr::IsNull(expr)
+        | ast::Expr::IsNotNull(expr)
+        | ast::Expr::IsUnknown(expr)
+        | ast::Expr::IsNotUnknown(expr) => parameterize_expr(expr, parameters),
+        ast::Expr::BinaryOp { left, right, .. }
+        | ast::Expr::IsDistinctFrom(left, right)
+        | ast::Expr::IsNotDistinctFrom(left, right)
+        | ast::Expr::Like {
+            expr: left,
+            pattern: right,
+            ..
+        }
+        | ast::Expr::ILike {
+            expr: left,
+            pattern: right,
+            ..
+        }
+        | ast::Expr::SimilarTo {
+            expr: left,
+            pattern: right,
+            ..
+        } => {
+            parameterize_expr(left, parameters);
+            parameterize_expr(right, parameters);
+        }
+        ast::Expr::Between { expr, low, high, .. } => {
+            parameterize_expr(expr, parameters);
+            parameterize_expr(low, parameters);
+            parameterize_expr(high, parameters);
+        }
+        ast::Expr::InList { expr, list, .. } => {
+            parameterize_expr(expr, parameters);
+            for item in list.iter_mut() {
+                parameterize_expr(item, parameters);
+            }
+        }
+        ast::Expr::InSubquery { expr, subquery, .. } => {
+            parameterize_expr(expr, parameters);
+            parameterize_query(subquery, parameters);
+        }
+        ast::Expr::Subquery(subquery) | ast::Expr::Exists { subquery, .. } => {
+            parameterize_query(subquery, parameters)
+        }
+        ast::Expr::Case {
+            operand,
+            conditions,
+            results,
+            else_result,
+        } => {
+            if let Some(operand) = operand.as_mut() {
+                parameterize_expr(operand, parameters);
+            }
+            for (condition, result) in conditions.iter_mut().zip(results.iter_mut()) {
+                parameterize_expr(condition, parameters);
+                parameterize_expr(result, parameters);
+            }
+            if let Some(else_result) = else_result.as_mut() {
+                parameterize_expr(else_result, parameters);
+            }
+        }
+        ast::Expr::Function(function) => {
+            match &mut function.args {
+                ast::FunctionArguments::List(list) => {
+                    for arg in list.args.iter_mut() {
+                        match arg {
+                            ast::FunctionArg::Named {
+                                arg: ast::FunctionArgExpr::Expr(expr),
+                                ..
+                            }
+                            | ast::FunctionArg::Unnamed(ast::FunctionArgExpr::Expr(expr)) => {
+                                parameterize_expr(expr, parameters)
+                            }
+                            _ => {}
+                        }
+                    }
+                }
+                ast::FunctionArguments::Subquery(subquery) => parameterize_query(subquery, parameters),
+                ast::FunctionArguments::None => {}
+            }
+            if let Some(filter) = function.filter.as_mut() {
+                parameterize_expr(filter, parameters);
+            }
+        }
+        _ => {}
+    }
+}
+
+/// The 64 bits FNV-1a hash, stable across platforms and versions
+fn fnv1a(bytes: &[u8]) -> u64 {
+    bytes.iter().fold(0xcbf29ce484222325, |hash, byte| {
+        (hash ^ *byte as u64).wrapping_mul(0x100000001b3)
+    })
+}
+
+/// The hash, template and literals of a query
+fn query_fingerprint(query: &str, dialect: Option<Dialect>) -> Result<(String, String, Vec<String>)> {
+    let mut query = parse_query(query, &dialect.unwrap_or(Dialect::PostgreSql))?;
+    let mut parameters = vec![];
+    parameterize_query(&mut query, &mut parameters);
+    let template = query.to_string();
+    Ok((format!("{:016x}", fnv1a(template.as_bytes())), template, parameters))
+}
+
+#[pyfunction]
+#[pyo3(signature = (query, dialect=None))]
+/// Fingerprints a query: the query is parsed, the literals of its expressions are replaced
+/// by `?` placeholders and it is printed back in a normalized form, giving its template,
+/// and the template is hashed. `GROUP BY`, `ORDER BY`, `LIMIT`, `OFFSET` and the data types
+/// are kept in the template. Queries differing only by their literals, their spacing
+/// or the case of their keywords share the same hash.
+/// The hash is stable across platforms and versions.
+///
+/// Args:
+///     query (str): the query.
+///     dialect (Optional[Dialect]): the dialect of the query, PostgreSql if not provided.
+///
+/// Returns:
+///     Tuple[str, str, List[str]]: the hash, the template and the literals of the query.
+pub fn fingerprint(query: &str, dialect: Option<Dialect>) -> Result<(String, String, Vec<String>)> {
+    query_fingerprint(query, dialect)
+}
+
+#[pyfunction]
+#[pyo3(signature = (queries, dialect=None))]
+/// Fingerprints many queries, in parallel. The results are returned in columnar form:
+/// the hashes, templates and literals of each query, or None if it failed,
+/// and the error message of each query, or None if it succeeded.
+pub fn fingerprint_many(
+    queries: Vec<String>,
+    dialect: Option<Dialect>,
+    py: Python,
+) -> (
+    Vec<Option<String>>,
+    Vec<Option<String>>,
+    Vec<Option<Vec<String>>>,
+    Vec<Option<String>>,
+) {
+    py.allow_threads(|| {
+        let mut columns = (vec![], vec![], vec![], vec![]);
+        for result in map_queries(&queries, |query| query_fingerprint(query, dialect)) {
+            let (hash, template, parameters, error) = match result {
+                Ok((hash, template, parameters)) => (Some(hash), Some(template), Some(parameters), None),
+                Err(err) => (None, None, None, Some(err)),
+            };
+            columns.0.push(hash);
+            columns.1.push(template);
+            columns.2.push(parameters);
+            columns.3.push(error);
+        }
+        columns
+    })
+}
+
 #[cfg(test)]
 mod tests {
 
@@ -33,4 +329,57 @@ mod tests {
             tables, vec!["my_db".to_string()]
         )
     }
-}
\ No newline at end of file
+
+    #[test]
+    fn test_map_queries() {
+        let queries: Vec<String> = (0..100)
+            .map(|i| if i % 10 == 0 { "SELECT * FROM".to_string() } else { format!("SELECT * FROM db_{i}.sch.tab") })
+            .collect();
+        let results = map_queries(&queries, |query| tables_prefix(query, Dialect::PostgreSql));
+        assert_eq!(results.len(), 100);
+        assert!(results[0].is_err());
+        assert_eq!(results[42], Ok(vec!["db_42".to_string()]));
+    }
+
+    #[test]
+    fn test_fingerprint() {
+        let (hash, template, parameters) = fingerprint(
+            "select a, 'it''s' AS \"col 1\", E'a\\'b' AS e FROM t1 JOIN t2 ON t1.id = t2.id AND t2.k = 'x' \
+            WHERE x > 1.5e-3 AND y = -2 AND d = DATE '2024-01-01' AND z = $1 AND v::VARCHAR(10) = 'v' \
+            GROUP BY 1 ORDER BY 2 LIMIT 10",
+            None,
+        )
+        .unwrap();
+        println!("{template}");
+        assert_eq!(
+            template,
+            "SELECT a, ? AS \"col 1\", ? AS e FROM t1 JOIN t2 ON t1.id = t2.id AND t2.k = ? \
+            WHERE x > ? AND y = ? AND d = ? AND z = $1 AND v::VARCHAR(10) = ? \
+            GROUP BY 1 ORDER BY 2 LIMIT 10"
+        );
+        assert_eq!(
+            parameters,
+            vec!["'it''s'", "E'a\\'b'", "'x'", "1.5e-3", "-2", "DATE '2024-01-01'", "'v'"]
+        );
+        let (other_hash, _, _) = fingerprint(
+            "SELECT a,   'other' AS \"col 1\", E'' AS e FROM t1 JOIN t2 ON t1.id = t2.id AND t2.k = 'y' \
+            WHERE x > 2 AND y = 3 AND d = DATE '2025-01-01' AND z = $1 AND v::VARCHAR(10) = 'w' \
+            GROUP BY 1 ORDER BY 2 LIMIT 10",
+            Some(Dialect::PostgreSql),
+        )
+        .unwrap();
+        assert_eq!(hash, other_hash);
+        assert_ne!(hash, fingerprint("SELECT b FROM t1", None).unwrap().0);
+        // The positional references and the limits are not literals
+        let (_, template, parameters) = fingerprint(
+            "SELECT a, COALESCE(b, 0) FROM (SELECT * FROM t WHERE c IN ('u', 'v')) AS s GROUP BY 1, 2 ORDER BY 2 LIMIT 5 OFFSET 5",
+            None,
+        )
+        .unwrap();
+        assert_eq!(
+            template,
+            "SELECT a, COALESCE(b, ?) FROM (SELECT * FROM t WHERE c IN (?, ?)) AS s GROUP BY 1, 2 ORDER BY 2 LIMIT 5 OFFSET 5"
+        );
+        assert_eq!(parameters, vec!["0", "'u'", "'v'"]);
+    }
+}
@@ -1,6 +1,7 @@
 import os
 import numpy as np
 import pandas as pd
+import pytest
 from pyqrlew.io import PostgreSQL
 from pyqrlew import Dialect, Dataset
 from pyqrlew.utils import display_graph
@@ -629,3 +630,102 @@ def test_from_str():
     query = 'SELECT COUNT(DISTINCT sarus_privacy_unit) FROM primary_table'
     rel = Relation.from_query(query, real_ds)
     # display_graph(rel.dot())
+
+
+def test_bytes():
+    database = PostgreSQL()
+    dataset = database.extract()
+    dataset_bytes, schema_bytes, size_bytes = dataset.to_bytes()
+    assert isinstance(schema_bytes, bytes)
+    parsed = Dataset.from_bytes(dataset_bytes, memoryview(schema_bytes), size_bytes)
+    assert parsed.schema == dataset.schema
+    assert parsed.size == dataset.size
+    assert parsed.to_bytes() == (dataset_bytes, schema_bytes, size_bytes)
+    query = 'SELECT age FROM extract.census'
+    assert parsed.relation(query).to_query() == dataset.relation(query).to_query()
+
+
+def test_files(tmp_path):
+    dataset = '{"@type": "sarus_data_spec/sarus_data_spec.Dataset", "uuid": "d", "name": "files", "spec": {"file": {}}}'
+    schema = """{"@type": "sarus_data_spec/sarus_data_spec.Schema", "uuid": "s", "dataset": "d", "name": "files",
+    "type": {"name": "files", "struct": {"fields": [
+        {"name": "x", "type": {"name": "Integer", "integer": {"min": "0", "max": "10"}}}
+    ]}}}"""
+    (tmp_path / 'dataset.json').write_text(dataset)
+    (tmp_path / 'schema.json').write_text(schema)
+    (tmp_path / 'size.json').write_text('')
+    expected = Dataset.from_str(dataset, schema, '')
+    parsed = Dataset.from_files(tmp_path / 'dataset.json', tmp_path / 'schema.json', str(tmp_path / 'size.json'))
+    assert parsed.schema == expected.schema
+    assert Dataset.from_files(tmp_path / 'dataset.json', tmp_path / 'schema.json').size is None
+    assert parsed.relation('SELECT x FROM files').schema() == '{x: int[0 10]}'
+
+
+def test_referenced_tables():
+    def table(name, column, min, max):
+        return {'name': name, 'type': {'name': name, 'struct': {'fields': [
+            {'name': column, 'type': {'name': 'Integer', 'integer': {'min': min, 'max': max}}}
+        ]}}}
+
+    def schema(name, tables):
+        return {'name': name, 'type': {'name': name, 'union': {'fields': tables}}}
+
+    import json
+    dataset = Dataset.from_str(
+        json.dumps({'@type': 'sarus_data_spec/sarus_data_spec.Dataset', 'uuid': 'd', 'name': 'catalog', 'spec': {'file': {}}}),
+        json.dumps({'@type': 'sarus_data_spec/sarus_data_spec.Schema', 'uuid': 's', 'dataset': 'd', 'name': 'catalog',
+            'type': {'name': 'catalog', 'union': {'fields': [
+                schema('bench', [table('census_1', 'age', 20, 90), table('census_2', 'age', 0, 10), table('My Table', 'x', 1, 50)]),
+                schema('other', [table('census_2', 'age', 100, 200)]),
+            ]}}}),
+        '',
+    )
+    assert dataset.relation('SELECT age FROM bench.census_2').schema() == '{age: int[0 10]}'
+    assert dataset.relation('SELECT age FROM other.census_2').schema() == '{age: int[100 200]}'
+    assert dataset.relation('SELECT x FROM "My Table"').schema() == '{x: int[1 50]}'
+    assert dataset.relation('SELECT age FROM census_1').schema() == '{age: int[20 90]}'
+    relation = dataset.relation('SELECT a.age, t.x FROM bench.census_1 AS a JOIN bench."My Table" AS t ON a.age = t.x')
+    assert relation.schema() == '{age: int[20 50], x: int[20 50]}'
+    # The unqualified name is ambiguous, as when resolved against all the tables
+    with pytest.raises(RuntimeError):
+        dataset.relation('SELECT age FROM census_2')
+
+
+def normalized(value, json_keys=False):
+    """The 64 bits integers and the infinite floats are strings in json and
+    its keys are camelCase, the dicts have numbers and the protobuf field names.
+    The keys of the `properties` maps are kept as is."""
+    import re
+    if isinstance(value, dict):
+        return {
+            (re.sub(r'([A-Z])', lambda match: '_' + match.group(1).lower(), key) if json_keys else key):
+            normalized(item, json_keys and key != 'properties')
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [normalized(item, json_keys) for item in value]
+    if isinstance(value, str) and re.fullmatch(r'-?[0-9]+', value):
+        return int(value)
+    if value in ('Infinity', '-Infinity'):
+        return float(value)
+    return value
+
+
+def test_dicts():
+    import json
+    database = PostgreSQL()
+    dataset = database.extract()
+    assert normalized(dataset.schema_dict()) == normalized(json.loads(dataset.schema), json_keys=True)
+    assert normalized(dataset.size_dict()) == normalized(json.loads(dataset.size), json_keys=True)
+    relation = dataset.relation('SELECT age FROM extract.census')
+    assert normalized(relation.type_dict()) == normalized(json.loads(relation.type()), json_keys=True)
+    assert relation.type_dict()['struct']['fields'][0]['name'] == 'age'
+
+
+def test_iter_relations():
+    database = PostgreSQL()
+    dataset = database.extract()
+    relations = dataset.iter_relations()
+    path, relation = next(relations)
+    assert isinstance(relation, Relation)
+    assert [path] + [path for path, _ in relations] == [path for path, _ in dataset.relations()]
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+
+HEAVY_MODULES = ['sqlalchemy', 'pandas', 'numpy', 'matplotlib', 'qrlew_datasets', 'asyncio']
+# A generous bound for slow machines, the laziness itself is checked on the imported modules
+MAX_IMPORT_TIME_US = 1_000_000
+
+
+def import_time(statement: str) -> int:
+    """Returns the cumulative import time (in microseconds) of pyqrlew reported by `-X importtime`"""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        capture_output=True, text=True, check=True,
+    )
+    # Lines are formatted as: `import time: self [us] | cumulative | imported package`
+    for line in completed.stderr.splitlines():
+        fields = [field.strip() for field in line.split('|')]
+        if len(fields) == 3 and fields[2] == 'pyqrlew':
+            return int(fields[1])
+    raise ValueError(f'No import time reported for pyqrlew:\n{completed.stderr}')
+
+
+def test_import_is_lazy():
+    statement = (
+        'import sys, pyqrlew; '
+        f'assert not any(module in sys.modules for module in {HEAVY_MODULES!r}), '
+        f'[module for module in {HEAVY_MODULES!r} if module in sys.modules]'
+    )
+    assert import_time(statement) < MAX_IMPORT_TIME_US
+
+
+def test_lazy_attributes():
+    import pyqrlew
+    from pyqrlew.database import dataset_from_database
+    assert pyqrlew.dataset_from_database is dataset_from_database
+    assert pyqrlew.io.PostgreSQL is not None
+    assert 'tester' in dir(pyqrlew)
@@ -256,3 +256,252 @@ def test_writing_and_rewriting_many_times(tables, engine):
         with engine.connect() as conn:
             conn.execute(sa.text(query))
         # display_graph(rel.dot())
+
+
+def test_profile(extract_dataset):
+    from pyqrlew.profiling import profile
+    query = "SELECT age, COUNT(*) FROM extract.census GROUP BY age"
+    exported = []
+    with profile(callback=exported.append) as stages:
+        rel = Relation.from_query(query, extract_dataset)
+        _ = rel.to_query(Dialect.BigQuery)
+    assert [stage['stage'] for stage in stages] == ['relations', 'parse', 'with_relations', 'translate', 'render', 'print']
+    assert all(stage['duration'] >= 0 and stage['allocations'] > 0 for stage in stages)
+    assert exported == stages
+    with profile():
+        with pytest.raises(RuntimeError):
+            with profile():
+                pass
+
+
+def test_memory_usage(extract_dataset):
+    query = "SELECT a.age, COUNT(*) FROM extract.census a JOIN extract.census b ON a.age = b.age GROUP BY a.age"
+    rel = Relation.from_query(query, extract_dataset)
+    usage = rel.memory_usage()
+    assert set(usage) == {'nodes', 'unique_nodes', 'distinct_nodes'}
+    assert usage['distinct_nodes'] <= usage['unique_nodes'] <= usage['nodes']
+    dp_rel = rel.rewrite_with_differential_privacy(
+        dataset=extract_dataset,
+        privacy_unit=[("census", [], "_PRIVACY_UNIT_ROW_")],
+        epsilon_delta={"epsilon": 1.0, "delta": 1e-3},
+    ).relation()
+    dp_usage = dp_rel.memory_usage()
+    assert dp_usage['unique_nodes'] <= dp_usage['nodes']
+    assert dp_usage['unique_nodes'] > usage['unique_nodes']
+
+
+def test_to_queries(extract_dataset):
+    rel = Relation.from_query("SELECT age, COUNT(*) FROM extract.census GROUP BY age", extract_dataset)
+    dialects = [Dialect.PostgreSql, Dialect.MsSql, Dialect.BigQuery, Dialect.PostgreSql]
+    queries = rel.to_queries(dialects)
+    assert set(queries) == {Dialect.PostgreSql, Dialect.MsSql, Dialect.BigQuery}
+    for dialect, query in queries.items():
+        assert query == rel.to_query(dialect)
+    assert rel.to_queries([]) == {}
+
+
+def test_write_query(extract_dataset, tmp_path):
+    import io
+    rel = Relation.from_query("SELECT age, COUNT(*) FROM extract.census GROUP BY age", extract_dataset)
+    dp_rel = rel.rewrite_with_differential_privacy(
+        dataset=extract_dataset,
+        privacy_unit=[("census", [], "_PRIVACY_UNIT_ROW_")],
+        epsilon_delta={"epsilon": 1.0, "delta": 1e-3},
+    ).relation()
+    query = dp_rel.to_query(Dialect.MsSql)
+    text = io.StringIO()
+    assert dp_rel.write_query(text, Dialect.MsSql) == len(query.encode())
+    assert text.getvalue() == query
+    binary = io.BytesIO()
+    dp_rel.write_query(binary)
+    assert binary.getvalue().decode() == dp_rel.to_query()
+    path = tmp_path / 'query.sql'
+    with open(path, 'w') as f:
+        dp_rel.write_query(f.fileno())
+    assert path.read_text() == dp_rel.to_query()
+
+
+def test_compact_query(extract_dataset, engine):
+    import sqlalchemy as sa
+    query = "SELECT a.age, COUNT(*) AS n FROM extract.census a JOIN extract.census b ON a.age = b.age GROUP BY a.age ORDER BY a.age"
+    rel = Relation.from_query(query, extract_dataset)
+    compact = rel.to_query(compact=True)
+    assert len(compact) <= len(rel.to_query())
+    with engine.connect() as conn:
+        assert conn.execute(sa.text(compact)).all() == conn.execute(sa.text(rel.to_query())).all()
+    dp_rel = rel.rewrite_with_differential_privacy(
+        dataset=extract_dataset,
+        privacy_unit=[("census", [], "_PRIVACY_UNIT_ROW_")],
+        epsilon_delta={"epsilon": 1.0, "delta": 1e-3},
+    ).relation()
+    compact = dp_rel.to_query(compact=True)
+    # The noises are never merged
+    assert compact.count('RANDOM()') == dp_rel.to_query().count('RANDOM()')
+    with engine.connect() as conn:
+        conn.execute(sa.text(compact)).all()
+
+
+def test_optimize_query(extract_dataset, engine):
+    import sqlalchemy as sa
+    query = "SELECT age, COUNT(*) AS n, SUM(capital_gain) AS s FROM extract.census WHERE age > 30 GROUP BY age ORDER BY age"
+    rel = Relation.from_query(query, extract_dataset)
+    optimized = rel.to_query(optimize=True)
+    with engine.connect() as conn:
+        assert conn.execute(sa.text(optimized)).all() == conn.execute(sa.text(rel.to_query())).all()
+    dp_rel = rel.rewrite_with_differential_privacy(
+        dataset=extract_dataset,
+        privacy_unit=[("census", [], "_PRIVACY_UNIT_ROW_")],
+        epsilon_delta={"epsilon": 1.0, "delta": 1e-3},
+    ).relation()
+    optimized = dp_rel.to_query(optimize=True)
+    assert len(optimized) < len(dp_rel.to_query())
+    with engine.connect() as conn:
+        conn.execute(sa.text(optimized)).all()
+
+
+def test_epsilon_for_delta(extract_dataset):
+    query = "SELECT age, COUNT(*) FROM extract.census GROUP BY age"
+    rel = Relation.from_query(query, extract_dataset)
+    dp_event = rel.rewrite_with_differential_privacy(
+        dataset=extract_dataset,
+        privacy_unit=[("census", [], "_PRIVACY_UNIT_ROW_")],
+        epsilon_delta={"epsilon": 1.0, "delta": 1e-3},
+    ).dp_event()
+    epsilon = dp_event.epsilon_for_delta(1e-3, "basic")
+    assert epsilon > 0
+    assert dp_event.epsilon_for_delta(1e-3) <= epsilon + 1e-6
+    composed = dp_event.compose([dp_event, dp_event])
+    assert composed.to_dict()['class_name'] == 'ComposedDpEvent'
+    assert composed.epsilon_for_delta(2e-3, "basic") == pytest.approx(2 * epsilon)
+    with pytest.raises(RuntimeError):
+        dp_event.epsilon_for_delta(1e-3, "pld")
+
+
+def test_to_named_tuple(extract_dataset):
+    query = "SELECT age, COUNT(*) FROM extract.census GROUP BY age"
+    rel = Relation.from_query(query, extract_dataset)
+    dp_event = rel.rewrite_with_differential_privacy(
+        dataset=extract_dataset,
+        privacy_unit=[("census", [], "_PRIVACY_UNIT_ROW_")],
+        epsilon_delta={"epsilon": 1.0, "delta": 1e-3},
+    ).dp_event()
+    composed = dp_event.compose([dp_event, dp_event])
+    named_tuple = composed.to_named_tuple()
+    assert named_tuple.class_name == 'ComposedDpEvent'
+    assert named_tuple._fields == ['module_name', 'class_name', 'events']
+    events = composed.to_dict()['events']
+    assert [event.class_name for event in named_tuple.events] == [event['class_name'] for event in events]
+    with pytest.raises(AttributeError, match='Unknown attribute: noise_multiplier'):
+        named_tuple.noise_multiplier
+
+
+def test_budget_ledger(extract_dataset, tmp_path):
+    from pyqrlew import BudgetLedger
+    query = "SELECT age, COUNT(*) FROM extract.census GROUP BY age"
+    rel = Relation.from_query(query, extract_dataset)
+    dp_event = rel.rewrite_with_differential_privacy(
+        dataset=extract_dataset,
+        privacy_unit=[("census", [], "_PRIVACY_UNIT_ROW_")],
+        epsilon_delta={"epsilon": 1.0, "delta": 1e-3},
+    ).dp_event()
+    ledger = BudgetLedger(epsilon=3.0, delta=1e-2)
+    charges = 0
+    while ledger.can_afford(dp_event):
+        assert ledger.charge(dp_event) == pytest.approx(ledger.spent_epsilon())
+        charges += 1
+    assert charges == ledger.events > 0
+    with pytest.raises(RuntimeError):
+        ledger.charge(dp_event)
+    assert ledger.events == charges
+    path = str(tmp_path / 'ledger.json')
+    ledger.save(path)
+    loaded = BudgetLedger.load(path)
+    assert loaded.spent_epsilon() == ledger.spent_epsilon()
+    assert loaded.epsilon_after(dp_event) == ledger.epsilon_after(dp_event)
+
+
+def test_async(extract_dataset):
+    import asyncio
+    from pyqrlew.executor import configure_executor, get_executor
+    queries = [f"SELECT age, COUNT(*) FROM extract.census WHERE age > {age} GROUP BY age" for age in range(20)]
+    epsilon_delta = {"epsilon": 1.0, "delta": 1e-3}
+    privacy_unit = [("census", [], "_PRIVACY_UNIT_ROW_")]
+
+    async def compile(query):
+        relation = await extract_dataset.arelation(query)
+        dp_relation = await relation.arewrite_with_differential_privacy(
+            extract_dataset, privacy_unit, epsilon_delta
+        )
+        return await dp_relation.relation().ato_query()
+
+    async def compile_all():
+        return await asyncio.gather(*(compile(query) for query in queries))
+
+    previous = get_executor()
+    configure_executor(max_workers=4, max_pending=2)
+    try:
+        results = asyncio.run(compile_all())
+    finally:
+        configure_executor(previous.max_workers, previous.max_pending)
+    assert all(result.startswith('WITH') for result in results)
+    assert results[0] != results[-1]
+
+
+def test_async_reconfigure():
+    import asyncio
+    import time
+    from pyqrlew.executor import configure_executor, get_executor, run
+
+    async def run_all():
+        calls = [asyncio.ensure_future(run(lambda i=i: time.sleep(0.01) or i)) for i in range(8)]
+        await asyncio.sleep(0)
+        configure_executor(max_workers=2)
+        return await asyncio.gather(*calls)
+
+    previous = get_executor()
+    configure_executor(max_workers=1, max_pending=2)
+    try:
+        results = asyncio.run(run_all())
+    finally:
+        configure_executor(previous.max_workers, previous.max_pending)
+    assert results == list(range(8))
+
+
+def test_async_eval(extract_dataset, engine):
+    import asyncio
+    import sqlalchemy as sa
+    pytest.importorskip('asyncpg')
+    database = PostgreSQL()
+    relations = [
+        Relation.from_query(f"SELECT COUNT(*) AS n FROM extract.census WHERE age > {age}", extract_dataset)
+        for age in range(20, 30)
+    ]
+
+    async def evaluate():
+        results = await asyncio.gather(*(database.aeval(relation) for relation in relations))
+        await database.adispose()
+        return results
+
+    results = asyncio.run(evaluate())
+    with engine.connect() as conn:
+        expected = [conn.execute(sa.text(relation.to_query())).all() for relation in relations]
+    assert [list(result) for result in results] == [list(result) for result in expected]
+
+
+def test_async_eval_sqlite(tmp_path):
+    import asyncio
+    import pandas as pd
+    from pyqrlew.io import SQLite
+    pytest.importorskip('aiosqlite')
+    database = SQLite(str(tmp_path / 'async.db'), ranges=False)
+    database.load_pandas('table1', pd.DataFrame([[1, 'a'], [2, 'b'], [3, 'c']], columns=['col1', 'col2']))
+    dataset = database.dataset()
+    relations = [dataset.sql(f"SELECT SUM(col1) AS s FROM table1 WHERE col1 > {n}") for n in range(3)]
+
+    async def evaluate():
+        results = await asyncio.gather(*(database.aeval(relation) for relation in relations))
+        await database.adispose()
+        return results
+
+    results = asyncio.run(evaluate())
+    assert [list(result) for result in results] == [list(database.eval(relation)) for relation in relations]
@@ -0,0 +1,51 @@
+import copy
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from pyqrlew.io.postgresql import NAME, USER, PASSWORD, PORT
+from pyqrlew.tester import ColumnSpec, Distribution, RandomTableGenerator, StochasticDatabase, StochasticTester, spawn_generators
+
+
+COLUMN_SPECS = [
+    ColumnSpec(name="laplace", distribution=Distribution.LAPLACE, loc=0, scale=1),
+    ColumnSpec(name="uniform", distribution=Distribution.UNIFORM, low=-1, high=1),
+    ColumnSpec(name="gaussian", distribution=Distribution.GAUSSIAN, loc=0, scale=1),
+]
+
+
+def test_random_table_generator_is_reproducible():
+    table = RandomTableGenerator(100, 42).create_table(COLUMN_SPECS)
+    same_table = RandomTableGenerator(100, np.random.default_rng(42)).create_table(COLUMN_SPECS)
+    other_table = RandomTableGenerator(100, 43).create_table(COLUMN_SPECS)
+    assert table.equals(same_table)
+    assert not table.equals(other_table)
+
+
+def test_spawn_generators():
+    first, second = spawn_generators(42, 2)
+    assert first.random() != second.random()
+    assert [g.random() for g in spawn_generators(42, 2)] == [g.random() for g in spawn_generators(42, 2)]
+
+
+@pytest.fixture(scope="module")
+def stochastic_database():
+    database = StochasticDatabase('stochastic_tester', NAME, USER, PASSWORD, PORT)
+    database.create_table('table1', 100, COLUMN_SPECS, seed=42)
+    return database
+
+
+def test_parallel_simulations_match_serial_ones(stochastic_database):
+    tester = StochasticTester(stochastic_database, 1e-3, [("table1", [], "_PRIVACY_UNIT_ROW_")], None, seed=42)
+    dp_relation = tester.compute_dp_relation("SELECT COUNT(*) AS count FROM stochastic_tester.table1", 1.0)
+    serial = tester.simulate(dp_relation, 20)
+    parallel = tester.simulate(dp_relation, 20, n_workers=4)
+    assert serial == parallel
+    assert len(set(serial)) > 1
+
+
+def test_seeding_unsupported_dialect(stochastic_database):
+    sqlite = copy.copy(stochastic_database)
+    sqlite.engine = create_engine('sqlite://')
+    assert sqlite.execute("SELECT 1") == [(1,)]
+    with pytest.raises(NotImplementedError):
+        sqlite.execute("SELECT 1", seed=0.5)
@@ -1,4 +1,4 @@
-from pyqrlew.utils import tables_prefix
+from pyqrlew.utils import tables_prefix, tables_prefix_many, fingerprint, fingerprint_many
 from pyqrlew import Dialect
 
 def test_tables_prefix():
@@ -9,3 +9,28 @@ def test_tables_prefix():
     """
     tables = tables_prefix(query_str, Dialect.PostgreSql)
     assert tables == ["A","d"]
+
+
+def test_tables_prefix_many():
+    queries = ["SELECT * FROM a.b.c", "SELECT * FROM", "SELECT * FROM d.e.f JOIN g.h.i USING(id)"]
+    result = tables_prefix_many(queries, Dialect.PostgreSql)
+    assert result.prefixes == [["a"], None, ["d", "g"]]
+    assert result.errors[0] is None and result.errors[2] is None
+    assert isinstance(result.errors[1], str)
+    assert tables_prefix_many([], Dialect.PostgreSql) == ([], [])
+
+
+def test_fingerprint():
+    query = "select age, COUNT(*) from extract.census where age > 30 and sex = 'Female' group by age"
+    result = fingerprint(query)
+    assert result.template == "SELECT age, COUNT(*) FROM extract.census WHERE age > ? AND sex = ? GROUP BY age"
+    assert result.parameters == ["30", "'Female'"]
+    same = fingerprint("SELECT age, COUNT(*) FROM extract.census WHERE age > 40 AND sex = 'Male' GROUP BY age", Dialect.PostgreSql)
+    assert same.hash == result.hash
+    results = fingerprint_many([query, "SELECT FROM WHERE", "SELECT 1"])
+    assert results.hashes[0] == result.hash
+    assert results.hashes[1] is None and isinstance(results.errors[1], str)
+    assert results.templates[2] == "SELECT ?"
+    limited = fingerprint("SELECT age, COUNT(*) FROM extract.census WHERE age > 30 GROUP BY 1 ORDER BY 2 LIMIT 10")
+    assert limited.template == "SELECT age, COUNT(*) FROM extract.census WHERE age > ? GROUP BY 1 ORDER BY 2 LIMIT 10"
+    assert limited.parameters == ["30"]